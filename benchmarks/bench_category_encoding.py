@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Encoding ADDRESS (high cardinality) with the per-row closure that
+HousePricePreprocessor.transform used to run vs the precomputed CategoryTable
+Usage: python benchmarks/bench_category_encoding.py
+"""
+import numpy as np
+import pandas as pd
+
+from common import make_listings, timed
+
+from house_price_prediction.category_encoding import CategoryTable  # noqa: E402
+from house_price_prediction.preprocessing import HousePricePreprocessor  # noqa: E402
+
+
+def per_row_encode(encoder, column):
+    """The previous implementation: tables rebuilt per call, one Python call per row"""
+    known_classes = set(encoder.classes_)
+    class_to_int = {cls: idx for idx, cls in enumerate(encoder.classes_)}
+    max_known_int = max(class_to_int.values()) if class_to_int else -1
+
+    def encode_value(x):
+        if x in known_classes:
+            return class_to_int[x]
+        return max_known_int + 1 + abs(hash(str(x)) % (max_known_int + 1000))
+
+    return column.astype(str).apply(encode_value)
+
+
+def main():
+    X_train, _ = make_listings(20_000, n_addresses=20_000)
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X_train)
+    encoder = preprocessor.label_encoders['ADDRESS']
+    table = CategoryTable.from_encoder(encoder)
+    print(f"known addresses: {len(encoder.classes_)}\n")
+
+    print(f"{'rows':>9} {'unseen %':>9} {'per-row ms':>11} {'table ms':>9} {'speedup':>8}")
+    rng = np.random.default_rng(1)
+    for n in (1_000, 10_000, 100_000, 1_000_000):
+        for unseen_share in (0.1, 1.0):
+            known = rng.choice(X_train['ADDRESS'].to_numpy(), n)
+            fresh = make_listings(n, seed=n, n_addresses=10 * n)[0]['ADDRESS'].to_numpy()
+            column = pd.Series(np.where(rng.random(n) < unseen_share, fresh, known))
+            old, _ = timed(lambda: per_row_encode(encoder, column), repeats=3)
+            new, codes = timed(lambda: table.encode(column), repeats=3)
+            unseen = (codes > table.max_known).mean() * 100
+            print(f"{n:>9,} {unseen:>8.0f}% {old * 1000:>11.1f} {new * 1000:>9.1f} {old / new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Row-oriented vs columnar /predict/batch payloads, end to end through Flask
+Usage: python benchmarks/bench_columnar.py
+"""
+import json
+import warnings
+
+from common import make_listings, fit_model, timed
+
+warnings.filterwarnings("ignore")
+
+from house_price_prediction import app as app_module  # noqa: E402
+from house_price_prediction.model_registry import ModelSnapshot  # noqa: E402
+
+
+def main():
+    model, preprocessor = fit_model()
+    app_module.install_snapshot(ModelSnapshot(model, preprocessor, preprocessor.compile_plan(), 'bench'))
+    app_module.prediction_cache.max_size = 0  # measure the model path, not the cache
+    client = app_module.app.test_client()
+
+    print(f"{'rows':>8} {'format':>9} {'payload MB':>11} {'request ms':>11} "
+          f"{'preprocess ms':>14} {'model ms':>9} {'rows/s':>10}")
+    for n in (1_000, 10_000, 100_000):
+        X, _ = make_listings(n, seed=1)
+        payloads = {
+            'rows': json.dumps(X.to_dict(orient='records')),
+            'columnar': json.dumps({col: X[col].tolist() for col in X.columns}),
+        }
+        for name, body in payloads.items():
+            seconds, response = timed(
+                lambda: client.post('/predict/batch', data=body, content_type='application/json'),
+                repeats=3
+            )
+            assert response.status_code == 200, response.get_json()
+            timings = response.get_json()
+            print(f"{n:>8} {name:>9} {len(body) / 1e6:>11.1f} {seconds * 1000:>11.1f} "
+                  f"{timings['preprocessing_time_ms']:>14.1f} {timings['model_inference_time_ms']:>9.1f} "
+                  f"{n / seconds:>10,.0f}")
+
+
+if __name__ == '__main__':
+    main()
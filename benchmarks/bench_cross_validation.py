@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Parallel K-fold cross-validation (cross_validation.cross_validate)
+1. Starting a worker on the raw listings: memory-mapping the Feather file
+   vs receiving the pickled frame, with the fork and forkserver start
+   methods. Reports start-up time and the anonymous memory a worker holds
+   beyond an idle one (no listings) of the same start method.
+2. Whole runs: total time, mean fold wall time and worst fold peak RSS.
+Usage: python benchmarks/bench_cross_validation.py
+"""
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from common import make_listings
+
+from house_price_prediction import cross_validation
+from house_price_prediction.data_loading import write_feather
+from house_price_prediction.engines import build_engine
+
+ROWS = 500_000
+K = 5
+
+
+def anonymous_mb():
+    # Heap and other memory the worker owns; pages of the mapped file are
+    # file-backed and not counted (a freshly written file's pages would
+    # show as dirty until written back)
+    for line in open('/proc/self/smaps_rollup'):
+        if line.startswith('Anonymous:'):
+            return int(line.split()[1]) / 1024
+
+
+def touch_listings():
+    X = cross_validation._shared.get('X')
+    if X is not None:
+        for col, dtype in X.dtypes.items():
+            if dtype.kind in 'if':
+                X[col].to_numpy().sum()
+    return anonymous_mb()
+
+
+def start_worker(method, source=None):
+    start = time.perf_counter()
+    attach = {} if source is None else {'initializer': cross_validation._attach,
+                                        'initargs': (source,)}
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context(method), **attach) as pool:
+        memory = pool.submit(touch_listings).result()
+        return time.perf_counter() - start, memory
+
+
+def run(X, y, workers, mapped):
+    feather = cross_validation.feather
+    if not mapped:
+        cross_validation.feather = None
+    try:
+        start = time.perf_counter()
+        report = cross_validation.cross_validate(X, y, build_engine('hist-gradient-boosting', X),
+                                                 k=K, workers=workers)
+        return time.perf_counter() - start, report
+    finally:
+        cross_validation.feather = feather
+
+
+def main():
+    X, y = make_listings(ROWS, seed=0, n_addresses=50_000)
+    source = X.assign(**{cross_validation.TARGET: y})
+    print(f"{ROWS:,} raw listings ({source.memory_usage(deep=True).sum() / 2**20:.0f} MB)")
+    print(f"{'start':>11} {'listings':>9} {'start-up s':>11} {'worker anonymous MB':>20}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'listings.feather'
+        write_feather(source, path)
+        for method in ('fork', 'forkserver'):
+            idle_memory = None
+            for name, shared in (('none', None), ('pickled', source), ('mapped', path)):
+                seconds, memory = start_worker(method, shared)
+                idle_memory = memory if idle_memory is None else idle_memory
+                print(f"{method:>11} {name:>9} {seconds:>11.2f} {memory - idle_memory:>20.0f}")
+
+    print(f"\n{K} folds, histogram gradient boosting")
+    print(f"{'listings':>9} {'workers':>8} {'total s':>8} {'fold wall s':>12} {'fold peak MB':>13} "
+          f"{'RMSE':>8}")
+    for mapped, workers in ((False, 2), (True, 2), (True, 1)):
+        seconds, report = run(X, y, workers, mapped)
+        walls = [r['wall_s'] for r in report['folds']]
+        peaks = [r['peak_rss_mb'] for r in report['folds']]
+        print(f"{'mapped' if mapped else 'pickled':>9} {workers:>8} {seconds:>8.1f} "
+              f"{sum(walls) / K:>12.1f} {max(peaks):>13.0f} {report['overall']['rmse']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Loading a training CSV: the old encoding loop with default dtypes vs the
+typed chunked reader vs the memory-mapped Feather cache (data_loading)
+The latin-1 file has its only non-ASCII byte in the last row, so the old
+loop parses it twice. Each variant runs in a fresh process.
+Usage: python benchmarks/bench_data_loading.py
+"""
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from common import make_listings, peak_rss_mb, reset_peak_rss
+
+ROWS = 1_000_000
+
+VARIANTS = ['old loop', 'typed reader', 'feather cache']
+
+
+def old_load(path):
+    """load_and_prepare_data before data_loading"""
+    for encoding in ['utf-8', 'latin-1', 'iso-8859-1']:
+        try:
+            return pd.read_csv(path, encoding=encoding)
+        except Exception:
+            continue
+
+
+def run(variant, path, cache_dir):
+    from house_price_prediction.data_loading import load_training_frame, read_training_csv
+
+    load = {
+        'old loop': lambda: old_load(path),
+        'typed reader': lambda: read_training_csv(path),
+        'feather cache': lambda: load_training_frame(path, cache_dir)[0],
+    }[variant]
+    reset_peak_rss()
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    frame = load()
+    seconds = time.perf_counter() - start
+    print(seconds, peak_rss_mb() - before, frame.memory_usage(deep=True).sum() / 2**20)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        X, y = make_listings(ROWS, seed=0, n_addresses=50_000)
+        frame = pd.concat([X, y], axis=1)
+        utf8 = Path(tmp) / 'utf8.csv'
+        frame.to_csv(utf8, index=False)
+        frame.loc[ROWS - 1, 'ADDRESS'] = 'Belagavi Road, Ságar'
+        latin1 = Path(tmp) / 'latin1.csv'
+        frame.to_csv(latin1, index=False, encoding='latin-1')
+        del X, y, frame
+        print(f"{ROWS:,} listings, {utf8.stat().st_size / 2**20:.0f} MB CSV")
+        print(f"{'file':>7} {'loader':>14} {'s':>6} {'peak MB':>8} {'frame MB':>9}")
+
+        for path in (utf8, latin1):
+            cache_dir = Path(tmp) / f'cache-{path.stem}'
+            for variant in VARIANTS:
+                if variant == 'feather cache':
+                    # Parse once to fill the cache; the timed run maps it
+                    subprocess.run([sys.executable, __file__, variant, path, cache_dir],
+                                   capture_output=True, check=True, cwd=Path(__file__).parent)
+                out = subprocess.run([sys.executable, __file__, variant, path, cache_dir],
+                                     capture_output=True, text=True, check=True,
+                                     cwd=Path(__file__).parent).stdout
+                seconds, peak, frame_mb = map(float, out.split())
+                print(f"{path.stem:>7} {variant:>14} {seconds:>6.2f} {peak:>8.0f} {frame_mb:>9.0f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4:
+        run(*sys.argv[1:])
+    else:
+        main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Time from `train_model.py` start to the first tree: preprocessing from the CSV
+vs loading the feature cache
+Usage: python benchmarks/bench_feature_cache.py
+"""
+import contextlib
+import io
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+from common import make_listings
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import train_model  # noqa: E402
+
+
+def prepare(csv_path, cache_dir, chunksize=None):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        features = train_model.prepare_features(str(csv_path), chunksize=chunksize,
+                                                work_dir=csv_path.parent / 'features',
+                                                cache_dir=cache_dir)
+    return time.perf_counter() - start, features
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>9} {'CSV MB':>7} {'mode':>10} {'no cache s':>11} {'cold s':>7} "
+              f"{'warm s':>7} {'warm, rehash s':>15}")
+        for n in (100_000, 1_000_000):
+            csv_path = Path(tmp) / f'listings_{n}.csv'
+            X, y = make_listings(n, seed=0)
+            X.assign(**{y.name: y}).to_csv(csv_path, index=False)
+            del X, y
+            for chunksize in (None, 100_000):
+                cache_dir = Path(tmp) / f'cache_{n}_{chunksize}'
+                uncached, _ = prepare(csv_path, None, chunksize)
+                cold, _ = prepare(csv_path, cache_dir, chunksize)
+                warm, features = prepare(csv_path, cache_dir, chunksize)
+                assert len(features[1]) + len(features[3]) == n
+                # A new process that has not seen the file yet must hash it
+                (cache_dir / 'file_hashes.json').unlink()
+                rehash, _ = prepare(csv_path, cache_dir, chunksize)
+                mode = 'in memory' if chunksize is None else 'streaming'
+                print(f"{n:>9,} {csv_path.stat().st_size / 1e6:>7.0f} {mode:>10} {uncached:>11.2f} "
+                      f"{cold:>7.2f} {warm:>7.3f} {rehash:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
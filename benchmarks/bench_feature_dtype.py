@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+float64 vs float32 feature mode: transform and batch-scoring throughput,
+extra peak RSS per phase, and prediction equivalence
+Each mode runs in a fresh process. Usage: python benchmarks/bench_feature_dtype.py
+"""
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from common import make_listings, fit_model, peak_rss_mb, reset_peak_rss
+
+warnings.filterwarnings("ignore")
+
+ROWS = 1_000_000
+SCORE_ROWS = 200_000
+
+
+def phase(fn):
+    """Run fn once; returns (seconds, extra peak RSS MB over the RSS at the start, result)"""
+    reset_peak_rss()
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, peak_rss_mb() - before, result
+
+
+def run(dtype, out_dir):
+    from house_price_prediction.tree_engine import compile_model
+
+    model, preprocessor = fit_model()
+    preprocessor.dtype = np.dtype(dtype)
+    X, _ = make_listings(ROWS, seed=1)
+    engine = compile_model(model, max_rows=0)  # sklearn for every batch
+
+    t_transform, m_transform, features = phase(lambda: preprocessor.transform(X))
+    block = features.to_numpy()
+    t_score, m_score, predictions = phase(lambda: engine.predict(block[:SCORE_ROWS]))
+    t_disk, m_disk, _ = phase(lambda: preprocessor.transform_to_disk([X], Path(out_dir) / f'{dtype}.bin'))
+    np.save(Path(out_dir) / f'{dtype}.npy', predictions)
+    print(t_transform, m_transform, block.nbytes / 2**20, t_score, m_score, t_disk, m_disk)
+
+
+def main():
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{ROWS:,} rows transformed, {SCORE_ROWS:,} scored by the forest")
+        print(f"{'dtype':>8} {'features MB':>12} {'transform rows/s':>17} {'peak MB':>8} "
+              f"{'score rows/s':>13} {'peak MB':>8} {'to disk rows/s':>15} {'peak MB':>8}")
+        for dtype in ('float64', 'float32'):
+            out = subprocess.run([sys.executable, __file__, dtype, tmp], capture_output=True,
+                                 text=True, check=True, cwd=Path(__file__).parent).stdout
+            t_tr, m_tr, mb, t_sc, m_sc, t_dk, m_dk = map(float, out.split())
+            print(f"{dtype:>8} {mb:>12.0f} {ROWS / t_tr:>17,.0f} {m_tr:>8.0f} "
+                  f"{SCORE_ROWS / t_sc:>13,.0f} {m_sc:>8.0f} {ROWS / t_dk:>15,.0f} {m_dk:>8.0f}")
+        p64 = np.load(Path(tmp) / 'float64.npy')
+        p32 = np.load(Path(tmp) / 'float32.npy')
+        print(f"predictions identical: {np.array_equal(p64, p32)} "
+              f"(max abs difference {np.abs(p64 - p32).max():.3g})")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        run(sys.argv[1], sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Derived features for California-housing style data: the previous
+copy + per-column assignment + pd.cut/str round trip vs the one-pass engine
+Times cover create_advanced_features plus label-encoding the two bands.
+Usage: python benchmarks/bench_feature_engineering.py
+"""
+import numpy as np
+import pandas as pd
+
+from common import timed
+
+from house_price_prediction.feature_engineering import (INCOME_BAND_BINS, INCOME_BAND_LABELS,  # noqa: E402
+                                                        AGE_BINS, AGE_BIN_LABELS)
+from house_price_prediction.preprocessing import HousePricePreprocessor  # noqa: E402
+
+
+def make_census(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'housing_median_age': rng.integers(0, 60, n).astype(float),
+        'total_rooms': rng.integers(10, 5000, n).astype(float),
+        'total_bedrooms': rng.integers(1, 1000, n).astype(float),
+        'population': rng.integers(5, 4000, n).astype(float),
+        'households': rng.integers(1, 1500, n).astype(float),
+        'median_income': rng.uniform(0, 15, n),
+    })
+
+
+def string_round_trip(df, encoders):
+    """The previous implementation"""
+    df = df.copy()
+    df['rooms_per_household'] = df['total_rooms'] / (df['households'] + 1)
+    df['bedrooms_per_household'] = df['total_bedrooms'] / (df['households'] + 1)
+    df['population_per_household'] = df['population'] / (df['households'] + 1)
+    df['population_per_room'] = df['population'] / (df['total_rooms'] + 1)
+    df['income_band'] = pd.cut(df['median_income'], bins=INCOME_BAND_BINS,
+                               labels=INCOME_BAND_LABELS, include_lowest=True).astype(str)
+    df['income_squared'] = df['median_income'] ** 2
+    df['income_per_room'] = df['median_income'] / (df['total_rooms'] + 1)
+    df['age_bins'] = pd.cut(df['housing_median_age'], bins=AGE_BINS,
+                            labels=AGE_BIN_LABELS, include_lowest=True).astype(str)
+    for col in ('income_band', 'age_bins'):
+        df[col] = encoders[col].transform(df[col].astype(str).fillna('Unknown'))
+    return df
+
+
+def one_pass(preprocessor, df):
+    df = preprocessor.create_advanced_features(df)
+    for col in ('income_band', 'age_bins'):
+        df[col] = preprocessor.category_tables[col].encode(df[col])
+    return df
+
+
+def main():
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(make_census(10_000))
+    encoders = preprocessor.label_encoders
+
+    print(f"{'rows':>9} {'round trip ms':>14} {'one pass ms':>12} {'speedup':>8}")
+    for n in (1, 1_000, 100_000, 1_000_000):
+        df = make_census(n, seed=1)
+        old, expected = timed(lambda: string_round_trip(df, encoders), repeats=3)
+        new, result = timed(lambda: one_pass(preprocessor, df), repeats=3)
+        assert np.array_equal(result.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64))
+        print(f"{n:>9,} {old * 1000:>14.2f} {new * 1000:>12.2f} {old / new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Forest vs histogram gradient boosting (train_model.py --engine):
+training time, artifact size, serving latency and test RMSE
+Latency goes through the path the API takes: the flattened-array engine for
+the forest, sklearn's predictor for histogram boosting.
+Usage: python benchmarks/bench_hist_gradient_boosting.py
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.metrics import mean_squared_error
+
+from common import make_listings
+
+from house_price_prediction.engines import build_engine
+from house_price_prediction.model_search import measure_latency
+from house_price_prediction.model_store import save_forest
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+N_TRAIN = 100_000
+N_TEST = 20_000
+LATENCY_REPEATS = 2000
+
+
+def main():
+    X, y = make_listings(N_TRAIN + N_TEST, seed=0)
+    preprocessor = HousePricePreprocessor()
+    X_train = preprocessor.fit_transform(X[:N_TRAIN])
+    X_test = preprocessor.transform(X[N_TRAIN:])
+    y_train, y_test = y[:N_TRAIN], y[N_TRAIN:]
+    print(f"{N_TRAIN:,} training / {N_TEST:,} test listings, {X_train.shape[1]} features")
+    print(f"{'engine':>24} {'fit s':>7} {'trees':>6} {'joblib MB':>10} {'.forest MB':>11} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'1k rows/s':>10} {'RMSE':>8}")
+
+    for engine in ('forest', 'hist-gradient-boosting'):
+        model = build_engine(engine, X_train, random_state=0)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s = time.perf_counter() - start
+        trees = getattr(model, 'n_iter_', None) or model.n_estimators
+
+        with tempfile.TemporaryDirectory() as tmp:
+            joblib.dump(model, Path(tmp) / 'model.joblib')
+            joblib_mb = (Path(tmp) / 'model.joblib').stat().st_size / 2**20
+            try:
+                save_forest(model, Path(tmp) / 'model.forest')
+                forest_mb = f"{(Path(tmp) / 'model.forest').stat().st_size / 2**20:.1f}"
+            except ValueError:
+                forest_mb = '-'
+
+        latency = measure_latency(model, X_test, repeats=LATENCY_REPEATS)
+        rmse = np.sqrt(mean_squared_error(y_test, model.predict(X_test)))
+        print(f"{engine:>24} {fit_s:>7.1f} {trees:>6} {joblib_mb:>10.1f} {forest_mb:>11} "
+              f"{latency['row_p50_ms']:>7.2f} {latency['row_p99_ms']:>7.2f} "
+              f"{latency['batch_rows_per_s']:>10,.0f} {rmse:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
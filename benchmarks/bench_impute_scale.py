@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Numeric preprocessing of the previous transform (SimpleImputer.transform,
+write back, re-select, StandardScaler.transform) vs the fused impute_scale
+kernel, allocating and in place. Peak memory is the extra allocation traced by
+tracemalloc on top of the input block (NumPy reports its buffers to it).
+Usage: python benchmarks/bench_impute_scale.py
+"""
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+from common import timed
+
+from house_price_prediction.column_plan import impute_scale  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+N_COLS = 12
+
+
+def make_block(n, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(3, 1, (n, N_COLS))
+    values[rng.random((n, N_COLS)) < 0.05] = np.nan
+    return values
+
+
+def sklearn_path(imputer, scaler, columns, frame):
+    """The previous transform's numeric steps"""
+    frame = frame.copy()
+    frame[columns] = imputer.transform(frame[columns])
+    frame[columns] = pd.DataFrame(frame[columns], columns=columns, index=frame.index)
+    frame = frame[columns]
+    frame[columns] = pd.DataFrame(scaler.transform(frame[columns]), columns=columns, index=frame.index)
+    return frame.to_numpy()
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main():
+    columns = [f'x{i}' for i in range(N_COLS)]
+    train = pd.DataFrame(make_block(50_000), columns=columns)
+    imputer = SimpleImputer(strategy='median').fit(train)
+    scaler = StandardScaler().fit(imputer.transform(train))
+    medians, means, scales = imputer.statistics_, scaler.mean_, scaler.scale_
+
+    print(f"{'rows':>9} {'input MB':>9} {'sklearn ms':>11} {'fused ms':>9} {'in-place ms':>12} "
+          f"{'sklearn peak MB':>16} {'fused peak MB':>14} {'in-place peak MB':>17}")
+    for n in (1, 100, 10_000, 100_000, 1_000_000):
+        values = make_block(n, seed=1)
+        frame = pd.DataFrame(values, columns=columns)
+        repeats = 50 if n <= 100 else 5
+        expected = sklearn_path(imputer, scaler, columns, frame)
+        assert np.array_equal(impute_scale(values, medians, means, scales), expected)
+
+        old, _ = timed(lambda: sklearn_path(imputer, scaler, columns, frame), repeats)
+        fused, _ = timed(lambda: impute_scale(values, medians, means, scales), repeats)
+        scratch = [values.copy() for _ in range(repeats)]
+        inplace, _ = timed(lambda: impute_scale(scratch[-1], medians, means, scales,
+                                                out=scratch.pop()), repeats)
+        old_mb = peak_mb(lambda: sklearn_path(imputer, scaler, columns, frame))
+        fused_mb = peak_mb(lambda: impute_scale(values, medians, means, scales))
+        target = values.copy()
+        inplace_mb = peak_mb(lambda: impute_scale(target, medians, means, scales, out=target))
+        print(f"{n:>9,} {values.nbytes / 2 ** 20:>9.2f} {old * 1000:>11.3f} {fused * 1000:>9.3f} "
+              f"{inplace * 1000:>12.3f} {old_mb:>16.2f} {fused_mb:>14.2f} {inplace_mb:>17.2f}")
+
+
+if __name__ == '__main__':
+    main()
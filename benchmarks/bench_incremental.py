@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Incremental update (train_model.py --incremental) vs full retrain
+A forest is fitted on the history; each batch of new listings (prices up
+15% and a new city) is then either added as 20 warm-started trees or
+folded into a retrain from scratch. Reports fit time and RMSE on held-out
+new listings before and after.
+Usage: python benchmarks/bench_incremental.py
+"""
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import fit_model, make_listings
+
+from house_price_prediction.incremental import accuracy, add_trees
+
+N_HISTORY = 50_000
+BATCHES = [1_000, 5_000, 25_000]
+N_TEST = 5_000
+ADD_TREES = 20
+
+
+def new_listings(n, seed):
+    X, y = make_listings(n, seed)
+    indore = np.arange(n) % 10 == 0
+    X.loc[indore, 'CITY_NAME'] = 'Indore'
+    X.loc[indore, 'ADDRESS'] = [f'Vijay Nagar {i},Indore' for i in np.flatnonzero(indore)]
+    return X, y * 1.15
+
+
+def fit_model_on(X, y):
+    """fit_model's preprocessor and forest settings on given rows"""
+    from sklearn.ensemble import RandomForestRegressor
+    from house_price_prediction.preprocessing import HousePricePreprocessor
+
+    preprocessor = HousePricePreprocessor()
+    model = RandomForestRegressor(n_estimators=100, max_depth=20, min_samples_split=5,
+                                  min_samples_leaf=2, random_state=0, n_jobs=-1)
+    model.fit(preprocessor.fit_transform(X), y)
+    return model, preprocessor
+
+
+def main():
+    start = time.perf_counter()
+    model, preprocessor = fit_model(N_HISTORY, seed=0)
+    history_fit_s = time.perf_counter() - start
+    X_history, y_history = make_listings(N_HISTORY, seed=0)
+    X_test, y_test = new_listings(N_TEST, seed=99)
+    print(f"forest fitted on {N_HISTORY:,} listings in {history_fit_s:.1f}s; "
+          f"test: {N_TEST:,} new listings")
+    print(f"{'new rows':>9} {'update s':>9} {'retrain s':>10} {'RMSE before':>12} "
+          f"{'RMSE update':>12} {'RMSE retrain':>13}")
+
+    for i, n in enumerate(BATCHES):
+        X_new, y_new = new_listings(n, seed=10 + i)
+        updated = copy.deepcopy(preprocessor)
+        before = accuracy(model, updated.transform(X_test), y_test)['rmse']
+
+        updated.extend_vocabularies(X_new)
+        incremental = copy.deepcopy(model)
+        start = time.perf_counter()
+        add_trees(incremental, updated.transform(X_new), y_new, ADD_TREES)
+        update_s = time.perf_counter() - start
+        after = accuracy(incremental, updated.transform(X_test), y_test)['rmse']
+
+        X_all, y_all = pd.concat([X_history, X_new]), pd.concat([y_history, y_new])
+        start = time.perf_counter()
+        retrained, retrained_preprocessor = fit_model_on(X_all, y_all)
+        retrain_s = time.perf_counter() - start
+        full = accuracy(retrained, retrained_preprocessor.transform(X_test), y_test)['rmse']
+        print(f"{n:>9,} {update_s:>9.2f} {retrain_s:>10.1f} {before:>12,.0f} "
+              f"{after:>12,.0f} {full:>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
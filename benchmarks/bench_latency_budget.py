@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+What latency-budgeted selection (train_model.py --max-p99-ms /
+--min-rows-per-s) trades: serving latency and test RMSE of the default
+forest with only its first trees kept (no refit) and refitted shallower
+Usage: python benchmarks/bench_latency_budget.py
+"""
+import time
+
+import numpy as np
+from sklearn.base import clone
+
+from common import fit_model, make_listings
+
+from house_price_prediction.latency_budget import BUDGET_REPEATS, fitted_depth, keep_trees
+from house_price_prediction.model_search import measure_latency
+
+N_TRAIN = 50_000
+N_TEST = 10_000
+
+
+def row(label, model, X_test, y_test, fit_s=None):
+    latency = measure_latency(model, X_test, repeats=BUDGET_REPEATS)
+    rmse = np.sqrt(np.mean((model.predict(X_test) - y_test) ** 2))
+    fit = f"{fit_s:.1f}" if fit_s is not None else "-"
+    print(f"{label:<24} {len(model.estimators_):>6} {fitted_depth(model):>6} {fit:>7} "
+          f"{latency['row_p50_ms']:>7.3f} {latency['row_p99_ms']:>7.3f} "
+          f"{latency['batch_rows_per_s']:>10,.0f} {rmse:>8.1f}")
+
+
+def main():
+    model, preprocessor = fit_model(N_TRAIN)
+    X_test, y_test = make_listings(N_TEST, seed=1)
+    X_test = preprocessor.transform(X_test)
+    X_train, y_train = make_listings(N_TRAIN, seed=0)
+    X_train = preprocessor.transform(X_train)
+    print(f"{N_TRAIN:,} training / {N_TEST:,} test listings")
+    print(f"{'model':<24} {'trees':>6} {'depth':>6} {'fit s':>7} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'1k rows/s':>10} {'RMSE':>8}")
+    row('default forest', model, X_test, y_test)
+    for n_trees in (50, 25, 10):
+        row(f'first {n_trees} trees', keep_trees(model, n_trees), X_test, y_test)
+    for depth in (13, 8, 5):
+        start = time.perf_counter()
+        shallow = clone(model).set_params(max_depth=depth).fit(X_train, y_train)
+        row(f'refit at depth {depth}', shallow, X_test, y_test, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+How search candidates get the training matrix: pickled into every task vs
+mapped once per worker from the packed files (model_search._attach)
+Reports per-task overhead and the private (dirty) memory each worker holds.
+Usage: python benchmarks/bench_model_search.py
+"""
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from common import private_dirty_mb
+
+from house_price_prediction import model_search
+from house_price_prediction.packed_arrays import write_packed
+
+ROWS = 1_000_000
+FEATURES = 15
+TASKS = 6
+WORKERS = 2
+
+
+def pickled_task(X, y):
+    X.sum(), y.sum()
+    return private_dirty_mb()
+
+
+def mapped_task():
+    X, y = model_search._shared['X_train'], model_search._shared['y_train']
+    X.sum(), y.sum()
+    return private_dirty_mb()
+
+
+def run(pool, submit):
+    start = time.perf_counter()
+    memory = [f.result() for f in [submit() for _ in range(TASKS)]]
+    return (time.perf_counter() - start) / TASKS, max(memory)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(ROWS, FEATURES))
+    y = rng.normal(size=ROWS)
+    print(f"{ROWS:,} x {FEATURES} float64 training matrix ({X.nbytes / 2**20:.0f} MB), "
+          f"{TASKS} tasks on {WORKERS} workers")
+    print(f"{'data':>8} {'ms per task':>12} {'worker private MB':>18}")
+    with ProcessPoolExecutor(WORKERS) as pool:
+        pool.submit(private_dirty_mb).result()
+        per_task, memory = run(pool, lambda: pool.submit(pickled_task, X, y))
+    print(f"{'pickled':>8} {per_task * 1000:>12.1f} {memory:>18.0f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {'X_train': Path(tmp) / 'X_train.packed', 'y_train': Path(tmp) / 'y_train.packed'}
+        write_packed(paths['X_train'], {}, {'X_train': X})
+        write_packed(paths['y_train'], {}, {'y_train': y})
+        with ProcessPoolExecutor(WORKERS, initializer=model_search._attach, initargs=(paths,)) as pool:
+            pool.submit(private_dirty_mb).result()
+            per_task, memory = run(pool, lambda: pool.submit(mapped_task))
+    print(f"{'mapped':>8} {per_task * 1000:>12.1f} {memory:>18.0f}")
+
+
+if __name__ == '__main__':
+    main()
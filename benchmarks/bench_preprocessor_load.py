@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Preprocessor load time: joblib (unpickling sklearn objects) vs the packed
+artifact (mmap + string table)
+Usage: python benchmarks/bench_preprocessor_load.py
+"""
+import tempfile
+import warnings
+from pathlib import Path
+
+from common import make_listings, timed
+
+warnings.filterwarnings("ignore")
+
+from house_price_prediction.preprocessing import HousePricePreprocessor  # noqa: E402
+
+SHIPPED = Path(__file__).parent.parent / 'models' / 'preprocessor.joblib'
+
+
+def load(path):
+    preprocessor = HousePricePreprocessor()
+    preprocessor.load(path)
+    return preprocessor
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = []
+        if SHIPPED.exists():
+            sources.append(('models/preprocessor.joblib', load(SHIPPED)))
+        for n_addresses in (50_000, 500_000):
+            X, _ = make_listings(n_addresses * 2, seed=0, n_addresses=n_addresses)
+            preprocessor = HousePricePreprocessor()
+            preprocessor.fit_transform(X)
+            sources.append((f'{n_addresses:,} addresses', preprocessor))
+
+        print(f"{'artifact':>26} {'vocabulary':>11} {'joblib KB':>10} {'packed KB':>10} "
+              f"{'joblib ms':>10} {'packed ms':>10} {'speedup':>8}")
+        for name, preprocessor in sources:
+            joblib_path = Path(tmp) / 'preprocessor.joblib'
+            packed_path = Path(tmp) / 'preprocessor.packed'
+            preprocessor.save(joblib_path)
+            preprocessor.save(packed_path)
+            t_joblib, _ = timed(lambda: load(joblib_path), repeats=5)
+            t_packed, _ = timed(lambda: load(packed_path), repeats=5)
+            vocabulary = sum(len(e.classes_) for e in preprocessor.label_encoders.values())
+            print(f"{name:>26} {vocabulary:>11,} {joblib_path.stat().st_size / 1024:>10.0f} "
+                  f"{packed_path.stat().st_size / 1024:>10.0f} {t_joblib * 1000:>10.2f} "
+                  f"{t_packed * 1000:>10.2f} {t_joblib / t_packed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
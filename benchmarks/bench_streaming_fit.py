@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Peak memory of fitting the preprocessor in memory vs streaming over CSV chunks
+Each configuration runs in a fresh process so its peak RSS is its own.
+Usage: python benchmarks/bench_streaming_fit.py
+"""
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from common import make_listings, peak_rss_mb
+
+
+def run(csv_path, out_path, chunksize):
+    """Fit + transform one way; prints wall seconds and peak RSS MB"""
+    import pandas as pd
+    from house_price_prediction.preprocessing import HousePricePreprocessor
+
+    start = time.perf_counter()
+    preprocessor = HousePricePreprocessor()
+    if chunksize == 0:
+        X = pd.read_csv(csv_path).drop(columns='TARGET(PRICE_IN_LACS)')
+        preprocessor.fit_transform(X)
+        np.save(out_path, preprocessor.transform(X).to_numpy())
+    else:
+        def chunks():
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                yield chunk.drop(columns='TARGET(PRICE_IN_LACS)')
+        preprocessor.fit_streaming(chunks())
+        preprocessor.transform_to_disk(chunks(), out_path)
+    seconds = time.perf_counter() - start
+    print(seconds, peak_rss_mb())
+
+
+def baseline_mb():
+    code = ("import pandas, sklearn.ensemble; import house_price_prediction.preprocessing; "
+            "print(common.peak_rss_mb())")
+    out = subprocess.run([sys.executable, '-c', f"import common; {code}"], capture_output=True,
+                         text=True, check=True, cwd=Path(__file__).parent).stdout
+    return float(out)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"baseline (imports only): {baseline_mb():.0f} MB peak RSS")
+        print(f"{'rows':>9} {'CSV MB':>7} {'mode':>16} {'seconds':>8} {'peak RSS MB':>12}")
+        for n in (200_000, 800_000):
+            csv_path = Path(tmp) / f'listings_{n}.csv'
+            X, y = make_listings(n, seed=0)
+            X.assign(**{y.name: y}).to_csv(csv_path, index=False)
+            del X, y
+            for chunksize in (0, 100_000, 20_000):
+                out = subprocess.run(
+                    [sys.executable, __file__, str(csv_path), str(Path(tmp) / 'features.bin'), str(chunksize)],
+                    capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+                ).stdout.split()
+                mode = 'in memory' if chunksize == 0 else f'chunks of {chunksize:,}'
+                print(f"{n:>9,} {csv_path.stat().st_size / 1e6:>7.0f} {mode:>16} "
+                      f"{float(out[0]):>8.2f} {float(out[1]):>12.0f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4:
+        run(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
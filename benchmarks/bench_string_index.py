@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Per-worker memory of the categorical vocabularies, and lookup time for an
+ADDRESS column: the previous Python hash index over LabelEncoder.classes_
+vs the StringIndex, loaded from joblib or mapped from the packed artifact
+Memory is what the load leaves allocated on the heap (tracemalloc, which
+also sees NumPy and pandas hash tables); mapped file pages are shared
+between workers and not counted. Each case runs in a fresh process. Usage: python benchmarks/bench_string_index.py
+"""
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from common import make_listings, timed
+
+warnings.filterwarnings("ignore")
+
+QUERY_ROWS = 100_000
+MODES = ('dict index (before)', 'StringIndex, joblib', 'StringIndex, packed')
+
+
+def run(mode, path, n_addresses):
+    import joblib
+    from house_price_prediction.preprocessing import HousePricePreprocessor
+
+    from house_price_prediction.category_encoding import factorize_labels
+
+    column = make_listings(QUERY_ROWS, seed=1, n_addresses=n_addresses)[0]['ADDRESS']
+    tracemalloc.start()
+    if mode == 0:
+        # What each worker held before: classes_ plus a pandas hash table per encoder
+        encoders = joblib.load(path)['label_encoders']
+        indexes = {col: pd.Index([str(c) for c in e.classes_], dtype=object) for col, e in encoders.items()}
+        for index in indexes.values():
+            index.get_indexer(index[:1])
+
+        def lookup():
+            codes, labels = factorize_labels(column)
+            return indexes['ADDRESS'].get_indexer(pd.Index(labels, dtype=object))[codes]
+    else:
+        preprocessor = HousePricePreprocessor()
+        preprocessor.load(path)
+        lookup = lambda: preprocessor.category_tables['ADDRESS'].encode(column)  # noqa: E731
+    memory = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    seconds, _ = timed(lookup, repeats=3)
+    print(memory, seconds)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'addresses':>10} {'mode':>22} {'heap MB':>8} {f'{QUERY_ROWS // 1000}k lookup ms':>15}")
+        for n_addresses in (100_000, 500_000):
+            from house_price_prediction.preprocessing import HousePricePreprocessor
+            X, _ = make_listings(n_addresses * 2, seed=0, n_addresses=n_addresses)
+            preprocessor = HousePricePreprocessor()
+            preprocessor.fit_transform(X)
+            vocabulary = len(preprocessor.label_encoders['ADDRESS'].classes_)
+            paths = [Path(tmp) / 'preprocessor.joblib'] * 2 + [Path(tmp) / 'preprocessor.packed']
+            for path in set(paths):
+                preprocessor.save(path)
+            del X, preprocessor
+            for mode, (name, path) in enumerate(zip(MODES, paths)):
+                out = subprocess.run([sys.executable, __file__, str(mode), str(path), str(n_addresses)],
+                                     capture_output=True, text=True, check=True,
+                                     cwd=Path(__file__).parent).stdout
+                memory, seconds = map(float, out.split())
+                print(f"{vocabulary:>10,} {name:>22} {memory:>8.1f} {seconds * 1000:>15.1f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4:
+        run(int(sys.argv[1]), sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+sklearn model.predict vs the flattened-array TreeEnsemble across batch sizes
+"engine" always walks the packed arrays; "served" is what the API uses, which
+hands batches of HPP_ENGINE_MAX_ROWS (512) or more back to sklearn
+Usage: python benchmarks/bench_tree_engine.py
+"""
+import time
+import warnings
+
+import numpy as np
+
+from common import make_listings, fit_model
+
+warnings.filterwarnings("ignore")
+
+from house_price_prediction.tree_engine import TreeEnsemble, ENGINE_MAX_ROWS  # noqa: E402
+
+
+def latency(fn, X, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - start)
+    return np.percentile(samples, 50) * 1000, np.percentile(samples, 99) * 1000
+
+
+def main():
+    model, preprocessor = fit_model()
+    engine = TreeEnsemble.from_model(model, max_rows=0)
+    served = TreeEnsemble.from_model(model, max_rows=ENGINE_MAX_ROWS)
+    X_all = preprocessor.compile_plan().transform_records(
+        make_listings(10_000, seed=1)[0].to_dict(orient='records')
+    )
+    diff = np.max(np.abs(engine.predict(X_all) - model.predict(X_all)) / np.abs(model.predict(X_all)))
+    print(f"trees={engine.n_estimators} depth={engine.depth} max relative diff={diff:.2e}\n")
+
+    print(f"{'batch':>7} {'sklearn p50 ms':>15} {'engine p50 ms':>14} {'served p50 ms':>14} "
+          f"{'sklearn p99 ms':>15} {'engine p99 ms':>14} {'served p99 ms':>14}")
+    for n in (1, 10, 100, 1_000, 10_000):
+        X = X_all[:n]
+        repeats = 200 if n <= 100 else 20 if n <= 1000 else 5
+        sk50, sk99 = latency(model.predict, X, repeats)
+        en50, en99 = latency(engine.predict, X, repeats)
+        sv50, sv99 = latency(served.predict, X, repeats)
+        print(f"{n:>7} {sk50:>15.2f} {en50:>14.2f} {sv50:>14.2f} "
+              f"{sk99:>15.2f} {en99:>14.2f} {sv99:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Shared setup for the benchmark scripts: synthetic listings and a fitted model
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+CITIES = ['Agra', 'Ahmedabad', 'Bangalore', 'Bhopal', 'Chennai', 'Delhi', 'Hyderabad',
+          'Jaipur', 'Kanpur', 'Kolkata', 'Lucknow', 'Mumbai', 'Nagpur', 'Pune', 'Surat']
+
+
+def make_listings(n, seed=0, n_addresses=5000):
+    """Synthetic listings with the production column layout"""
+    rng = np.random.default_rng(seed)
+    cities = rng.choice(CITIES, n)
+    sqft = rng.lognormal(7.0, 0.5, n).round(2)
+    bhk = rng.integers(1, 6, n)
+    lon = rng.uniform(70, 90, n)
+    lat = rng.uniform(10, 30, n)
+    address_ids = rng.integers(0, n_addresses, n)
+    X = pd.DataFrame({
+        'POSTED_BY': rng.choice(['Owner', 'Dealer', 'Builder'], n),
+        'UNDER_CONSTRUCTION': rng.integers(0, 2, n),
+        'RERA': rng.integers(0, 2, n),
+        'BHK_NO.': bhk,
+        'BHK_OR_RK': rng.choice(['BHK', 'RK'], n, p=[0.95, 0.05]),
+        'SQUARE_FT': sqft,
+        'READY_TO_MOVE': rng.integers(0, 2, n),
+        'RESALE': rng.integers(0, 2, n),
+        'ADDRESS': [f'Sector {a % 200} Road {a},{c}' for a, c in zip(address_ids, cities)],
+        'LONGITUDE': lon,
+        'LATITUDE': lat,
+        'area': sqft,
+        'bedrooms': bhk,
+        'longitude': lon,
+        'latitude': lat,
+        'CITY_NAME': cities,
+    })
+    city_factor = pd.Series(cities).map({c: i + 1 for i, c in enumerate(CITIES)}).to_numpy()
+    y = pd.Series(sqft * city_factor * 3 + bhk * 5 + rng.normal(0, 20, n), name='TARGET(PRICE_IN_LACS)')
+    return X, y
+
+
+def fit_model(n_train=20000, n_estimators=100, max_depth=20, seed=0):
+    """Fit the preprocessor and a forest with train_model.py's default settings"""
+    from sklearn.ensemble import RandomForestRegressor
+    from house_price_prediction.preprocessing import HousePricePreprocessor
+
+    X, y = make_listings(n_train, seed)
+    preprocessor = HousePricePreprocessor()
+    X_processed = preprocessor.fit_transform(X)
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth,
+                                  min_samples_split=5, min_samples_leaf=2,
+                                  random_state=seed, n_jobs=-1)
+    model.fit(X_processed, y)
+    return model, preprocessor
+
+
+def timed(fn, repeats=5):
+    """Best-of-N wall time in seconds and the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_rss_mb():
+    """VmHWM: unlike ru_maxrss it is reset by exec, so it excludes the parent"""
+    for line in open('/proc/self/status'):
+        if line.startswith('VmHWM:'):
+            return int(line.split()[1]) / 1024
+
+
+def private_dirty_mb():
+    """Memory only this process has written to (not shared or file-backed clean pages)"""
+    for line in open('/proc/self/smaps_rollup'):
+        if line.startswith('Private_Dirty:'):
+            return int(line.split()[1]) / 1024
+
+
+def reset_peak_rss():
+    """Restart VmHWM from the current RSS (Linux), to measure one phase's peak"""
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
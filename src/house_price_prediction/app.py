@@ -3,81 +3,177 @@ Flask REST API for House Price Prediction
 Real-time predictions with JSON inputs
 Optimized for 28% faster inference time
 """
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context
 import joblib
-import pandas as pd
 import numpy as np
 from pathlib import Path
 import time
-import json
+import hmac
+import os
 from .preprocessing import HousePricePreprocessor
-
-LOG_PATH = Path("debug.log")
-
-def log_entry(session_id, run_id, hypothesis_id, location, message, data):
-    """Write a log entry in NDJSON format"""
-    entry = {
-        "sessionId": session_id,
-        "runId": run_id,
-        "hypothesisId": hypothesis_id,
-        "location": location,
-        "message": message,
-        "data": data,
-        "timestamp": int(__import__('time').time() * 1000)
-    }
-    with open(LOG_PATH, 'a') as f:
-        f.write(json.dumps(entry) + '\n')
+from .debug_log import log_entry
+from .batching import MicroBatcher
+from .prediction_cache import PredictionCache, canonical_key
+from .model_store import load_forest
+from .tree_engine import TreeEnsemble, compile_model
+from .engines import engine_name, engine_params
+from .model_registry import ModelSnapshot, ModelReloader, artifact_fingerprint
+from .streaming import predict_stream
+from .binary_io import (BINARY_REQUEST_TYPES, BINARY_RESPONSE_TYPES, UnsupportedFormat,
+                        decode_columns, encode_predictions)
 
 
 app = Flask(__name__, 
             template_folder='templates',
             static_folder='static')
 
-# Global variables for model and preprocessor
+# Model directory (defaults to <project root>/models)
+MODEL_DIR = Path(os.environ.get("HPP_MODEL_DIR", Path(__file__).parent.parent.parent / "models"))
+
+# Current ModelSnapshot; requests read it once and keep using that object,
+# so a reload swaps it without affecting requests already in flight
+snapshot = None
+
+# Global variables for model and preprocessor (mirrors of the current snapshot)
 model = None
 preprocessor = None
+transform_plan = None
+model_version = None
 model_loaded = False
 
+# Prediction cache, invalidated whenever a new model is loaded
+prediction_cache = PredictionCache(
+    max_size=int(os.environ.get("HPP_CACHE_SIZE", "10000")),
+    ttl=float(os.environ.get("HPP_CACHE_TTL", "0"))
+)
+
+
+def artifact_paths(model_dir=None):
+    """(joblib model, memory-mapped forest, joblib preprocessor, packed preprocessor) paths"""
+    model_dir = Path(model_dir or MODEL_DIR)
+    return (model_dir / "house_price_model.joblib",
+            model_dir / "house_price_model.forest",
+            model_dir / "preprocessor.joblib",
+            model_dir / "preprocessor.packed")
+
+
+def current_fingerprint():
+    return artifact_fingerprint(artifact_paths())
+
+
+# Serve forests through the flattened-array engine (see tree_engine.py)
+TREE_ENGINE = os.environ.get("HPP_TREE_ENGINE", "1").lower() not in ("0", "false", "no")
+
+# Feature dtype for serving ("float32" or "float64"); unset keeps the preprocessor's own
+FEATURE_DTYPE = os.environ.get("HPP_FEATURE_DTYPE")
+
+
+def build_snapshot(model_dir=None):
+    """Load, validate and warm a model + preprocessor pair without publishing it"""
+    model_path, forest_path, preprocessor_path, packed_path = artifact_paths(model_dir)
+    if not (model_path.exists() or forest_path.exists()) or not (
+            preprocessor_path.exists() or packed_path.exists()):
+        # #region agent log
+        log_entry("api", "load_model", "LOAD", "app.py:47",
+                 "Model files not found", {
+                     "model_exists": model_path.exists(),
+                     "forest_exists": forest_path.exists(),
+                     "preprocessor_exists": preprocessor_path.exists() or packed_path.exists()
+                 }, level="WARNING")
+        # #endregion
+        raise FileNotFoundError("Model files not found")
+    
+    # Version first: a file replaced while loading then shows up as a new change
+    version = artifact_fingerprint((model_path, forest_path, preprocessor_path, packed_path))
+    
+    # Prefer the memory-mapped forest (shared across workers) unless the
+    # joblib model is newer; joblib is always the fallback
+    loaded_model = None
+    loaded_path = model_path
+    forest_current = forest_path.exists() and (
+        not model_path.exists() or forest_path.stat().st_mtime >= model_path.stat().st_mtime
+    )
+    if forest_current:
+        try:
+            loaded_model = load_forest(forest_path)
+            loaded_path = forest_path
+        except Exception as e:
+            log_entry("api", "load_model", "LOAD", "app.py:75",
+                     "Forest artifact unusable, falling back to joblib", {
+                         "error": str(e)
+                     }, level="WARNING")
+    if loaded_model is None:
+        loaded_model = joblib.load(model_path)
+        if TREE_ENGINE:
+            loaded_model = compile_model(loaded_model) or loaded_model
+    # Same rule for the preprocessor: the packed artifact (no unpickling)
+    # unless the joblib file is newer
+    loaded_preprocessor = None
+    packed_current = packed_path.exists() and (
+        not preprocessor_path.exists()
+        or packed_path.stat().st_mtime >= preprocessor_path.stat().st_mtime
+    )
+    if packed_current:
+        try:
+            loaded_preprocessor = HousePricePreprocessor()
+            loaded_preprocessor.load(packed_path)
+        except Exception as e:
+            loaded_preprocessor = None
+            log_entry("api", "load_model", "LOAD", "app.py:118",
+                     "Packed preprocessor unusable, falling back to joblib", {
+                         "error": str(e)
+                     }, level="WARNING")
+    if loaded_preprocessor is None:
+        loaded_preprocessor = HousePricePreprocessor()
+        loaded_preprocessor.load(preprocessor_path)
+    if FEATURE_DTYPE:
+        loaded_preprocessor.dtype = np.dtype(FEATURE_DTYPE)
+    
+    return ModelSnapshot(loaded_model, loaded_preprocessor,
+                         loaded_preprocessor.compile_plan(),
+                         version, loaded_path).validate()
+
+
+def install_snapshot(new_snapshot):
+    """Publish a snapshot in one assignment and invalidate the cache"""
+    global snapshot, model, preprocessor, transform_plan, model_version, model_loaded
+    prediction_cache.invalidate(new_snapshot.version)
+    snapshot = new_snapshot
+    model = new_snapshot.model
+    preprocessor = new_snapshot.preprocessor
+    transform_plan = new_snapshot.transform_plan
+    model_version = new_snapshot.version
+    model_loaded = True
+
+
+def reload_model():
+    """Build and publish a new snapshot; raises if the artifacts are unusable"""
+    new_snapshot = build_snapshot()
+    previous = snapshot.version if snapshot else None
+    install_snapshot(new_snapshot)
+    
+    # #region agent log
+    log_entry("api", "load_model", "LOAD", "app.py:58",
+             "Model loaded successfully", {
+                 "model_type": new_snapshot.model_type,
+                 "model_path": new_snapshot.model_path,
+                 "model_version": new_snapshot.version,
+                 "previous_version": previous,
+                 "preprocessor_fitted": new_snapshot.preprocessor.is_fitted
+             }, level="INFO")
+    # #endregion
+    return new_snapshot
+
 
 def load_model():
     """Load model and preprocessor"""
-    global model, preprocessor, model_loaded
-    
     # #region agent log
     log_entry("api", "load_model", "LOAD", "app.py:38",
              "Loading model and preprocessor", {})
     # #endregion
     
     try:
-        # Get project root (2 levels up from src/house_price_prediction/)
-        project_root = Path(__file__).parent.parent.parent
-        model_dir = project_root / "models"
-        model_path = model_dir / "house_price_model.joblib"
-        preprocessor_path = model_dir / "preprocessor.joblib"
-        
-        if not model_path.exists() or not preprocessor_path.exists():
-            # #region agent log
-            log_entry("api", "load_model", "LOAD", "app.py:47",
-                     "Model files not found", {
-                         "model_exists": model_path.exists(),
-                         "preprocessor_exists": preprocessor_path.exists()
-                     })
-            # #endregion
-            return False
-        
-        model = joblib.load(model_path)
-        preprocessor = HousePricePreprocessor()
-        preprocessor.load(preprocessor_path)
-        model_loaded = True
-        
-        # #region agent log
-        log_entry("api", "load_model", "LOAD", "app.py:58",
-                 "Model loaded successfully", {
-                     "model_type": type(model).__name__,
-                     "preprocessor_fitted": preprocessor.is_fitted
-                 })
-        # #endregion
-        
+        reload_model()
         return True
     except Exception as e:
         # #region agent log
@@ -85,11 +181,46 @@ def load_model():
                  "Model load error", {
                      "error": str(e),
                      "error_type": type(e).__name__
-                 })
+                 }, level="ERROR")
         # #endregion
         return False
 
 
+# Hot reload: watch the model directory (HPP_RELOAD_INTERVAL seconds) and
+# accept POST /admin/reload; loading always happens on the reloader thread
+reloader = ModelReloader(reload_model, current_fingerprint,
+                         lambda: snapshot.version if snapshot else None,
+                         interval=float(os.environ.get("HPP_RELOAD_INTERVAL", "0")))
+ADMIN_TOKEN = os.environ.get("HPP_ADMIN_TOKEN")
+
+# Listings per transform + predict call on /predict/stream
+STREAM_CHUNK_ROWS = int(os.environ.get("HPP_STREAM_CHUNK_ROWS", "1000"))
+
+
+def run_model(records, snap=None):
+    """
+    Transform records and predict with one snapshot
+    Returns (predictions, preprocess_time, predict_time, model_version)
+    """
+    snap = snap or snapshot
+    preprocess_start = time.time()
+    X_processed = snap.transform_plan.transform_records(records)
+    preprocess_time = time.time() - preprocess_start
+    
+    predict_start = time.time()
+    predictions = snap.predict(X_processed)
+    predict_time = time.time() - predict_start
+    
+    return predictions, preprocess_time, predict_time, snap.version
+
+
+# Optional micro-batching of concurrent single-listing requests
+# (needs a threaded server, e.g. gunicorn --threads 8)
+BATCH_WINDOW_MS = float(os.environ.get("HPP_BATCH_WINDOW_MS", "0"))
+BATCH_MAX_SIZE = int(os.environ.get("HPP_BATCH_MAX_SIZE", "64"))
+batcher = MicroBatcher(run_model, BATCH_WINDOW_MS, BATCH_MAX_SIZE) if BATCH_WINDOW_MS > 0 else None
+
+
 # Initialize model at startup (before_first_request is deprecated)
 # Model will be loaded when app starts
 
@@ -133,8 +264,17 @@ def predict():
             return jsonify({
                 "error": "Model not loaded. Please train the model first."
             }), 500
+    if reloader.interval > 0:
+        reloader.ensure_started()
+    
+    # Every row of this request is served by one snapshot, even if a reload lands meanwhile
+    snap = snapshot
     
     try:
+        # Binary columnar batches (Arrow IPC stream / .npz)
+        if request.mimetype in BINARY_REQUEST_TYPES:
+            return predict_binary(snap, start_time)
+        
         # Get JSON data
         data = request.get_json()
         
@@ -148,47 +288,64 @@ def predict():
                  })
         # #endregion
         
-        # Convert to DataFrame
+        # Columnar batch: dict of equal-length arrays keyed by feature name
+        if is_columnar(data):
+            return predict_columnar(data, snap, start_time)
+        
+        # Single prediction (dict) or batch prediction (list of dicts)
         if isinstance(data, dict):
-            # Single prediction
-            df = pd.DataFrame([data])
-        elif isinstance(data, list):
-            # Batch prediction
-            df = pd.DataFrame(data)
+            records = [data]
+        elif isinstance(data, list) and all(isinstance(r, dict) for r in data):
+            records = data
         else:
             return jsonify({"error": "Invalid input format"}), 400
         
         # #region agent log
         log_entry("api", "predict", "PRED", "app.py:125",
-                 "DataFrame created", {
-                     "shape": list(df.shape),
-                     "columns": list(df.columns)
+                 "Records collected", {
+                     "num_records": len(records)
                  })
         # #endregion
         
-        # Preprocess
-        preprocess_start = time.time()
-        X_processed = preprocessor.transform(df)
-        preprocess_time = time.time() - preprocess_start
+        # Serve repeated listings from the cache; only misses reach the model
+        version = snap.version
+        keys = [canonical_key(r) for r in records] if prediction_cache.enabled else None
+        cached = [prediction_cache.get(k, version) for k in keys] if keys else [None] * len(records)
+        misses = [i for i, p in enumerate(cached) if p is None]
         
-        # #region agent log
-        log_entry("api", "predict", "PRED", "app.py:135",
-                 "Preprocessing complete", {
-                     "preprocess_time_ms": preprocess_time * 1000,
-                     "processed_shape": list(X_processed.shape)
-                 })
-        # #endregion
+        batch_info = None
+        preprocess_time = predict_time = 0.0
+        if not misses:
+            predictions = cached
+        elif batcher is not None and isinstance(data, dict):
+            # Merge with concurrent single-listing requests
+            batched = batcher.predict(data)
+            predictions = [batched.prediction]
+            preprocess_time = batched.preprocess_time
+            predict_time = batched.predict_time
+            version = batched.model_version
+            batch_info = {"batch_size": batched.batch_size,
+                          "queue_wait_ms": round(batched.queue_wait * 1000, 2)}
+        else:
+            # Preprocess (compiled plan, no DataFrame round-trip) and predict
+            miss_predictions, preprocess_time, predict_time, _ = run_model(
+                [records[i] for i in misses], snap
+            )
+            predictions = list(cached)
+            for i, prediction in zip(misses, miss_predictions):
+                predictions[i] = prediction
         
-        # Predict
-        predict_start = time.time()
-        predictions = model.predict(X_processed)
-        predict_time = time.time() - predict_start
+        if keys:
+            for i in misses:
+                prediction_cache.put(keys[i], float(predictions[i]), version)
+        cache_hits = len(records) - len(misses)
         
         total_time = time.time() - start_time
         
         # #region agent log
         log_entry("api", "predict", "PRED", "app.py:147",
                  "Prediction complete", {
+                     "preprocess_time_ms": preprocess_time * 1000,
                      "predict_time_ms": predict_time * 1000,
                      "total_time_ms": total_time * 1000,
                      "num_predictions": len(predictions)
@@ -201,15 +358,21 @@ def predict():
                 "predicted_price": float(predictions[0]),
                 "inference_time_ms": round(total_time * 1000, 2),
                 "preprocessing_time_ms": round(preprocess_time * 1000, 2),
-                "model_inference_time_ms": round(predict_time * 1000, 2)
+                "model_inference_time_ms": round(predict_time * 1000, 2),
+                "cache_hit": cache_hits == 1,
+                "model_version": version
             }
+            if batch_info:
+                result.update(batch_info)
         else:
             result = {
                 "predictions": [float(p) for p in predictions],
                 "inference_time_ms": round(total_time * 1000, 2),
                 "preprocessing_time_ms": round(preprocess_time * 1000, 2),
                 "model_inference_time_ms": round(predict_time * 1000, 2),
-                "num_predictions": len(predictions)
+                "num_predictions": len(predictions),
+                "cache_hits": cache_hits,
+                "model_version": version
             }
         
         return jsonify(result), 200
@@ -220,7 +383,7 @@ def predict():
                  "Prediction error", {
                      "error": str(e),
                      "error_type": type(e).__name__
-                 })
+                 }, level="ERROR")
         # #endregion
         return jsonify({
             "error": str(e),
@@ -228,36 +391,202 @@ def predict():
         }), 500
 
 
+def is_columnar(data):
+    """True for {"FEATURE": [v0, v1, ...], ...} payloads"""
+    return (isinstance(data, dict) and len(data) > 0
+            and all(isinstance(v, list) for v in data.values()))
+
+
+def score_columns(columns, n_rows, snap):
+    """Transform + predict a columnar batch; returns (predictions, preprocess_time, predict_time)"""
+    preprocess_start = time.time()
+    X_processed = snap.transform_plan.transform_columns(columns, n_rows)
+    preprocess_time = time.time() - preprocess_start
+    
+    predict_start = time.time()
+    predictions = snap.predict(X_processed) if n_rows else np.empty(0)
+    predict_time = time.time() - predict_start
+    
+    # #region agent log
+    log_entry("api", "predict", "PRED", "app.py:300",
+             "Columnar prediction complete", {
+                 "num_predictions": n_rows,
+                 "preprocess_time_ms": preprocess_time * 1000,
+                 "predict_time_ms": predict_time * 1000
+             })
+    # #endregion
+    
+    return np.asarray(predictions, dtype=np.float64), preprocess_time, predict_time
+
+
+def columnar_json(predictions, snap, start_time, preprocess_time, predict_time):
+    """Columnar JSON response for a batch of predictions"""
+    total_time = time.time() - start_time
+    return jsonify({
+        "predicted_price": predictions.tolist(),
+        "inference_time_ms": round(total_time * 1000, 2),
+        "preprocessing_time_ms": round(preprocess_time * 1000, 2),
+        "model_inference_time_ms": round(predict_time * 1000, 2),
+        "num_predictions": len(predictions),
+        "model_version": snap.version
+    }), 200
+
+
+def binary_response(predictions, mimetype, snap, start_time, preprocess_time, predict_time):
+    """Predictions as a float64 buffer; timings travel in headers"""
+    body = encode_predictions(predictions, mimetype)
+    total_time = time.time() - start_time
+    return Response(body, mimetype=mimetype, headers={
+        "X-Model-Version": snap.version,
+        "X-Num-Predictions": str(len(predictions)),
+        "X-Inference-Time-Ms": f"{total_time * 1000:.2f}",
+        "X-Preprocessing-Time-Ms": f"{preprocess_time * 1000:.2f}",
+        "X-Model-Inference-Time-Ms": f"{predict_time * 1000:.2f}",
+    })
+
+
+def predict_columnar(columns, snap, start_time):
+    """Score a columnar batch without materialising per-row dicts"""
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) != 1:
+        return jsonify({"error": "All columns must have the same length"}), 400
+    n_rows = lengths.pop()
+    
+    predictions, preprocess_time, predict_time = score_columns(columns, n_rows, snap)
+    
+    response_type = request.accept_mimetypes.best_match(('application/json',) + BINARY_RESPONSE_TYPES)
+    if response_type in BINARY_RESPONSE_TYPES:
+        return binary_response(predictions, response_type, snap, start_time,
+                               preprocess_time, predict_time)
+    
+    return columnar_json(predictions, snap, start_time, preprocess_time, predict_time)
+
+
+def predict_binary(snap, start_time):
+    """Score an Arrow IPC / .npz batch; reply in the format the client accepts"""
+    try:
+        columns, n_rows = decode_columns(request.get_data(), request.mimetype)
+    except UnsupportedFormat as e:
+        return jsonify({"error": str(e)}), 415
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    predictions, preprocess_time, predict_time = score_columns(columns, n_rows, snap)
+    
+    # Default to the request's own format; JSON only if explicitly preferred
+    response_type = request.accept_mimetypes.best_match(
+        (request.mimetype,) + BINARY_RESPONSE_TYPES + ('application/json',)
+    )
+    if response_type == 'application/json':
+        return columnar_json(predictions, snap, start_time, preprocess_time, predict_time)
+    try:
+        return binary_response(predictions, response_type or request.mimetype, snap, start_time,
+                               preprocess_time, predict_time)
+    except UnsupportedFormat as e:
+        return jsonify({"error": str(e)}), 406
+
+
 @app.route('/predict/batch', methods=['POST'])
 def predict_batch():
     """Batch prediction endpoint for multiple houses"""
     return predict()  # Same logic handles both single and batch
 
 
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream_endpoint():
+    """
+    Stream predictions for newline-delimited JSON listings
+    Reads the body in chunks and writes one NDJSON result line per listing
+    """
+    if not model_loaded and not load_model():
+        return jsonify({
+            "error": "Model not loaded. Please train the model first."
+        }), 500
+    
+    snap = snapshot
+    chunk_rows = request.args.get('chunk_rows', STREAM_CHUNK_ROWS, type=int)
+    if chunk_rows <= 0:
+        return jsonify({"error": "chunk_rows must be positive"}), 400
+    
+    # #region agent log
+    log_entry("api", "predict_stream", "PRED", "app.py:325",
+             "Streaming prediction started", {
+                 "chunk_rows": chunk_rows,
+                 "model_version": snap.version
+             })
+    # #endregion
+    
+    return Response(
+        stream_with_context(predict_stream(snap, request.stream, chunk_rows)),
+        mimetype='application/x-ndjson',
+        headers={"X-Model-Version": snap.version}
+    )
+
+
 @app.route('/model/info', methods=['GET'])
 def model_info():
     """Get model information"""
-    if not model_loaded:
+    snap = snapshot
+    if not model_loaded or snap is None:
         return jsonify({"error": "Model not loaded"}), 500
     
     info = {
-        "model_type": type(model).__name__,
+        "model_type": snap.model_type,
+        "model_version": snap.version,
+        "model_path": snap.model_path,
+        "loaded_at": snap.loaded_at,
+        "memory_mapped": bool(snap.model_path and snap.model_path.endswith('.forest')),
+        "inference_engine": "tree_ensemble" if isinstance(snap.model, TreeEnsemble) else "sklearn",
+        "feature_dtype": snap.preprocessor.dtype.name,
         "model_loaded": model_loaded,
-        "preprocessor_fitted": preprocessor.is_fitted if preprocessor else False,
-        "num_features": len(preprocessor.feature_names) if preprocessor and preprocessor.feature_names else 0
+        "preprocessor_fitted": snap.preprocessor.is_fitted,
+        "num_features": snap.transform_plan.n_features
     }
     
-    if hasattr(model, 'n_estimators'):
-        info["n_estimators"] = model.n_estimators
-    if hasattr(model, 'max_depth'):
-        info["max_depth"] = model.max_depth
+    if hasattr(snap.model, 'n_estimators'):
+        info["n_estimators"] = snap.model.n_estimators
+    if hasattr(snap.model, 'max_depth'):
+        info["max_depth"] = snap.model.max_depth
+    info["engine"] = engine_name(snap.model)
+    info["engine_params"] = engine_params(snap.model)
+    info["prediction_cache"] = prediction_cache.stats()
+    info["hot_reload"] = {
+        "interval_seconds": reloader.interval,
+        "reloads": reloader.reloads,
+        "reloading": reloader.reloading,
+        "last_error": reloader.last_error
+    }
     
     return jsonify(info), 200
 
 
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reload the model in the background and swap it in atomically"""
+    # Fails closed: without a configured token nobody may trigger reloads
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Forbidden: set HPP_ADMIN_TOKEN to enable /admin/reload"}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+    
+    # #region agent log
+    log_entry("api", "admin_reload", "LOAD", "app.py:330",
+             "Reload requested", {"current_version": model_version}, level="INFO")
+    # #endregion
+    
+    reloader.request_reload()
+    return jsonify({
+        "status": "reload scheduled",
+        "model_version": model_version,
+        "artifact_version": current_fingerprint()
+    }), 202
+
+
 if __name__ == '__main__':
     # Load model at startup
     load_model()
+    if reloader.interval > 0:
+        reloader.ensure_started()
     
     print("\n" + "="*60)
     print("?? HOUSE PRICE PREDICTION SYSTEM")
@@ -0,0 +1,104 @@
+"""
+Micro-batching dispatcher for concurrent single-listing predictions
+Requests arriving within a short window share one transform + predict call
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchResult:
+    """Prediction for one record plus the timings of the batch it ran in"""
+
+    __slots__ = ("prediction", "preprocess_time", "predict_time", "model_version",
+                 "batch_size", "queue_wait")
+
+    def __init__(self, prediction, preprocess_time, predict_time, model_version,
+                 batch_size, queue_wait):
+        self.prediction = prediction
+        self.preprocess_time = preprocess_time
+        self.predict_time = predict_time
+        self.model_version = model_version
+        self.batch_size = batch_size
+        self.queue_wait = queue_wait
+
+
+class MicroBatcher:
+    """
+    Collect records submitted within `window_ms` (up to `max_batch_size`)
+    and run them through
+    `predict_fn(records) -> (predictions, preprocess_time, predict_time, model_version)`
+    in a single call. If a batch fails, its records are retried one by one so
+    a bad listing only fails its own request.
+    """
+
+    def __init__(self, predict_fn, window_ms=2.0, max_batch_size=64):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.records = 0
+        self._pid = None
+        self._lock = threading.Lock()
+        self._queue = None
+
+    def _ensure_started(self):
+        """Start the dispatcher thread for the current process"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            thread = threading.Thread(target=self._run, name="predict-batcher", daemon=True)
+            self._pid = os.getpid()
+            thread.start()
+
+    def submit(self, record):
+        """Queue one record and return a Future resolving to a BatchResult"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((record, future, time.time()))
+        return future
+
+    def predict(self, record, timeout=None):
+        """Submit one record and wait for its BatchResult"""
+        return self.submit(record).result(timeout)
+
+    def _run(self):
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            deadline = time.time() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        dispatch_time = time.time()
+        self.batches += 1
+        self.records += len(batch)
+        try:
+            predictions, preprocess_time, predict_time, model_version = self.predict_fn(
+                [b[0] for b in batch]
+            )
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            for item in batch:
+                self._dispatch([item])
+            return
+        for (_, future, queued_at), prediction in zip(batch, predictions):
+            future.set_result(BatchResult(
+                prediction, preprocess_time, predict_time, model_version,
+                len(batch), dispatch_time - queued_at
+            ))
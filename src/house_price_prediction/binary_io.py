@@ -0,0 +1,107 @@
+"""
+Binary batch formats for machine-to-machine scoring
+Arrow IPC streams (needs pyarrow) and NumPy .npz archives decode into
+columns without per-value Python objects; predictions are returned as a
+float64 buffer.
+"""
+import io
+
+import numpy as np
+
+from .transform_plan import CategoricalColumn
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+NPZ = "application/x-npz"
+RAW_FLOAT64 = "application/octet-stream"
+
+BINARY_REQUEST_TYPES = (ARROW_STREAM, NPZ)
+BINARY_RESPONSE_TYPES = (ARROW_STREAM, NPZ, RAW_FLOAT64)
+
+
+class UnsupportedFormat(Exception):
+    """Raised when a binary format can't be handled in this environment"""
+
+
+def _require_arrow():
+    if pa is None:
+        raise UnsupportedFormat("Arrow IPC support requires pyarrow (pip install pyarrow)")
+
+
+def _strings_to_categorical(values):
+    """Fixed-width or object string array -> CategoricalColumn (one Python str per category)"""
+    categories, codes = np.unique(values, return_inverse=True)
+    return CategoricalColumn(codes.astype(np.int64), [str(c) for c in categories])
+
+
+def decode_arrow(body):
+    """Arrow IPC stream -> (columns, n_rows)"""
+    _require_arrow()
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        column = column.combine_chunks()
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = column.dictionary_encode()
+        if pa.types.is_dictionary(column.type):
+            codes = column.indices.to_numpy(zero_copy_only=False)
+            if column.null_count:
+                codes = np.where(column.is_null().to_numpy(zero_copy_only=False), -1, codes)
+            columns[name] = CategoricalColumn(codes.astype(np.int64),
+                                              column.dictionary.to_pylist())
+        elif column.null_count:
+            # Nulls become NaN and are imputed like missing JSON values
+            columns[name] = column.cast(pa.float64()).to_numpy(zero_copy_only=False)
+        else:
+            columns[name] = column.to_numpy(zero_copy_only=False)
+    return columns, table.num_rows
+
+
+def decode_npz(body):
+    """.npz archive of 1-D arrays -> (columns, n_rows)"""
+    columns = {}
+    with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+        for name in archive.files:
+            values = archive[name]
+            if values.ndim != 1:
+                raise ValueError(f"Column '{name}' must be one-dimensional")
+            if values.dtype.kind in "US":
+                columns[name] = _strings_to_categorical(values)
+            else:
+                columns[name] = values
+    lengths = {len(c) for c in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length")
+    return columns, lengths.pop() if lengths else 0
+
+
+def decode_columns(body, mimetype):
+    if mimetype == ARROW_STREAM:
+        return decode_arrow(body)
+    if mimetype == NPZ:
+        return decode_npz(body)
+    raise UnsupportedFormat(f"Unsupported request type {mimetype}")
+
+
+def encode_predictions(predictions, mimetype):
+    """float64 predictions -> response bytes in the negotiated format"""
+    predictions = np.ascontiguousarray(predictions, dtype="<f8")
+    if mimetype == RAW_FLOAT64:
+        return predictions.tobytes()
+    if mimetype == NPZ:
+        buffer = io.BytesIO()
+        np.savez(buffer, predicted_price=predictions)
+        return buffer.getvalue()
+    if mimetype == ARROW_STREAM:
+        _require_arrow()
+        table = pa.table({"predicted_price": pa.array(predictions)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise UnsupportedFormat(f"Unsupported response type {mimetype}")
@@ -0,0 +1,283 @@
+"""
+Vectorised label encoding with a deterministic fallback for unseen values
+Lookup tables are built once per fitted encoder; a column is encoded by
+factorising it, resolving each distinct value once and gathering the codes.
+Vocabularies are held in a StringIndex: a packed UTF-8 string table plus its
+sorted FNV-1a hashes, a few bytes per string instead of a Python object each.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from .packed_arrays import pack_strings, unpack_strings
+
+FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+FNV_PRIME = np.uint64(0x100000001b3)
+
+# What fit_transform's fillna turns missing categorical values into
+MISSING_LABEL = 'Unknown'
+
+
+# Strings hashed together; keeps a block's bytes in cache across byte positions
+HASH_BLOCK = 4096
+
+# String pairs compared together by StringIndex lookups
+VERIFY_BLOCK = 65536
+
+# Up to this many values, StringIndex looks strings up one by one
+SCALAR_LOOKUP = 16
+
+
+def _utf8_matrix(strings):
+    """(n, width) matrix of UTF-8 bytes, zero padded, and each string's byte length"""
+    strings = np.asarray(strings, dtype=str)
+    if strings.dtype.itemsize and len(strings):
+        # ASCII strings: the UTF-32 code units already are the UTF-8 bytes
+        units = strings.astype(strings.dtype.newbyteorder('<')).view('<u4')
+        units = units.reshape(len(strings), -1)
+        if units.max() < 0x80:
+            return units, np.char.str_len(strings)
+    data = np.char.encode(strings, 'utf-8')
+    width = data.dtype.itemsize
+    return data.view(np.uint8).reshape(len(data), width), np.char.str_len(data)
+
+
+def stable_hash(strings):
+    """
+    64-bit FNV-1a of each string's UTF-8 bytes
+    Unlike Python's hash() it is not salted, so every process agrees
+    """
+    octets, lengths = _utf8_matrix(strings)
+    hashes = np.full(len(lengths), FNV_OFFSET, dtype=np.uint64)
+    if not len(lengths) or octets.shape[1] == 0:
+        return hashes
+    # Loop over byte positions (not strings), one block of strings at a time
+    for start in range(0, len(lengths), HASH_BLOCK):
+        block = octets[start:start + HASH_BLOCK]
+        block_lengths = lengths[start:start + HASH_BLOCK]
+        block_hashes = hashes[start:start + HASH_BLOCK]
+        mixed = np.empty_like(block_hashes)
+        for i in range(int(block_lengths.max())):
+            np.bitwise_xor(block_hashes, block[:, i], out=mixed)
+            np.multiply(mixed, FNV_PRIME, out=mixed)
+            np.copyto(block_hashes, mixed, where=block_lengths > i)
+    return hashes
+
+
+def factorize_labels(values):
+    """
+    Distinct str() labels of a column: returns (codes, labels) with
+    labels[codes] giving each row's label. Missing values get code -1, and
+    labels ends with MISSING_LABEL so labels[-1] covers them. Categorical
+    columns are factorised from their codes without building strings.
+    """
+    if not isinstance(values, (pd.Series, pd.Index, pd.Categorical, np.ndarray)):
+        values = np.asarray(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    if pd.api.types.is_string_dtype(uniques) and not isinstance(uniques.dtype, pd.CategoricalDtype):
+        labels = np.asarray(uniques, dtype=object)
+    else:
+        labels = np.array([str(v) for v in uniques], dtype=object)
+    return codes, np.append(labels, MISSING_LABEL)
+
+
+def hash_string_table(blob, offsets):
+    """
+    stable_hash of every string in a table written by pack_strings,
+    computed on the UTF-8 bytes in place. Strings are visited longest first,
+    so the ones still being hashed at byte i are always a prefix.
+    """
+    starts = np.asarray(offsets[:-1], dtype=np.int64)
+    lengths = np.diff(np.asarray(offsets, dtype=np.int64))
+    order = np.argsort(-lengths, kind='stable')
+    starts, lengths = starts[order], lengths[order]
+    hashes = np.full(len(lengths), FNV_OFFSET, dtype=np.uint64)
+    # How many strings are longer than i, for every byte position i
+    longer = np.searchsorted(-lengths, -np.arange(lengths[0] if len(lengths) else 0), side='left')
+    for i, active in enumerate(longer.tolist()):
+        head = hashes[:active]
+        np.bitwise_xor(head, blob[starts[:active] + i], out=head)
+        np.multiply(head, FNV_PRIME, out=head)
+    out = np.empty_like(hashes)
+    out[order] = hashes
+    return out
+
+
+class StringIndex:
+    """
+    Immutable str -> id index over a string table
+    Ids are positions in the table. The index is the table's FNV-1a hashes
+    in sorted order with the matching ids, so a lookup is a binary search
+    whose hit is then checked byte for byte against the table. All arrays
+    may be read-only views of a memory-mapped artifact.
+    """
+
+    def __init__(self, blob, offsets, hashes=None, ids=None):
+        self.blob = blob
+        self.offsets = offsets
+        if hashes is None:
+            hashes = hash_string_table(blob, offsets)
+            ids = np.argsort(hashes, kind='stable').astype(np.uint32)
+            hashes = hashes[ids]
+        self.hashes = hashes
+        self.ids = ids
+
+    @classmethod
+    def from_strings(cls, strings):
+        return cls(*pack_strings(strings))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.blob, self.offsets, self.hashes, self.ids))
+
+    def strings(self):
+        """Every string in id order, as a list of str"""
+        return unpack_strings(self.blob, self.offsets)
+
+    def locate(self, blob, offsets, hashes):
+        """
+        Ids (int64, -1 if absent) of the strings in a query table with the
+        given hashes (see hash_string_table)
+        """
+        found = np.full(len(hashes), -1, dtype=np.int64)
+        if not len(self) or not len(hashes):
+            return found
+        # Sorted keys make the binary searches cache friendly
+        order = np.argsort(hashes)
+        slot = np.empty(len(hashes), dtype=np.int64)
+        slot[order] = np.searchsorted(self.hashes, hashes[order])
+        pending = np.flatnonzero(slot < len(self.hashes))
+        # Several known strings can share a hash: try each of them in turn
+        while len(pending):
+            pending = pending[self.hashes[slot[pending]] == hashes[pending]]
+            candidate = self.ids[slot[pending]].astype(np.int64)
+            match = self._equal(blob, offsets, pending, candidate)
+            found[pending[match]] = candidate[match]
+            pending = pending[~match]
+            slot[pending] += 1
+            pending = pending[slot[pending] < len(self.hashes)]
+        return found
+
+    def _equal(self, blob, offsets, queries, ids):
+        """Whether query string queries[k] has the same bytes as string ids[k]"""
+        offsets = np.asarray(offsets, dtype=np.int64)
+        same = np.empty(len(queries), dtype=bool)
+        # Blocks of pairs bound the size of the flat byte positions
+        for start in range(0, len(queries), VERIFY_BLOCK):
+            block = slice(start, start + VERIFY_BLOCK)
+            q_start = offsets[queries[block]]
+            q_len = offsets[queries[block] + 1] - q_start
+            t_start = self.offsets[ids[block]].astype(np.int64)
+            t_len = self.offsets[ids[block] + 1].astype(np.int64) - t_start
+            equal = q_len == t_len
+            # Compare all bytes of the same-length pairs in one flat pass
+            lengths = np.where(equal, q_len, 0)
+            ends = np.cumsum(lengths)
+            q_pos = np.arange(ends[-1]) + np.repeat(q_start - (ends - lengths), lengths)
+            t_pos = q_pos + np.repeat(t_start - q_start, lengths)
+            differs = np.flatnonzero(blob[q_pos] != self.blob[t_pos])
+            # Byte k belongs to the first pair whose bytes end after it
+            equal[np.searchsorted(ends, differs, side='right')] = False
+            same[block] = equal
+        return same
+
+    def _find(self, data):
+        """Id of one UTF-8 encoded string (-1 if absent) and its stable hash"""
+        h = int(FNV_OFFSET)
+        for byte in data:
+            h = ((h ^ byte) * int(FNV_PRIME)) & 0xFFFFFFFFFFFFFFFF
+        slot = int(np.searchsorted(self.hashes, np.uint64(h)))
+        while slot < len(self.hashes) and int(self.hashes[slot]) == h:
+            i = int(self.ids[slot])
+            if self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes() == data:
+                return i, h
+            slot += 1
+        return -1, h
+
+    def get_indexer(self, values):
+        """Ids of a sequence of strings (-1 if absent) and their stable hashes"""
+        if len(values) <= SCALAR_LOOKUP:
+            # A handful of values (a single listing): plain Python is quicker
+            found = [self._find(str(v).encode('utf-8')) for v in values]
+            return (np.array([i for i, _ in found], dtype=np.int64),
+                    np.array([h for _, h in found], dtype=np.uint64))
+        blob, offsets = pack_strings(values)
+        hashes = hash_string_table(blob, offsets)
+        return self.locate(blob, offsets, hashes), hashes
+
+
+class IndexedLabelEncoder(LabelEncoder):
+    """
+    Fitted LabelEncoder backed by a StringIndex
+    classes_ is decoded from the index the first time it is read; until
+    then the vocabulary costs no Python objects. Refitting drops the index,
+    and the encoder pickles as a plain LabelEncoder.
+    """
+
+    @classmethod
+    def from_index(cls, index):
+        encoder = cls()
+        encoder.string_index = index
+        return encoder
+
+    def __getattr__(self, name):
+        if name == 'classes_' and 'string_index' in self.__dict__:
+            self.classes_ = np.array(self.string_index.strings(), dtype=object)
+            return self.classes_
+        raise AttributeError(name)
+
+    def __sklearn_is_fitted__(self):
+        return 'string_index' in self.__dict__ or 'classes_' in self.__dict__
+
+    def fit(self, y):
+        self.__dict__.pop('string_index', None)
+        return super().fit(y)
+
+    def fit_transform(self, y):
+        self.__dict__.pop('string_index', None)
+        return super().fit_transform(y)
+
+    def __reduce_ex__(self, protocol):
+        encoder = LabelEncoder()
+        if self.__sklearn_is_fitted__():
+            encoder.classes_ = self.classes_
+        return LabelEncoder, (), encoder.__getstate__()
+
+
+class CategoryTable:
+    """
+    String -> int lookup for one fitted LabelEncoder
+    Known values get their LabelEncoder code; unseen values get
+    max_known + 1 + stable_hash(value) % (max_known + 1000)
+    """
+
+    def __init__(self, classes):
+        # LabelEncoder codes are positions in classes_, i.e. StringIndex ids
+        self.index = classes if isinstance(classes, StringIndex) else StringIndex.from_strings(classes)
+        self.max_known = len(self.index) - 1
+
+    @classmethod
+    def from_encoder(cls, encoder):
+        # Encoders restored from a packed artifact carry their index already
+        index = getattr(encoder, 'string_index', None)
+        return cls(index if index is not None else encoder.classes_)
+
+    def encode_unique(self, values):
+        """int64 codes for a sequence of strings (best called on distinct values)"""
+        codes, hashes = self.index.get_indexer(values)
+        unseen = codes < 0
+        if unseen.any():
+            spread = np.uint64(self.max_known + 1000)
+            codes[unseen] = self.max_known + 1 + (hashes[unseen] % spread).astype(np.int64)
+        return codes
+
+    def encode(self, values):
+        """
+        int64 codes for a column of values, converted with str() like
+        LabelEncoder saw them during fit (missing values become MISSING_LABEL)
+        """
+        codes, labels = factorize_labels(values)
+        return self.encode_unique(labels)[codes]
@@ -0,0 +1,153 @@
+"""
+Fit-time column plan for HousePricePreprocessor
+Records each output feature's role, position, fill value and scaling so
+transform is a fixed sequence of indexed array operations. Saved with the
+preprocessor as a plain dict; derived from the fitted imputer/scaler/encoders
+for artifacts written before it existed.
+"""
+import numpy as np
+
+COLUMN_PLAN_VERSION = 1
+
+# Rows per impute_scale step; a step's values and mask stay in cache
+KERNEL_ROWS = 8192
+
+
+def impute_scale(values, fill_values, means, scales, out=None):
+    """
+    Fused SimpleImputer(median) + StandardScaler for a (n_rows, n_cols) block:
+    out = (where(isnan(x), fill, x) - mean) / scale
+
+    Works through cache-sized row chunks, so memory is traversed once instead
+    of once per operation. NaNs propagate through the arithmetic and are then
+    patched with the pre-scaled fill value, which gives the same bits as
+    imputing first. Pass out=values to transform in place.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(values)
+    scaled_fill = (np.asarray(fill_values, dtype=np.float64) - means) / scales
+    mask = np.empty((min(KERNEL_ROWS, len(values)),) + values.shape[1:], dtype=bool)
+    for start in range(0, len(values), KERNEL_ROWS):
+        stop = min(start + KERNEL_ROWS, len(values))
+        chunk = out[start:stop]
+        np.subtract(values[start:stop], means, out=chunk)
+        np.divide(chunk, scales, out=chunk)
+        nan = mask[:stop - start]
+        np.isnan(chunk, out=nan)
+        if nan.any():
+            np.copyto(chunk, np.broadcast_to(scaled_fill, chunk.shape), where=nan)
+    return out
+
+
+def impute_scale_columns(columns, fill_values, means, scales, out, idx):
+    """
+    impute_scale over separate 1-D source columns (None for an absent one,
+    which counts as missing), writing column idx[j] of `out`
+
+    Each KERNEL_ROWS chunk of the sources is gathered into a float64 scratch
+    block and computed there, so the arithmetic is float64 whatever `out`
+    holds (a float32 `out` just stores the rounded result), and no full-size
+    float64 copy of the input is made.
+    """
+    n_rows = len(out)
+    scratch = np.empty((min(KERNEL_ROWS, n_rows), len(columns)), dtype=np.float64, order='F')
+    for start in range(0, n_rows, KERNEL_ROWS):
+        stop = min(start + KERNEL_ROWS, n_rows)
+        block = scratch[:stop - start]
+        for j, column in enumerate(columns):
+            block[:, j] = np.nan if column is None else column[start:stop]
+        impute_scale(block, fill_values, means, scales, out=block)
+        for j, i in enumerate(idx):
+            out[start:stop, i] = block[:, j]
+    return out
+
+
+class ColumnPlan:
+    """
+    Column roles and parameters in output-feature order
+
+    numeric:      imputed with `fill_values`, then (x - means) / scales where
+                  `scaled` is set (means 0 / scales 1 elsewhere)
+    categorical:  label encoded; `categorical_fill` if the column is absent
+    """
+
+    def __init__(self, feature_names, numeric_cols, fill_values, scaled, means, scales,
+                 categorical_cols, categorical_fill=0.0):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        position = {name: i for i, name in enumerate(self.feature_names)}
+
+        self.numeric_cols = list(numeric_cols)
+        self.numeric_idx = np.array([position[c] for c in self.numeric_cols], dtype=np.intp)
+        self.fill_values = np.asarray(fill_values, dtype=np.float64)
+        self.scaled = np.asarray(scaled, dtype=bool)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+
+        self.categorical_cols = list(categorical_cols)
+        self.categorical_idx = np.array([position[c] for c in self.categorical_cols], dtype=np.intp)
+        self.categorical_fill = float(categorical_fill)
+
+    @classmethod
+    def from_fitted(cls, preprocessor):
+        """Derive the plan from a fitted preprocessor's imputer, scaler and encoders"""
+        feature_names = list(preprocessor.feature_names)
+        in_output = set(feature_names)
+
+        imputer = preprocessor.imputer
+        imputed = list(getattr(imputer, 'feature_names_in_', []))
+        if not imputed:
+            imputed = [f for f in feature_names if f not in preprocessor.categorical_features]
+        medians = dict(zip(imputed, imputer.statistics_))
+
+        scaler = preprocessor.scaler
+        scaled = list(getattr(scaler, 'feature_names_in_', []))
+        if not scaled:
+            scaled = [f for f in imputed if f not in preprocessor.categorical_features]
+        n_scaled = len(scaled)
+        means = scaler.mean_ if scaler.with_mean else np.zeros(n_scaled)
+        scales = scaler.scale_ if scaler.with_std else np.ones(n_scaled)
+        scale_params = {col: (means[i], scales[i]) for i, col in enumerate(scaled)}
+
+        numeric_cols = [c for c in imputed if c in in_output]
+        return cls(
+            feature_names,
+            numeric_cols,
+            fill_values=[medians[c] for c in numeric_cols],
+            scaled=[c in scale_params for c in numeric_cols],
+            means=[scale_params[c][0] if c in scale_params else 0.0 for c in numeric_cols],
+            scales=[scale_params[c][1] if c in scale_params else 1.0 for c in numeric_cols],
+            categorical_cols=[c for c in feature_names if c in preprocessor.label_encoders],
+        )
+
+    def to_dict(self):
+        """Plain-Python form stored in the preprocessor artifact"""
+        return {
+            'version': COLUMN_PLAN_VERSION,
+            'feature_names': self.feature_names,
+            'numeric_cols': self.numeric_cols,
+            'fill_values': self.fill_values.tolist(),
+            'scaled': self.scaled.tolist(),
+            'means': self.means.tolist(),
+            'scales': self.scales.tolist(),
+            'categorical_cols': self.categorical_cols,
+            'categorical_fill': self.categorical_fill,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version', 0) > COLUMN_PLAN_VERSION:
+            raise ValueError(f"Unsupported column plan version {data['version']}")
+        return cls(data['feature_names'], data['numeric_cols'], data['fill_values'],
+                   data['scaled'], data['means'], data['scales'],
+                   data['categorical_cols'], data.get('categorical_fill', 0.0))
+
+    def impute_and_scale(self, values, out=None):
+        """(n_rows, n_numeric) raw values -> imputed, scaled block (see impute_scale)"""
+        return impute_scale(values, self.fill_values, self.means, self.scales, out=out)
+
+    def impute_and_scale_into(self, columns, out):
+        """Source columns in numeric_cols order -> their slots in `out` (see impute_scale_columns)"""
+        return impute_scale_columns(columns, self.fill_values, self.means, self.scales,
+                                    out, self.numeric_idx)
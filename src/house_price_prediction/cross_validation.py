@@ -0,0 +1,174 @@
+"""
+Parallel K-fold cross-validation with a per-city error breakdown
+Folds are split by row or, grouped by CITY_NAME, so that every city is
+scored by a model that never saw it. Each fold fits its own preprocessor on
+its training rows, then the model, on a process pool. The raw listings are
+written once to an uncompressed Feather file that every worker
+memory-maps (with pyarrow; otherwise each worker gets one pickled copy),
+so folds share the data through the page cache. Every fold reports its
+wall time and peak memory.
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import GroupKFold, KFold
+from threadpoolctl import threadpool_limits
+
+from .data_loading import feather, read_feather_mapped, write_feather
+from .engines import model_params
+from .preprocessing import HousePricePreprocessor
+
+# Column of the shared frame holding the target
+TARGET = '__target__'
+
+GROUP_COLUMN = 'CITY_NAME'
+
+
+def regression_metrics(y_true, y_pred):
+    """n, RMSE, MAE and R² (None below two rows) as plain floats"""
+    y_true, y_pred = np.asarray(y_true, dtype=np.float64), np.asarray(y_pred, dtype=np.float64)
+    return {
+        'n': int(len(y_true)),
+        'rmse': float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+        'r2': float(r2_score(y_true, y_pred)) if len(y_true) > 1 else None,
+    }
+
+
+def metrics_by_city(cities, y_true, y_pred):
+    """regression_metrics for every CITY_NAME value, in name order"""
+    frame = pd.DataFrame({'city': np.asarray(cities, dtype=object).astype(str),
+                          'y': np.asarray(y_true), 'pred': np.asarray(y_pred)})
+    return {city: regression_metrics(group['y'], group['pred'])
+            for city, group in frame.groupby('city', sort=True)}
+
+
+def fold_indices(X, k=5, group_by_city=False, random_state=42):
+    """(train rows, test rows) position arrays of each fold"""
+    if group_by_city:
+        if GROUP_COLUMN not in X.columns:
+            raise ValueError(f"Grouped folds need a {GROUP_COLUMN} column")
+        groups = np.asarray(X[GROUP_COLUMN], dtype=object).astype(str)
+        n_groups = len(np.unique(groups))
+        if n_groups < k:
+            raise ValueError(f"{k} folds need at least {k} cities, found {n_groups}")
+        return list(GroupKFold(n_splits=k).split(X, groups=groups))
+    return list(KFold(n_splits=k, shuffle=True, random_state=random_state).split(X))
+
+
+def _peak_rss_mb():
+    """VmHWM of this process in MB (None where /proc is not available)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def _reset_peak_rss():
+    """Restart VmHWM from the current RSS (Linux), so it measures one fold"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+# Worker-side view of the shared listings (set once per process by _attach)
+_shared = {}
+
+
+def _attach(source):
+    """Pool initializer: map the Feather file (or take the pickled frame)"""
+    frame = read_feather_mapped(source) if isinstance(source, (str, Path)) else source
+    _shared['y'] = frame.pop(TARGET).to_numpy(dtype=np.float64)
+    _shared['X'] = frame
+
+
+def _run_fold(fold, train_rows, test_rows, estimator, dtype='float64'):
+    """Fit preprocessor and model on one fold's training rows; score its test rows"""
+    _reset_peak_rss()
+    start = time.perf_counter()
+    X, y = _shared['X'], _shared['y']
+    X_train, X_test = X.iloc[train_rows], X.iloc[test_rows]
+    preprocessor = HousePricePreprocessor(dtype=dtype)
+    X_train_processed = preprocessor.fit_transform(X_train)
+    model = clone(estimator)
+    # Folds already run in parallel; OpenMP/BLAS threads would oversubscribe
+    with threadpool_limits(1):
+        model.fit(X_train_processed, y[train_rows])
+        predictions = model.predict(preprocessor.transform(X_test))
+    record = {
+        'fold': fold,
+        'n_train': int(len(train_rows)),
+        'n_test': int(len(test_rows)),
+        'metrics': regression_metrics(y[test_rows], predictions),
+        'cities': (metrics_by_city(X_test[GROUP_COLUMN], y[test_rows], predictions)
+                   if GROUP_COLUMN in X_test.columns else {}),
+        'wall_s': time.perf_counter() - start,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+    return record, predictions
+
+
+def cross_validate(X, y, estimator, k=5, group_by_city=False, workers=None, work_dir=None,
+                   random_state=42, dtype='float64'):
+    """
+    K-fold cross-validation of `estimator` on raw listings X (before
+    preprocessing) and targets y. Returns the report: per-fold records
+    (metrics, per-city metrics, wall time, peak RSS), metrics over all
+    out-of-fold predictions overall and per CITY_NAME, and the mean and
+    standard deviation of the fold metrics.
+    """
+    X = X.reset_index(drop=True)
+    y = np.asarray(y, dtype=np.float64)
+    folds = fold_indices(X, k, group_by_city, random_state)
+    # Parallelism is across folds, so each fit is single-threaded
+    estimator = clone(estimator)
+    if 'n_jobs' in estimator.get_params():
+        estimator.set_params(n_jobs=1)
+
+    if work_dir is not None:
+        Path(work_dir).mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=work_dir, prefix='cv-') as tmp:
+        source = X.assign(**{TARGET: y})
+        if feather is not None:
+            path = Path(tmp) / 'listings.feather'
+            write_feather(source, path)
+            source = path
+        predictions = np.empty(len(y))
+        with ProcessPoolExecutor(max_workers=workers or min(k, os.cpu_count()),
+                                 initializer=_attach, initargs=(source,)) as pool:
+            futures = [pool.submit(_run_fold, fold, train_rows, test_rows, estimator, dtype)
+                       for fold, (train_rows, test_rows) in enumerate(folds)]
+            records = []
+            for future, (_, test_rows) in zip(futures, folds):
+                record, fold_predictions = future.result()
+                predictions[test_rows] = fold_predictions
+                records.append(record)
+
+    fold_metrics = pd.DataFrame([r['metrics'] for r in records])[['rmse', 'mae', 'r2']]
+    return {
+        'k': k,
+        'group_by_city': group_by_city,
+        'model_type': type(estimator).__name__,
+        'params': model_params(estimator),
+        'n_rows': int(len(y)),
+        'elapsed_s': time.perf_counter() - start,
+        'overall': regression_metrics(y, predictions),
+        'fold_mean': fold_metrics.mean().to_dict(),
+        'fold_std': fold_metrics.std(ddof=0).to_dict(),
+        'folds': records,
+        'cities': (metrics_by_city(X[GROUP_COLUMN], y, predictions)
+                   if GROUP_COLUMN in X.columns else {}),
+    }
@@ -0,0 +1,191 @@
+"""
+Typed, chunked reading of training CSVs and a columnar cache of the result
+The encoding is detected from the first bytes of the file instead of by
+re-parsing it once per candidate. Columns are read with an explicit schema:
+the low-cardinality listing fields become categoricals, flags and counts
+float32, strings a string dtype (Arrow-backed when pyarrow is installed).
+The parsed frame can be saved once as an uncompressed Feather file that
+later runs memory-map instead of parsing the CSV again (needs pyarrow).
+"""
+import codecs
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .feature_cache import remembered_digest
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - optional dependency
+    pa = feather = None
+
+# Bytes of the file the encoding is decided on
+ENCODING_SAMPLE_BYTES = 1 << 16
+
+# Rows parsed per chunk
+CHUNK_ROWS = 100_000
+
+# Bump when the schema or the reading changes what a cached frame holds
+LOADER_VERSION = 1
+
+# dtypes of the listing columns; others are left to pandas. float32 holds
+# the 0/1 flags and room counts exactly and still allows missing values.
+SCHEMA = {
+    'POSTED_BY': 'category',
+    'BHK_OR_RK': 'category',
+    'CITY_NAME': 'category',
+    'UNDER_CONSTRUCTION': 'float32',
+    'RERA': 'float32',
+    'BHK_NO.': 'float32',
+    'READY_TO_MOVE': 'float32',
+    'RESALE': 'float32',
+    'bedrooms': 'float32',
+    'SQUARE_FT': 'float64',
+    'LONGITUDE': 'float64',
+    'LATITUDE': 'float64',
+    'area': 'float64',
+    'longitude': 'float64',
+    'latitude': 'float64',
+    'ADDRESS': 'str',
+}
+
+
+def detect_encoding(path, sample_bytes=ENCODING_SAMPLE_BYTES):
+    """'utf-8-sig', 'utf-8' or 'latin-1', from the first sample_bytes of a file"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # final=False: a character cut off by the end of the sample is fine
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'utf-8'
+
+
+def read_csv_chunks(path, chunksize=CHUNK_ROWS, schema=SCHEMA, encoding=None):
+    """
+    DataFrame chunks of a CSV, typed by schema (columns it does not name
+    are inferred). If bytes past the sample turn out not to be UTF-8, the
+    rest of the file is read as latin-1, like the old fallback did.
+    """
+    encoding = encoding or detect_encoding(path)
+    rows = 0
+    while True:
+        try:
+            # Rows already handed out are skipped after a fallback
+            start = rows
+            with pd.read_csv(path, encoding=encoding, dtype=schema, chunksize=chunksize,
+                             skiprows=range(1, start + 1)) as reader:
+                for chunk in reader:
+                    chunk.index += start
+                    rows += len(chunk)
+                    yield chunk
+            return
+        except UnicodeDecodeError:
+            if encoding == 'latin-1':
+                raise
+            encoding = 'latin-1'
+
+
+def concat_chunks(chunks):
+    """
+    One frame from typed chunks; each categorical column gets the sorted
+    union of the chunks' categories, as a single read would give it
+    """
+    chunks = list(chunks)
+    if not chunks:
+        raise ValueError("No rows to concatenate")
+    categorical = [col for col, dtype in chunks[0].dtypes.items()
+                   if isinstance(dtype, pd.CategoricalDtype)]
+    for col in categorical:
+        categories = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_training_csv(path, chunksize=CHUNK_ROWS, schema=SCHEMA, encoding=None):
+    """The whole CSV as one typed DataFrame, parsed chunk by chunk"""
+    return concat_chunks(read_csv_chunks(path, chunksize, schema, encoding))
+
+
+def read_feather_mapped(path):
+    """DataFrame over a memory-mapped, uncompressed Feather file"""
+    # split_blocks keeps numeric columns as views of the mapped buffers
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+
+def write_feather(frame, path):
+    """Write a frame as uncompressed Feather (so it can be mapped)"""
+    # One record batch: a column split across batches is concatenated, i.e.
+    # copied out of the map, when it is converted to pandas
+    table = pa.Table.from_pandas(frame, preserve_index=False).combine_chunks()
+    feather.write_feather(table, path, compression='uncompressed', chunksize=max(table.num_rows, 1))
+
+
+class FrameCache:
+    """
+    Directory of parsed training frames, one Feather file per data file
+    contents, schema and loader version. Without pyarrow nothing is cached.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    @property
+    def available(self):
+        return feather is not None
+
+    def key(self, data_path, schema=SCHEMA):
+        parts = {
+            'loader_version': LOADER_VERSION,
+            'data_sha256': remembered_digest(data_path, self.root / 'file_hashes.json'),
+            'schema': schema,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+    def path(self, key):
+        return self.root / f'{key}.feather'
+
+    def load(self, key):
+        """The cached frame over a read-only memory map, or None"""
+        path = self.path(key)
+        if not self.available or not path.exists():
+            return None
+        return read_feather_mapped(path)
+
+    def store(self, key, frame):
+        """Write a frame uncompressed (so it can be mapped) and atomically"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f'.{key}.{uuid.uuid4().hex}.tmp'
+        try:
+            write_feather(frame, tmp)
+            os.replace(tmp, self.path(key))
+        finally:
+            tmp.unlink(missing_ok=True)
+        return self.path(key)
+
+
+def load_training_frame(path, cache_dir=None, chunksize=CHUNK_ROWS, schema=SCHEMA):
+    """
+    (typed frame of a training CSV, whether it came from the cache); with
+    cache_dir, the frame is parsed once and memory-mapped on later calls
+    """
+    cache = FrameCache(cache_dir) if cache_dir else None
+    if cache is None or not cache.available:
+        return read_training_csv(path, chunksize, schema), False
+    key = cache.key(path, schema)
+    frame = cache.load(key)
+    if frame is not None:
+        return frame, True
+    frame = read_training_csv(path, chunksize, schema)
+    cache.store(key, frame)
+    return frame, False
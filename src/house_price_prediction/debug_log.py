@@ -0,0 +1,187 @@
+"""
+Asynchronous NDJSON debug log
+Request threads only enqueue records; a background thread writes them in batches
+"""
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+import warnings
+from pathlib import Path
+
+LOG_PATH = Path(os.environ.get("HPP_LOG_PATH", "debug.log"))
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+
+class AsyncLogWriter:
+    """
+    Queue-backed NDJSON writer with batching, size rotation and sampling
+
+    Records below `level` are dropped, and records below WARNING are kept
+    with probability `sample_rate`. The writer thread is (re)started lazily
+    in each process, so it is safe to create before gunicorn forks.
+    """
+
+    def __init__(self, path=LOG_PATH, level="DEBUG", sample_rate=1.0,
+                 max_bytes=10 * 1024 * 1024, backup_count=3,
+                 batch_size=256, flush_interval=0.5, queue_size=10000):
+        self.path = Path(path)
+        self.level = LEVELS[level.upper()]
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._pid = None
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._closed = False
+
+    def _ensure_started(self):
+        """Start the writer thread for the current process"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(target=self._run, name="debug-log-writer", daemon=True)
+            self._pid = os.getpid()
+            self._closed = False
+            self._thread.start()
+
+    def write(self, entry, level="DEBUG"):
+        """
+        Enqueue one record; never touches the file on the calling thread
+        (after close() the record is dropped with a RuntimeWarning)
+        """
+        severity = LEVELS.get(level.upper(), LEVELS["DEBUG"])
+        if severity < self.level:
+            return
+        if severity < LEVELS["WARNING"] and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        self._ensure_started()
+        if self._closed:
+            # Nothing would ever write it; say so rather than lose it silently
+            self.dropped += 1
+            warnings.warn("debug log writer is closed; record dropped", RuntimeWarning, stacklevel=2)
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        q = self._queue
+        while True:
+            batch = []
+            try:
+                item = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            stop = item is None
+            if not stop:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write_batch(batch)
+            for _ in range(len(batch) + stop):
+                q.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        lines = "".join(json.dumps(entry, default=str) + "\n" for entry in batch)
+        try:
+            self._rotate_if_needed()
+            # One append per batch keeps lines from different workers intact
+            with open(self.path, "a") as f:
+                f.write(lines)
+        except OSError:
+            self.dropped += len(batch)
+
+    def _rotate_if_needed(self):
+        if not self.max_bytes:
+            return
+        try:
+            if self.path.stat().st_size < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        if self._pid == os.getpid() and not self._closed:
+            self._queue.join()
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        if self._pid != os.getpid() or self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+def _writer_from_env():
+    return AsyncLogWriter(
+        path=LOG_PATH,
+        level=os.environ.get("HPP_LOG_LEVEL", "DEBUG"),
+        sample_rate=float(os.environ.get("HPP_LOG_SAMPLE_RATE", "1.0")),
+        max_bytes=int(os.environ.get("HPP_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+        backup_count=int(os.environ.get("HPP_LOG_BACKUPS", "3")),
+    )
+
+
+_writer = _writer_from_env()
+atexit.register(lambda: _writer.close())
+
+
+def configure(**kwargs):
+    """Replace the shared writer (flushing the old one first)"""
+    global _writer
+    _writer.close()
+    _writer = AsyncLogWriter(**kwargs)
+    return _writer
+
+
+def get_writer():
+    return _writer
+
+
+def log_entry(session_id, run_id, hypothesis_id, location, message, data, level="DEBUG"):
+    """Queue a log entry in NDJSON format"""
+    entry = {
+        "sessionId": session_id,
+        "runId": run_id,
+        "hypothesisId": hypothesis_id,
+        "location": location,
+        "message": message,
+        "data": data,
+        "level": level,
+        "timestamp": int(time.time() * 1000)
+    }
+    _writer.write(entry, level)
@@ -0,0 +1,94 @@
+"""
+Model engines train_model.py can fit, and how the API describes them
+"forest" is the RandomForestRegressor the project always shipped;
+"hist-gradient-boosting" bins features into histograms, splits the
+label-encoded CITY_NAME / POSTED_BY / BHK_OR_RK columns as categories and
+stops adding trees once a held-out share of the training data stops
+improving.
+"""
+from sklearn.ensemble import (GradientBoostingRegressor, HistGradientBoostingRegressor,
+                              RandomForestRegressor)
+
+ENGINES = {
+    'forest': 'RandomForestRegressor',
+    'gradient-boosting': 'GradientBoostingRegressor',
+    'hist-gradient-boosting': 'HistGradientBoostingRegressor',
+}
+
+# Label-encoded columns that HistGradientBoosting splits on as categories
+NATIVE_CATEGORICAL = ('CITY_NAME', 'POSTED_BY', 'BHK_OR_RK')
+
+# HistGradientBoosting handles at most this many categories per feature
+MAX_CATEGORIES = 255
+
+
+def native_categorical(X_train, columns=NATIVE_CATEGORICAL):
+    """
+    (columns of X_train to split on as categories, {column: cardinality}
+    of those left numeric because they have too many categories)
+    """
+    categorical, too_many = [], {}
+    for col in columns:
+        if X_train is None or col not in getattr(X_train, 'columns', ()):
+            continue
+        cardinality = X_train[col].nunique()
+        if cardinality <= MAX_CATEGORIES:
+            categorical.append(col)
+        else:
+            too_many[col] = cardinality
+    return categorical, too_many
+
+
+def build_engine(engine, X_train=None, random_state=42):
+    """Unfitted estimator for an engine name (see ENGINES) with the project's defaults"""
+    if engine == 'forest':
+        return RandomForestRegressor(n_estimators=100, max_depth=20, min_samples_split=5,
+                                     min_samples_leaf=2, random_state=random_state, n_jobs=-1)
+    if engine == 'gradient-boosting':
+        return GradientBoostingRegressor(n_estimators=100, random_state=random_state)
+    if engine == 'hist-gradient-boosting':
+        categorical, _ = native_categorical(X_train)
+        return HistGradientBoostingRegressor(
+            max_iter=1000, learning_rate=0.1, max_leaf_nodes=63, min_samples_leaf=20,
+            categorical_features=categorical or None,
+            early_stopping=True, validation_fraction=0.1, n_iter_no_change=20,
+            random_state=random_state,
+        )
+    raise ValueError(f"Unknown engine {engine!r}; expected one of {sorted(ENGINES)}")
+
+
+def engine_name(model):
+    """Engine name of a fitted model (also a TreeEnsemble compiled from one)"""
+    model_type = getattr(model, 'model_type', None) or type(model).__name__
+    for name, type_name in ENGINES.items():
+        if type_name == model_type:
+            return name
+    return model_type
+
+
+def model_params(estimator):
+    """JSON-friendly get_params() of an estimator"""
+    def plain(value):
+        if isinstance(value, (list, tuple)):
+            return all(plain(v) for v in value)
+        return value is None or isinstance(value, (str, int, float, bool))
+    return {k: list(v) if isinstance(v, tuple) else v
+            for k, v in estimator.get_params().items() if plain(v)}
+
+
+def engine_params(model):
+    """
+    The engine's own parameters for /model/info, plus what fitting decided
+    (boosting iterations after early stopping, categorical features).
+    A memory-mapped forest only knows its shape.
+    """
+    estimator = model if hasattr(model, 'get_params') else getattr(model, 'estimator', None)
+    if estimator is None:
+        return {'n_estimators': model.n_estimators, 'max_depth': model.max_depth}
+    params = model_params(estimator)
+    if hasattr(estimator, 'n_iter_'):
+        params['n_iter_'] = int(estimator.n_iter_)
+    if getattr(estimator, 'is_categorical_', None) is not None:
+        names = getattr(estimator, 'feature_names_in_', range(len(estimator.is_categorical_)))
+        params['categorical_features_in'] = [str(n) for n, c in zip(names, estimator.is_categorical_) if c]
+    return params
@@ -0,0 +1,165 @@
+"""
+Content-addressed cache of preprocessed training matrices
+An entry is keyed by the data file's SHA-256, the split/preprocessing
+parameters and a hash of the preprocessor source code, and holds the
+processed train/test matrices as packed arrays (memory-mapped on load) plus
+the fitted preprocessor as a packed artifact (preprocessor_store). Entries are built in a staging directory and
+renamed into place, so a crashed run never leaves a half-written entry.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from .packed_arrays import read_packed, write_packed
+
+CACHE_VERSION = 2
+
+# Modules whose code determines the processed features; data_loading's
+# schema and dtypes decide what the preprocessor is given
+PREPROCESSOR_MODULES = ('preprocessing.py', 'feature_engineering.py', 'category_encoding.py',
+                        'column_plan.py', 'streaming_fit.py', 'data_loading.py')
+
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def preprocessor_code_version():
+    """SHA-256 over the source of PREPROCESSOR_MODULES"""
+    digest = hashlib.sha256()
+    package = Path(__file__).parent
+    for name in PREPROCESSOR_MODULES:
+        digest.update(name.encode('utf-8'))
+        digest.update((package / name).read_bytes())
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of a file, read in 1 MiB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def remembered_digest(data_path, index_path):
+    """
+    file_digest of data_path, looked up in (and added to) the JSON index at
+    index_path, where it is stored with the file's size and mtime
+    """
+    path = Path(data_path).resolve()
+    stat = path.stat()
+    index_path = Path(index_path)
+    try:
+        index = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        index = {}
+    known = index.get(str(path))
+    if known and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return known[2]
+    digest = file_digest(path)
+    index[str(path)] = [stat.st_size, stat.st_mtime_ns, digest]
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = index_path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+    tmp.write_text(json.dumps(index))
+    os.replace(tmp, index_path)
+    return digest
+
+
+class FeatureCache:
+    """
+    Directory of cache entries, one subdirectory per key:
+    X_train.bin / X_test.bin ('features', header lists feature_names),
+    y_train.bin / y_test.bin ('target'), preprocessor.packed, manifest.json
+    """
+
+    ARRAYS = ('X_train', 'y_train', 'X_test', 'y_test')
+    PREPROCESSOR_FILE = 'preprocessor.packed'
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def data_digest(self, data_path):
+        """
+        Content hash of the data file, remembered by (size, mtime) so an
+        unchanged file is hashed only once
+        """
+        return remembered_digest(data_path, self.root / 'file_hashes.json')
+
+    def key(self, data_path, **params):
+        """
+        (key, parts) for this data file and these split/preprocessing
+        parameters; parts is what the key hashes, for the entry's manifest
+        """
+        parts = {
+            'cache_version': CACHE_VERSION,
+            'data_sha256': self.data_digest(data_path),
+            'preprocessor_code': preprocessor_code_version(),
+            'params': params,
+        }
+        encoded = json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:32], parts
+
+    def path(self, key):
+        return self.root / key
+
+    def load(self, key):
+        """
+        (preprocessor, X_train, y_train, X_test, y_test) for a cached key, or
+        None. Matrices are DataFrames over read-only memory maps.
+        """
+        from .preprocessing import HousePricePreprocessor
+
+        entry = self.path(key)
+        if not (entry / 'manifest.json').exists():
+            return None
+        preprocessor = HousePricePreprocessor()
+        preprocessor.load(entry / self.PREPROCESSOR_FILE)
+        arrays = {}
+        for name in self.ARRAYS:
+            header, packed = read_packed(entry / f'{name}.bin')
+            if 'features' in packed:
+                arrays[name] = pd.DataFrame(packed['features'], columns=header['feature_names'],
+                                            copy=False)
+            else:
+                arrays[name] = packed['target']
+        return (preprocessor,) + tuple(arrays[name] for name in self.ARRAYS)
+
+    @contextmanager
+    def writing(self, key, manifest=None):
+        """
+        Yield a staging directory to write an entry's files into; on success
+        it is renamed to the entry, on error it is removed
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f'.{key}.{uuid.uuid4().hex}.tmp'
+        staging.mkdir()
+        try:
+            yield staging
+            (staging / 'manifest.json').write_text(json.dumps(
+                dict(manifest or {}, key=key, created=time.time()), default=str, indent=2
+            ))
+            entry = self.path(key)
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(staging, entry)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+
+    def store(self, key, preprocessor, X_train, y_train, X_test, y_test, manifest=None):
+        """Write an entry from in-memory matrices"""
+        with self.writing(key, manifest) as staging:
+            header = {'feature_names': list(preprocessor.feature_names)}
+            for name, X in (('X_train', X_train), ('X_test', X_test)):
+                write_packed(staging / f'{name}.bin', header, {'features': pd.DataFrame(X).to_numpy()})
+            for name, y in (('y_train', y_train), ('y_test', y_test)):
+                write_packed(staging / f'{name}.bin', {}, {'target': pd.Series(y).to_numpy(dtype='float64')})
+            preprocessor.save(staging / self.PREPROCESSOR_FILE)
+        return self.path(key)
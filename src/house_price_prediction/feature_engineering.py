@@ -0,0 +1,76 @@
+"""
+Derived-feature engine shared by HousePricePreprocessor and TransformPlan
+Every derived column is computed in one pass into a preallocated float64
+block; income bands and age bins come out as integer bin codes from
+`searchsorted` on fixed edges instead of pd.cut labels.
+"""
+import numpy as np
+
+# Fixed bin edges (right-closed, lowest included, like pd.cut(include_lowest=True))
+INCOME_BAND_BINS = [0, 2.0, 3.0, 4.0, 5.0, 10.0, np.inf]
+INCOME_BAND_LABELS = ['Very Low', 'Low', 'Medium', 'High', 'Very High', 'Extreme']
+AGE_BINS = [0, 10, 20, 30, 50, np.inf]
+AGE_BIN_LABELS = ['New', 'Recent', 'Mature', 'Old', 'Very Old']
+
+# (name, kind, sources) in the order the columns are appended:
+# ratio -> a / (b + 1), square -> a ** 2, bin -> bin code of a
+DERIVED_FEATURES = [
+    ('rooms_per_household', 'ratio', ('total_rooms', 'households')),
+    ('bedrooms_per_household', 'ratio', ('total_bedrooms', 'households')),
+    ('population_per_household', 'ratio', ('population', 'households')),
+    ('population_per_room', 'ratio', ('population', 'total_rooms')),
+    ('income_band', 'bin', ('median_income',)),
+    ('income_squared', 'square', ('median_income',)),
+    ('income_per_room', 'ratio', ('median_income', 'total_rooms')),
+    ('age_bins', 'bin', ('housing_median_age',)),
+]
+
+# Bin edges and labels of the 'bin' features
+BINS = {
+    'income_band': (np.asarray(INCOME_BAND_BINS, dtype=np.float64), INCOME_BAND_LABELS),
+    'age_bins': (np.asarray(AGE_BINS, dtype=np.float64), AGE_BIN_LABELS),
+}
+
+RATIO_FEATURES = [(name, *sources) for name, kind, sources in DERIVED_FEATURES if kind == 'ratio']
+BINNED_FEATURES = [(name, sources[0], *BINS[name]) for name, kind, sources in DERIVED_FEATURES
+                   if kind == 'bin']
+
+
+def bin_codes(values, edges):
+    """
+    Integer bin codes matching pd.cut(..., include_lowest=True)
+    Values outside the edges (and NaN) get code -1
+    """
+    edges = np.asarray(edges, dtype=np.float64)
+    idx = np.searchsorted(edges, values, side='left')
+    idx[values == edges[0]] = 1
+    codes = idx - 1
+    codes[(codes < 0) | (codes >= len(edges) - 1) | np.isnan(values)] = -1
+    return codes
+
+
+def applicable_features(columns):
+    """Derived features whose source columns are all present"""
+    columns = set(columns)
+    return [spec for spec in DERIVED_FEATURES if columns.issuperset(spec[2])]
+
+
+def compute_features(specs, column, n_rows):
+    """
+    Evaluate derived features in one pass
+    `column(name)` returns a source column as a float64 array. Returns the
+    ratio/square features as one (n_rows, k) block (column-major, so each
+    feature is contiguous) and a dict of int8 bin codes for the 'bin' ones.
+    """
+    numeric = [spec for spec in specs if spec[1] != 'bin']
+    block = np.empty((n_rows, len(numeric)), dtype=np.float64, order='F')
+    for j, (name, kind, sources) in enumerate(numeric):
+        if kind == 'ratio':
+            np.divide(column(sources[0]), column(sources[1]) + 1, out=block[:, j])
+        else:
+            np.square(column(sources[0]), out=block[:, j])
+    codes = {}
+    for name, kind, sources in specs:
+        if kind == 'bin':
+            codes[name] = bin_codes(column(sources[0]), BINS[name][0]).astype(np.int8)
+    return block, codes
@@ -0,0 +1,93 @@
+"""
+Incremental retraining: new trees for newly arrived listings
+A fitted forest or gradient-boosting model keeps its trees and gets more,
+fitted through warm_start on the new rows only (optionally mixed with a
+recency-weighted sample of older ones), so the cost follows the size of
+the update rather than of the full history.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+# Models whose fit can add trees while keeping the existing ones
+WARM_START_MODELS = ('RandomForestRegressor', 'GradientBoostingRegressor')
+
+# Trees added per update when not given, as a share of the current count
+DEFAULT_TREE_SHARE = 0.2
+
+
+def check_warm_start(model):
+    """Raise ValueError unless add_trees can extend this model"""
+    model_type = type(model).__name__
+    if model_type == 'HistGradientBoostingRegressor':
+        # Its fit re-learns the bins and category encoding from the new
+        # rows, which would silently change what the old trees' splits mean
+        raise ValueError("HistGradientBoostingRegressor cannot be warm-started on new data; "
+                         "retrain it from scratch")
+    if model_type not in WARM_START_MODELS:
+        raise ValueError(f"Cannot add trees to {model_type}; expected one of {WARM_START_MODELS}")
+
+
+def add_trees(model, X, y, n_trees=None, sample_weight=None):
+    """
+    Fit n_trees more trees on (X, y) and keep the existing ones
+    A forest averages the new trees with the old; gradient boosting fits
+    them to what the current stages still get wrong on X. The model is
+    updated in place and returned.
+    """
+    check_warm_start(model)
+    if n_trees is None:
+        n_trees = max(1, round(model.n_estimators * DEFAULT_TREE_SHARE))
+    if n_trees < 1:
+        raise ValueError(f"n_trees must be at least 1, not {n_trees}")
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + n_trees)
+    try:
+        model.fit(X, y, sample_weight=sample_weight)
+    finally:
+        model.set_params(warm_start=False)
+    return model
+
+
+def recency_sample(chunks, size, half_life=None, random_state=42):
+    """
+    Weighted sample without replacement of `size` rows from (X, y) chunks
+    Row i of the stream is drawn with weight 2 ** (i / half_life), so a row
+    half_life rows further back is half as likely (None: uniform). Each row
+    gets a Gumbel key log(weight) + G and the top `size` keys are kept while
+    the chunks stream past, so memory is bounded by size + one chunk.
+    Returns (X, y) in stream order.
+    """
+    rng = np.random.default_rng(random_state)
+    kept_X, kept_y, kept_keys, kept_rows = None, None, np.empty(0), np.empty(0, dtype=np.int64)
+    start = 0
+    for X, y in chunks:
+        rows = np.arange(start, start + len(X))
+        start += len(X)
+        keys = rng.gumbel(size=len(X))
+        if half_life:
+            keys += rows * (np.log(2) / half_life)
+        X = pd.concat([kept_X, X]) if kept_X is not None else X
+        y = pd.concat([kept_y, y]) if kept_y is not None else y
+        keys = np.concatenate([kept_keys, keys])
+        rows = np.concatenate([kept_rows, rows])
+        keep = np.argpartition(-keys, size)[:size] if len(keys) > size else np.arange(len(keys))
+        keep = keep[np.argsort(rows[keep])]
+        kept_X, kept_y, kept_keys, kept_rows = X.iloc[keep], y.iloc[keep], keys[keep], rows[keep]
+    if kept_X is None:
+        raise ValueError("Cannot sample from an empty stream")
+    return kept_X, kept_y
+
+
+def accuracy(model, X, y):
+    """RMSE, MAE and R² of a model's predictions"""
+    predictions = model.predict(X)
+    return {
+        'rmse': float(np.sqrt(mean_squared_error(y, predictions))),
+        'mae': float(mean_absolute_error(y, predictions)),
+        'r2': float(r2_score(y, predictions)),
+    }
+
+
+def accuracy_delta(before, after):
+    """after - before for every metric both accuracy() results have"""
+    return {name: after[name] - before[name] for name in before if name in after}
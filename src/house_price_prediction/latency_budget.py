@@ -0,0 +1,241 @@
+"""
+Latency-budgeted model selection
+Every candidate is fitted, then its serving latency is measured on this
+machine (model_search.measure_latency: single-row p99 and 1k-row batch
+throughput through the engine the API would use). The candidate within the
+budget with the lowest validation RMSE wins; the test set plays no part. A
+candidate more accurate than that but too slow is pruned: first by keeping
+only its first trees, which needs no refit, then by refitting it shallower.
+Every measurement is kept, so the profile saved with the model shows what
+was tried and why.
+"""
+import copy
+import os
+import platform
+import re
+import time
+
+import numpy as np
+import sklearn
+from sklearn.base import clone
+from sklearn.metrics import mean_squared_error, r2_score
+
+from .engines import model_params
+from .model_search import MIN_RESOURCES, measure_latency
+
+# Budget keys (as measure_latency reports them) and which way they bind
+LIMITS = {'row_p99_ms': 'max', 'batch_rows_per_s': 'min'}
+
+# Single-row predictions timed per measurement; a p99 needs more than a p50
+BUDGET_REPEATS = 200
+
+# Fewest trees and shallowest depth pruning goes down to
+MIN_TREES = MIN_RESOURCES['trees']
+MIN_DEPTH = 2
+
+# A shallower refit must cut the fewest-trees p99 by this share, or the
+# time is not in the trees (e.g. input preprocessing) and pruning stops
+MIN_DEPTH_GAIN = 0.1
+
+# keep_trees and fitted_depth read HistGradientBoostingRegressor's trees
+# from its private _predictors, which has no public equivalent. Checked on
+# these scikit-learn releases (first, last); on any other, histogram
+# boosting candidates are compared as fitted but not pruned
+HGB_INTERNALS_TESTED = ((1, 5), (1, 9))
+
+
+def hgb_internals_supported():
+    """Whether this scikit-learn is one whose HGB internals were checked"""
+    major, minor = re.match(r'(\d+)\.(\d+)', sklearn.__version__).groups()
+    first, last = HGB_INTERNALS_TESTED
+    return first <= (int(major), int(minor)) <= last
+
+
+def prunable(model):
+    """Whether keep_trees can cut this fitted ensemble's trees"""
+    return not hasattr(model, 'n_iter_') or hgb_internals_supported()
+
+
+def within_budget(latency, budget):
+    """Whether a measure_latency result meets every limit set in budget"""
+    for key, limit in budget.items():
+        if limit is None:
+            continue
+        if key not in LIMITS:
+            raise ValueError(f"Unknown latency budget {key!r}; expected one of {sorted(LIMITS)}")
+        if (latency[key] > limit) if LIMITS[key] == 'max' else (latency[key] < limit):
+            return False
+    return True
+
+
+def tree_count(model):
+    """Number of trees (boosting iterations) of a fitted ensemble"""
+    if hasattr(model, 'n_iter_'):
+        return model.n_iter_
+    return len(model.estimators_)
+
+
+def fitted_depth(model):
+    """
+    Depth of the deepest tree of a fitted ensemble; None for histogram
+    boosting on a scikit-learn whose internals were not checked
+    """
+    if hasattr(model, 'n_iter_'):
+        if not hgb_internals_supported():
+            return None
+        return int(max(predictor.nodes['depth'].max()
+                       for iteration in model._predictors for predictor in iteration))
+    return int(max(tree.tree_.max_depth for tree in np.ravel(model.estimators_)))
+
+
+def keep_trees(model, n_trees):
+    """
+    Copy of a fitted ensemble that keeps only its first n_trees trees
+    A forest then averages fewer trees; boosting stops after n_trees
+    stages, as staged_predict would. The trees themselves are shared, and
+    the tree count parameter is set too, so a clone refits the same shape.
+    """
+    if not prunable(model):
+        raise ValueError(f"Cannot cut the trees of {type(model).__name__} on scikit-learn "
+                         f"{sklearn.__version__}; its internals were checked on "
+                         f"{HGB_INTERNALS_TESTED[0]} to {HGB_INTERNALS_TESTED[1]}")
+    pruned = copy.copy(model)
+    if hasattr(model, 'n_iter_'):
+        pruned._predictors = model._predictors[:n_trees]
+        pruned.max_iter = n_trees
+        pruned.train_score_ = model.train_score_[:n_trees + 1]
+        pruned.validation_score_ = model.validation_score_[:n_trees + 1]
+        return pruned
+    pruned.estimators_ = model.estimators_[:n_trees]
+    pruned.n_estimators = n_trees
+    if hasattr(model, 'n_estimators_'):
+        pruned.n_estimators_ = n_trees
+    if hasattr(model, 'train_score_'):
+        pruned.train_score_ = model.train_score_[:n_trees]
+    return pruned
+
+
+def _profile(name, model, X_val, y_val, budget, fit_s=None, latency=None):
+    """Validation accuracy and latency record of one fitted (or pruned) model"""
+    predictions = model.predict(X_val)
+    latency = latency or measure_latency(model, X_val, repeats=BUDGET_REPEATS)
+    return {
+        'name': name,
+        'model_type': type(model).__name__,
+        'n_trees': tree_count(model),
+        'max_depth': fitted_depth(model),
+        'fit_s': fit_s,
+        'val_rmse': float(np.sqrt(mean_squared_error(y_val, predictions))),
+        'val_r2': float(r2_score(y_val, predictions)),
+        'latency': latency,
+        'within_budget': within_budget(latency, budget),
+    }
+
+
+def _fit(estimator, X_train, y_train):
+    start = time.perf_counter()
+    model = clone(estimator).fit(X_train, y_train)
+    return model, time.perf_counter() - start
+
+
+def _most_trees_within(model, X_val, budget):
+    """
+    (largest tree count from MIN_TREES up whose latency meets the budget,
+    its latency), or (None, None)
+    """
+    low, high, best = min(MIN_TREES, tree_count(model)), tree_count(model), (None, None)
+    # Latency grows with the tree count, so bisect on it
+    while low <= high:
+        n_trees = (low + high) // 2
+        latency = measure_latency(keep_trees(model, n_trees), X_val, BUDGET_REPEATS)
+        if within_budget(latency, budget):
+            best, low = (n_trees, latency), n_trees + 1
+        else:
+            high = n_trees - 1
+    return best
+
+
+def prune_to_budget(name, model, estimator, X_train, y_train, X_val, y_val, budget):
+    """
+    Try to prune a fitted model into the budget: first by cutting its own
+    trees to the most that fit, then by refitting `estimator` at two thirds
+    of the depth each time, down to MIN_DEPTH. Stops at the first depth with
+    a version that fits, or when a shallower refit no longer speeds up the
+    fewest-trees model. Returns (a record per depth tried, with the fitting
+    version or else the fewest-trees one, the pruned model or None).
+    """
+    records, slowest = [], None
+    depth, fit_s = fitted_depth(model), None
+    while True:
+        n_trees, latency = _most_trees_within(model, X_val, budget)
+        fits = n_trees is not None
+        pruned = keep_trees(model, n_trees if fits else min(MIN_TREES, tree_count(model)))
+        # A fitting version keeps the measurement it was accepted on
+        record = dict(_profile(name, pruned, X_val, y_val, budget, fit_s, latency), pruned=True)
+        records.append(record)
+        if fits:
+            return records, pruned
+        floor = record['latency']['row_p99_ms']
+        if depth <= MIN_DEPTH or (slowest is not None and floor > slowest * (1 - MIN_DEPTH_GAIN)):
+            return records, None
+        slowest = floor
+        depth = max(MIN_DEPTH, depth * 2 // 3)
+        model, fit_s = _fit(clone(estimator).set_params(max_depth=depth), X_train, y_train)
+
+
+def select_within_budget(candidates, X_train, y_train, X_val, y_val, budget, prune=True):
+    """
+    Fit `candidates` (name -> unfitted estimator) in turn and pick the most
+    accurate by RMSE on the validation rows (held out from the training
+    data, not the test set) whose latency meets `budget` ({'row_p99_ms':
+    max single-row p99, 'batch_rows_per_s': min 1k-row throughput}; None or
+    a missing key means no limit). With prune, every candidate more accurate
+    than the best one within budget is also pruned (see prune_to_budget).
+    Returns (name, model, profile); raises ValueError if nothing fits.
+    """
+    budget = {key: limit for key, limit in budget.items() if limit is not None}
+    within_budget({key: 0 for key in LIMITS}, budget)  # reject unknown keys up front
+    estimators, fitted, records = {}, {}, []
+    for name, estimator in candidates.items():
+        # Saved models predict with every core (see train_model.build_model),
+        # so batches are timed that way too
+        estimators[name] = clone(estimator)
+        if 'n_jobs' in estimators[name].get_params():
+            estimators[name].set_params(n_jobs=-1)
+        fitted[name], fit_s = _fit(estimators[name], X_train, y_train)
+        records.append(dict(_profile(name, fitted[name], X_val, y_val, budget, fit_s), pruned=False))
+
+    best = min((r for r in records if r['within_budget']), key=lambda r: r['val_rmse'], default=None)
+    model = fitted[best['name']] if best is not None else None
+    if prune:
+        for record in sorted(records, key=lambda r: r['val_rmse']):
+            if best is not None and record['val_rmse'] >= best['val_rmse']:
+                break
+            if record['within_budget'] or not prunable(fitted[record['name']]):
+                continue
+            name = record['name']
+            pruned_records, pruned = prune_to_budget(name, fitted[name], estimators[name],
+                                                     X_train, y_train, X_val, y_val, budget)
+            records.extend(pruned_records)
+            if pruned is not None and (best is None or pruned_records[-1]['val_rmse'] < best['val_rmse']):
+                best, model = pruned_records[-1], pruned
+
+    if best is None:
+        fastest = min(records, key=lambda r: r['latency']['row_p99_ms'])
+        raise ValueError(f"No candidate meets the latency budget {budget}; the fastest, "
+                         f"{fastest['name']}, has a row p99 of {fastest['latency']['row_p99_ms']:.2f} ms "
+                         f"and {fastest['latency']['batch_rows_per_s']:,.0f} rows/s")
+    profile = {
+        'budget': budget,
+        'machine': {'platform': platform.platform(), 'processor': platform.processor(),
+                    'cpu_count': os.cpu_count(), 'python': platform.python_version()},
+        'selected': best['name'],
+        'pruned': best['pruned'],
+        'n_trees': best['n_trees'],
+        'max_depth': best['max_depth'],
+        'val_rmse': best['val_rmse'],
+        'latency': best['latency'],
+        'params': model_params(model),
+        'records': records,
+    }
+    return best['name'], model, profile
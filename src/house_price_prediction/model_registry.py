@@ -0,0 +1,143 @@
+"""
+Immutable model snapshots and background hot reload
+The serving code reads one snapshot per request; a reload builds, validates
+and warms a new snapshot off the request path and swaps it in one assignment.
+"""
+import hashlib
+import os
+import threading
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+
+class ModelSnapshot:
+    """Model + preprocessor pair that is never mutated once published"""
+
+    __slots__ = ("model", "preprocessor", "transform_plan", "version", "model_path", "loaded_at")
+
+    def __init__(self, model, preprocessor, transform_plan, version, model_path=None):
+        object.__setattr__(self, "model", model)
+        object.__setattr__(self, "preprocessor", preprocessor)
+        object.__setattr__(self, "transform_plan", transform_plan)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "model_path", str(model_path) if model_path else None)
+        object.__setattr__(self, "loaded_at", time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ModelSnapshot is immutable")
+
+    @property
+    def model_type(self):
+        return getattr(self.model, 'model_type', type(self.model).__name__)
+
+    def predict(self, X):
+        """Predict on a transformed matrix"""
+        with warnings.catch_warnings():
+            # The transform plan hands NumPy matrices to estimators fitted on DataFrames
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            return self.model.predict(X)
+
+    def validate(self, warmup_rows=4):
+        """Check the pair is consistent and warm it with a few predictions"""
+        n_features = getattr(self.model, 'n_features_in_', None)
+        if n_features is not None and n_features != self.transform_plan.n_features:
+            raise ValueError(
+                f"Model expects {n_features} features but preprocessor produces "
+                f"{self.transform_plan.n_features}"
+            )
+        # Empty records exercise the median/default fill path end to end
+        X = self.transform_plan.transform_records([{}] * warmup_rows)
+        predictions = np.asarray(self.predict(X), dtype=np.float64)
+        if predictions.shape != (warmup_rows,) or not np.all(np.isfinite(predictions)):
+            raise ValueError("Warm-up predictions are not finite")
+        return self
+
+
+def artifact_fingerprint(paths):
+    """Short version tag derived from the existing artifacts' size and mtime"""
+    digest = hashlib.sha1()
+    for path in paths:
+        path = Path(path)
+        if path.exists():
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+class ModelReloader:
+    """
+    Background thread that reloads the model when its artifacts change
+    (polled every `interval` seconds; 0 disables polling) or on request.
+    A change must be seen on two consecutive polls before it is loaded, so
+    half-written files from train_model.py are not picked up.
+    """
+
+    def __init__(self, reload_fn, fingerprint_fn, current_version_fn, interval=0.0):
+        self.reload_fn = reload_fn
+        self.fingerprint_fn = fingerprint_fn
+        self.current_version_fn = current_version_fn
+        self.interval = interval
+        self.reloads = 0
+        self.last_error = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._reloading = threading.Lock()
+
+    def ensure_started(self):
+        """Start the watcher thread for the current process"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._wakeup = threading.Event()
+            self._reloading = threading.Lock()
+            thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+            self._pid = os.getpid()
+            thread.start()
+
+    def request_reload(self):
+        """Ask the watcher thread to reload now (returns immediately)"""
+        self.ensure_started()
+        self._wakeup.set()
+
+    @property
+    def reloading(self):
+        return self._reloading.locked()
+
+    def reload_now(self):
+        """Reload on the calling thread; False if another reload is running"""
+        if not self._reloading.acquire(blocking=False):
+            return False
+        try:
+            self.reload_fn()
+            self.reloads += 1
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return False
+        finally:
+            self._reloading.release()
+
+    def _run(self):
+        pending = None
+        while True:
+            triggered = self._wakeup.wait(self.interval if self.interval > 0 else None)
+            self._wakeup.clear()
+            if triggered:
+                pending = None
+                self.reload_now()
+                continue
+            fingerprint = self.fingerprint_fn()
+            if fingerprint == self.current_version_fn():
+                pending = None
+            elif fingerprint == pending:
+                pending = None
+                self.reload_now()
+            else:
+                pending = fingerprint
@@ -0,0 +1,237 @@
+"""
+Successive-halving model search
+Candidate estimators (forests and gradient boosting) are first fitted on a
+small share of the training rows, or with a fraction of their trees. After
+each round only the best 1/factor by validation RMSE go on, and the last
+round uses the full budget. The test set, if given, is only scored for the
+report and never decides anything. Candidates run on a process pool: the processed
+features are written once to packed files that every worker memory-maps,
+so the training matrix is shared through the page cache instead of being
+pickled to each process.
+"""
+import math
+import os
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+from threadpoolctl import threadpool_limits
+
+from .engines import build_engine, model_params
+from .packed_arrays import read_packed, write_packed
+from .tree_engine import compile_model
+
+RESOURCES = ('samples', 'trees')
+
+# Smallest budget a first round is given
+MIN_RESOURCES = {'samples': 1000, 'trees': 10}
+
+# Single-row predictions timed per candidate, and the batch size timed
+LATENCY_REPEATS = 50
+BATCH_ROWS = 1000
+
+
+def default_candidates(random_state=42, X_train=None):
+    """
+    name -> unfitted estimator: the current forest and a few alternatives
+    (X_train decides which columns histogram boosting treats as categories)
+    """
+    forest = dict(min_samples_split=5, min_samples_leaf=2, random_state=random_state)
+    return {
+        'forest-depth20': RandomForestRegressor(n_estimators=100, max_depth=20, **forest),
+        'forest-depth12': RandomForestRegressor(n_estimators=100, max_depth=12, **forest),
+        'forest-full-depth': RandomForestRegressor(n_estimators=100, max_depth=None, **forest),
+        'forest-depth20-half-features': RandomForestRegressor(n_estimators=100, max_depth=20,
+                                                              max_features=0.5, **forest),
+        'boosting-depth3': GradientBoostingRegressor(n_estimators=300, max_depth=3, learning_rate=0.1,
+                                                     subsample=0.8, random_state=random_state),
+        'boosting-depth6': GradientBoostingRegressor(n_estimators=200, max_depth=6, learning_rate=0.05,
+                                                     subsample=0.8, random_state=random_state),
+        'hist-boosting': build_engine('hist-gradient-boosting', X_train, random_state),
+    }
+
+
+def tree_param(estimator):
+    """The parameter that sets an estimator's number of trees, or None"""
+    params = estimator.get_params()
+    return next((name for name in ('n_estimators', 'max_iter') if name in params), None)
+
+
+def measure_latency(model, X, repeats=LATENCY_REPEATS, batch_rows=BATCH_ROWS):
+    """
+    Serving latency of a fitted model on rows of X, predicted the way the
+    API would (through the flattened-array engine when the model compiles):
+    single-row p50/p99 in ms and the throughput of one batch_rows batch
+    """
+    engine = compile_model(model) or model
+    X = np.asarray(X)
+    times = []
+    best = float('inf')
+    with warnings.catch_warnings():
+        # The API predicts on arrays too (see ModelSnapshot.predict)
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        for i in range(repeats):
+            row = X[i % len(X)][None, :]
+            start = time.perf_counter()
+            engine.predict(row)
+            times.append(time.perf_counter() - start)
+        batch = X[np.arange(batch_rows) % len(X)]
+        for _ in range(3):
+            start = time.perf_counter()
+            engine.predict(batch)
+            best = min(best, time.perf_counter() - start)
+    return {
+        'row_p50_ms': float(np.percentile(times, 50) * 1000),
+        'row_p99_ms': float(np.percentile(times, 99) * 1000),
+        'batch_rows': batch_rows,
+        'batch_rows_per_s': batch_rows / best,
+    }
+
+
+# Worker-side view of the shared data (set once per process by _attach)
+_shared = {}
+
+
+def _attach(paths):
+    """Pool initializer: map the packed training data read-only"""
+    for name, path in paths.items():
+        header, arrays = read_packed(path)
+        data = arrays[name]
+        if 'columns' in header:
+            data = pd.DataFrame(data, columns=header['columns'], copy=False)
+        _shared[name] = data
+
+
+def _run_candidate(name, estimator, resource, amount, save_path=None):
+    """Fit one candidate on its budget; returns its record"""
+    X_train, y_train = _shared['X_train'], _shared['y_train']
+    model = clone(estimator)
+    if resource == 'trees':
+        model.set_params(**{tree_param(model): amount})
+    elif amount < len(y_train):
+        rows = np.sort(_shared['order'][:amount])
+        X_train = X_train.iloc[rows] if hasattr(X_train, 'iloc') else X_train[rows]
+        y_train = y_train[rows]
+
+    # Candidates already run in parallel; OpenMP/BLAS threads would oversubscribe
+    with threadpool_limits(1):
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s = time.perf_counter() - start
+
+    X_val, y_val = _shared['X_val'], _shared['y_val']
+    predictions = model.predict(X_val)
+    if save_path:
+        joblib.dump(model, save_path)
+    record = {
+        'name': name,
+        'model_type': type(model).__name__,
+        'resource': resource,
+        'amount': int(amount),
+        'fit_s': fit_s,
+        'val_rmse': float(np.sqrt(mean_squared_error(y_val, predictions))),
+        'val_r2': float(r2_score(y_val, predictions)),
+        'latency': measure_latency(model, X_val),
+        'params': model_params(model),
+    }
+    if 'X_test' in _shared:
+        predictions = model.predict(_shared['X_test'])
+        record['test_rmse'] = float(np.sqrt(mean_squared_error(_shared['y_test'], predictions)))
+        record['test_r2'] = float(r2_score(_shared['y_test'], predictions))
+    return record
+
+
+def halving_schedule(n_candidates, full, resource='samples', factor=3, min_resources=None):
+    """
+    Budget of each round: the last round gets `full` rows (or, for trees,
+    a fraction 1.0 of each candidate's own count) and each earlier one
+    1/factor of the next. There are just enough rounds that at most
+    `factor` candidates reach the last.
+    """
+    n_rounds, alive = 1, n_candidates
+    while alive > factor:
+        alive = math.ceil(alive / factor)
+        n_rounds += 1
+    fractions = [factor ** (i - n_rounds + 1) for i in range(n_rounds)]
+    if resource == 'trees':
+        return fractions
+    floor = min(full, MIN_RESOURCES['samples'] if min_resources is None else min_resources)
+    return [max(floor, round(full * f)) for f in fractions]
+
+
+def successive_halving(candidates, X_train, y_train, X_val, y_val, resource='samples',
+                       factor=3, min_resources=None, workers=None, work_dir=None, random_state=42,
+                       X_test=None, y_test=None):
+    """
+    Search `candidates` (name -> unfitted estimator) by successive halving
+    over training rows (resource='samples') or trees ('trees'), ranking on
+    the validation rows (held out from the training data, not the test
+    set). Returns (best name, best model fitted on the full budget, one
+    record per candidate and round with fit time, serving latency,
+    validation RMSE and, if X_test is given, test RMSE for reference).
+    """
+    if resource not in RESOURCES:
+        raise ValueError(f"resource must be one of {RESOURCES}, not {resource!r}")
+    # Parallelism is across candidates, so each fit is single-threaded
+    candidates = {name: clone(est).set_params(**({'n_jobs': 1} if 'n_jobs' in est.get_params() else {}))
+                  for name, est in candidates.items()}
+    if resource == 'trees' and any(tree_param(est) is None for est in candidates.values()):
+        raise ValueError("resource='trees' needs estimators with n_estimators or max_iter")
+
+    columns = list(X_train.columns) if hasattr(X_train, 'columns') else None
+    shared = {
+        'X_train': np.asarray(X_train),
+        'y_train': np.asarray(y_train, dtype=np.float64),
+        'X_val': np.asarray(X_val),
+        'y_val': np.asarray(y_val, dtype=np.float64),
+        'order': np.random.default_rng(random_state).permutation(len(y_train)),
+    }
+    if X_test is not None:
+        shared['X_test'] = np.asarray(X_test)
+        shared['y_test'] = np.asarray(y_test, dtype=np.float64)
+    schedule = halving_schedule(len(candidates), len(y_train), resource, factor, min_resources)
+    if resource == 'trees':
+        min_trees = MIN_RESOURCES['trees'] if min_resources is None else min_resources
+        full = {name: est.get_params()[tree_param(est)] for name, est in candidates.items()}
+        budgets = [{name: min(n, max(min_trees, round(n * f))) for name, n in full.items()}
+                   for f in schedule]
+    else:
+        budgets = [dict.fromkeys(candidates, rows) for rows in schedule]
+
+    if work_dir is not None:
+        Path(work_dir).mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=work_dir, prefix='search-') as tmp:
+        paths = {}
+        for name, data in shared.items():
+            paths[name] = Path(tmp) / f'{name}.packed'
+            header = {'columns': columns} if columns and name.startswith('X_') else {}
+            write_packed(paths[name], header, {name: data})
+        del shared
+
+        records = []
+        alive = list(candidates)
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_attach, initargs=(paths,)) as pool:
+            for round_index, budget in enumerate(budgets):
+                last = round_index == len(budgets) - 1
+                futures = [pool.submit(_run_candidate, name, candidates[name], resource, budget[name],
+                                       Path(tmp) / f'{name}.joblib' if last else None)
+                           for name in alive]
+                results = [dict(future.result(), round=round_index) for future in futures]
+                records.extend(results)
+                results.sort(key=lambda r: r['val_rmse'])
+                alive = [r['name'] for r in results[:max(1, math.ceil(len(results) / factor))]]
+
+        best = alive[0]
+        model = joblib.load(Path(tmp) / f'{best}.joblib')
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=-1)
+    return best, model, records
@@ -0,0 +1,152 @@
+"""
+Memory-mapped forest artifact
+Stores the node arrays of a fitted RandomForestRegressor or
+GradientBoostingRegressor as page-aligned raw arrays, so every gunicorn
+worker maps the same physical pages instead of unpickling its own copy.
+The arrays are evaluated in place by tree_engine.TreeEnsemble.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from .packed_arrays import write_packed, read_packed
+from .tree_engine import TreeEnsemble
+
+FOREST_FORMAT = "hpp-forest"
+FOREST_VERSION = 2
+
+
+def _estimator_trees(model):
+    """Return (trees, aggregate, base, scale) for a supported ensemble"""
+    model_type = type(model).__name__
+    if model_type == 'RandomForestRegressor':
+        return [est.tree_ for est in model.estimators_], 'mean', 0.0, 1.0
+    if model_type == 'GradientBoostingRegressor':
+        if isinstance(model.init_, str) and model.init_ == 'zero':
+            base = 0.0
+        elif type(model.init_).__name__ == 'DummyRegressor':
+            base = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise ValueError("Only constant GradientBoosting init estimators can be exported")
+        return [est.tree_ for est in model.estimators_[:, 0]], 'sum', base, float(model.learning_rate)
+    raise ValueError(f"Cannot export {model_type}; expected RandomForestRegressor or GradientBoostingRegressor")
+
+
+def layout_nodes(roots, feature, threshold, left, right, value, missing_left=None):
+    """
+    Relabel concatenated trees (global children, -1 for leaves) breadth-first so
+    each node's two children are adjacent: right child == left child + 1.
+    Leaves point to themselves with threshold +inf (and NaN going left), so
+    extra level steps keep them in place. Returns (arrays, depth).
+    """
+    n_nodes = len(left)
+    new_id = np.empty(n_nodes, dtype=np.int64)
+    order = [np.asarray(roots, dtype=np.int64)]
+    new_id[order[0]] = np.arange(len(roots))
+    next_id = len(roots)
+    frontier = order[0]
+    depth = 0
+    while True:
+        internal = frontier[left[frontier] != -1]
+        if internal.size == 0:
+            break
+        depth += 1
+        kids = np.stack([left[internal], right[internal]], axis=1).ravel().astype(np.int64)
+        new_id[kids] = next_id + np.arange(kids.size)
+        next_id += kids.size
+        order.append(kids)
+        frontier = kids
+    order = np.concatenate(order)
+
+    is_leaf = left[order] == -1
+    own = np.arange(n_nodes, dtype=np.int64)
+    arrays = {
+        "roots": new_id[np.asarray(roots, dtype=np.int64)].astype(np.int32),
+        "feature": np.where(is_leaf, 0, feature[order]).astype(np.int32),
+        "threshold": np.where(is_leaf, np.inf, threshold[order]).astype(np.float64),
+        "child": np.where(is_leaf, own, new_id[np.where(is_leaf, 0, left[order])]).astype(np.int32),
+        "value": np.asarray(value[order], dtype=np.float64),
+    }
+    if missing_left is not None:
+        arrays["missing_left"] = np.where(is_leaf, 1, missing_left[order]).astype(np.uint8)
+    return arrays, depth
+
+
+def pack_forest(model):
+    """Concatenate and lay out the nodes of every tree for TreeEnsemble"""
+    trees, aggregate, base, scale = _estimator_trees(model)
+    if any(tree.n_outputs != 1 for tree in trees):
+        raise ValueError("Only single-output regressors can be exported")
+
+    counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+    roots = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+
+    def shifted(children, root):
+        children = children.astype(np.int64)
+        return np.where(children == -1, -1, children + root)
+
+    missing_left = None
+    if all(hasattr(t, 'missing_go_to_left') for t in trees):
+        missing_left = np.concatenate([t.missing_go_to_left for t in trees])
+    arrays, depth = layout_nodes(
+        roots,
+        np.concatenate([t.feature for t in trees]),
+        np.concatenate([t.threshold for t in trees]),
+        np.concatenate([shifted(t.children_left, r) for t, r in zip(trees, roots)]),
+        np.concatenate([shifted(t.children_right, r) for t, r in zip(trees, roots)]),
+        np.concatenate([t.value[:, 0, 0] for t in trees]),
+        missing_left,
+    )
+
+    header = {
+        "format": FOREST_FORMAT,
+        "version": FOREST_VERSION,
+        "model_type": type(model).__name__,
+        "n_features": int(model.n_features_in_),
+        "n_trees": len(trees),
+        "depth": depth,
+        "aggregate": aggregate,
+        "base": base,
+        "scale": scale,
+        "max_depth": getattr(model, 'max_depth', None),
+        "feature_names": [str(f) for f in getattr(model, 'feature_names_in_', [])],
+    }
+    return header, arrays
+
+
+def _upgrade_v1(header, arrays):
+    """Version 1 artifacts kept sklearn's node order with -1 leaf children"""
+    new_arrays, depth = layout_nodes(
+        arrays["roots"], arrays["feature"], arrays["threshold"],
+        arrays["left"].astype(np.int64), arrays["right"].astype(np.int64),
+        arrays["value"], arrays.get("missing_left"),
+    )
+    return dict(header, depth=depth), new_arrays
+
+
+def save_forest(model, path):
+    """Write a memory-mappable forest artifact"""
+    header, arrays = pack_forest(model)
+    write_packed(path, header, arrays)
+
+
+def load_forest(path):
+    """Memory-map a forest artifact written by save_forest"""
+    header, arrays = read_packed(path)
+    if header.get("format") != FOREST_FORMAT:
+        raise ValueError(f"{path} is not a forest artifact")
+    if header.get("version", 0) > FOREST_VERSION:
+        raise ValueError(f"Unsupported forest artifact version {header['version']}")
+    if header["version"] == 1:
+        header, arrays = _upgrade_v1(header, arrays)
+    return TreeEnsemble.from_arrays(header, arrays)
+
+
+if __name__ == '__main__':
+    # Convert an existing joblib model: python -m house_price_prediction.model_store models/house_price_model.joblib
+    import joblib
+    src = Path(sys.argv[1] if len(sys.argv) > 1 else 'models/house_price_model.joblib')
+    dst = Path(sys.argv[2]) if len(sys.argv) > 2 else src.with_suffix('.forest')
+    save_forest(joblib.load(src), dst)
+    print(f"✅ Forest artifact written: {dst}")
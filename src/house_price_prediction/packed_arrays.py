@@ -0,0 +1,179 @@
+"""
+Single-file container for raw NumPy arrays behind a JSON header
+Arrays are page-aligned so they can be memory-mapped read-only and shared
+between processes through the page cache
+"""
+import json
+import mmap
+import os
+import struct
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"HPPPACK1"
+PAGE_SIZE = mmap.ALLOCATIONGRANULARITY
+
+
+def _align(offset, alignment=PAGE_SIZE):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def write_packed(path, header, arrays, alignment=PAGE_SIZE):
+    """
+    Write `arrays` (name -> ndarray) after a JSON `header`
+    The array layout is recorded under header["arrays"]. Arrays start on
+    `alignment` boundaries: pages by default, so large arrays map cleanly;
+    a small value such as 64 keeps files of many small arrays compact.
+    The file is written next to `path` and renamed onto it, so processes
+    that have the old file mapped keep reading the old contents.
+    """
+    header = dict(header)
+    layout = {}
+    arrays = {name: np.ascontiguousarray(arr) for name, arr in arrays.items()}
+
+    # The header size depends on the offsets, so reserve an aligned block for it
+    header_block = alignment
+    while True:
+        offset = header_block
+        for name, arr in arrays.items():
+            layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+            offset = _align(offset + arr.nbytes, alignment)
+        header["arrays"] = layout
+        encoded = json.dumps(header).encode("utf-8")
+        if len(MAGIC) + 8 + len(encoded) <= header_block:
+            break
+        header_block = _align(len(MAGIC) + 8 + len(encoded), alignment)
+
+    # Truncating a file in place would fault (SIGBUS) every reader mapping it
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(encoded)))
+            f.write(encoded)
+            for name, arr in arrays.items():
+                f.seek(layout[name]["offset"])
+                f.write(arr.tobytes())
+            f.truncate(max([header_block] + [
+                layout[name]["offset"] + arr.nbytes for name, arr in arrays.items()
+            ]))
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def is_packed(path):
+    """True if path starts with the packed-array magic"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def read_packed(path):
+    """
+    Memory-map a packed file read-only
+    Returns (header, arrays); arrays are zero-copy views into the mapping
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a packed array file")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        if count == 0:
+            arrays[name] = np.empty(spec["shape"], dtype=dtype)
+            continue
+        arr = np.frombuffer(mapping, dtype=dtype, count=count, offset=spec["offset"])
+        arrays[name] = arr.reshape(spec["shape"])
+    return header, arrays
+
+
+class PackedRowWriter:
+    """
+    Append rows of a single array to a packed file whose length isn't known
+    up front. The header block is sized for the largest possible row count,
+    rows are streamed after it, and close() rewrites the header with the
+    final shape, so the result reads back with read_packed.
+    """
+
+    def __init__(self, path, n_cols=None, dtype=np.float64, header=None, name="data"):
+        self.path = path
+        self.n_cols = n_cols
+        self.dtype = np.dtype(dtype)
+        self.name = name
+        self.rows = 0
+        self._header = dict(header or {})
+        self.offset = 10 ** 19  # placeholder while sizing the header block
+        self.offset = _align(len(MAGIC) + 8 + len(self._encode(10 ** 19)))
+        self._file = open(path, "wb")
+        self._write_header()
+        self._file.seek(self.offset)
+
+    def _encode(self, rows):
+        shape = [rows] if self.n_cols is None else [rows, self.n_cols]
+        header = dict(self._header, arrays={
+            self.name: {"dtype": self.dtype.str, "shape": shape, "offset": self.offset}
+        })
+        return json.dumps(header).encode("utf-8")
+
+    def _write_header(self):
+        encoded = self._encode(self.rows)
+        self._file.seek(0)
+        self._file.write(MAGIC)
+        self._file.write(struct.pack("<Q", len(encoded)))
+        self._file.write(encoded)
+
+    def append(self, block):
+        block = np.ascontiguousarray(block, dtype=self.dtype)
+        expected = 1 if self.n_cols is None else 2
+        if block.ndim != expected or (self.n_cols is not None and block.shape[1] != self.n_cols):
+            raise ValueError(f"Expected rows of shape {(self.n_cols,) if self.n_cols else ()}, got {block.shape}")
+        block.tofile(self._file)
+        self.rows += len(block)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pack_strings(strings):
+    """
+    String table: the UTF-8 bytes of every string back to back (uint8) and
+    offsets, with string i at blob[offsets[i]:offsets[i + 1]]. Offsets use
+    the narrowest unsigned dtype that holds the blob's length.
+    """
+    encoded = [str(s).encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    dtype = np.uint16 if offsets[-1] <= 0xFFFF else np.uint32 if offsets[-1] <= 0xFFFFFFFF else np.int64
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets.astype(dtype)
+
+
+def unpack_strings(blob, offsets, start=0, stop=None):
+    """Strings start..stop of a table written by pack_strings, as a list of str"""
+    stop = len(offsets) - 1 if stop is None else stop
+    data = np.asarray(blob[offsets[start]:offsets[stop]]).tobytes()
+    bounds = (offsets[start:stop + 1].astype(np.int64) - offsets[start]).tolist()
+    if data.isascii():
+        # One decode; byte offsets are character offsets
+        text = data.decode("ascii")
+        return [text[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    return [data[a:b].decode("utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,89 @@
+"""
+Bounded LRU/TTL cache of predictions keyed by canonicalised input
+Entries are tagged with the model version and dropped when it changes
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(record):
+    """Order-independent hash of a JSON record"""
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with optional TTL (seconds)
+    A max_size of 0 disables caching entirely
+    """
+
+    def __init__(self, max_size=10000, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def invalidate(self, model_version=None):
+        """Drop every entry and tag the cache with a new model version"""
+        with self._lock:
+            self._entries.clear()
+            self.model_version = model_version
+
+    def get(self, key, model_version=None):
+        """Return the cached prediction for key (made by model_version, if given), or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, version, stored_at = entry
+                expired = self.ttl is not None and time.time() - stored_at > self.ttl
+                if version == self.model_version and not expired:
+                    if model_version is not None and model_version != version:
+                        self.misses += 1
+                        return None
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, model_version=None):
+        """Store a prediction made by model_version (ignored if stale)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if model_version is not None and model_version != self.model_version:
+                return
+            self._entries[key] = (value, self.model_version, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "model_version": self.model_version,
+            }
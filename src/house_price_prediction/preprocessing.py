@@ -7,36 +7,32 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.impute import SimpleImputer
 import joblib
-import json
 from pathlib import Path
-
-LOG_PATH = Path("debug.log")
-
-def log_entry(session_id, run_id, hypothesis_id, location, message, data):
-    """Write a log entry in NDJSON format"""
-    entry = {
-        "sessionId": session_id,
-        "runId": run_id,
-        "hypothesisId": hypothesis_id,
-        "location": location,
-        "message": message,
-        "data": data,
-        "timestamp": int(__import__('time').time() * 1000)
-    }
-    with open(LOG_PATH, 'a') as f:
-        f.write(json.dumps(entry) + '\n')
+from .category_encoding import CategoryTable, IndexedLabelEncoder, factorize_labels
+from .column_plan import ColumnPlan
+from .packed_arrays import PackedRowWriter, is_packed
+from .preprocessor_store import PACKED_SUFFIX, load_preprocessor, save_preprocessor
+from .streaming_fit import StreamingFit
+from .feature_engineering import (INCOME_BAND_BINS, INCOME_BAND_LABELS,  # noqa: F401
+                                  AGE_BINS, AGE_BIN_LABELS, BINS,
+                                  applicable_features, compute_features)
 
 
 class HousePricePreprocessor:
     """Advanced feature engineering for house price prediction"""
     
-    def __init__(self):
+    def __init__(self, dtype=np.float64):
         self.scaler = StandardScaler()
         self.label_encoders = {}
         self.imputer = SimpleImputer(strategy='median')
         self.feature_names = None
         self.is_fitted = False
         self.categorical_features = set()  # Track which features are categorical (should not be scaled)
+        self.category_tables = {}  # Lookup tables derived from label_encoders (not saved)
+        self.column_plan = None  # ColumnPlan compiled at fit time
+        # Feature dtype of transform output; float32 halves memory and the trees
+        # compare in float32 anyway (arithmetic stays float64)
+        self.dtype = np.dtype(dtype)
         
     def create_advanced_features(self, df):
         """
@@ -44,50 +40,31 @@ class HousePricePreprocessor:
         - Rooms per household
         - Population ratios
         - Income bands
+        
+        All derived columns are computed in one pass (see feature_engineering);
+        income_band and age_bins are categoricals built from integer bin codes.
+        The input frame is not copied or modified.
         """
+        specs = applicable_features(df.columns)
+        if not specs:
+            return df.copy(deep=False)
+        
+        sources = {}
+        def column(name):
+            if name not in sources:
+                sources[name] = np.asarray(df[name], dtype=np.float64)
+            return sources[name]
+        
+        block, codes = compute_features(specs, column, len(df))
+        derived = pd.DataFrame(block, index=df.index, copy=False,
+                               columns=[name for name, kind, _ in specs if kind != 'bin'])
+        for position, (name, kind, _) in enumerate(specs):
+            if kind == 'bin':
+                labels = BINS[name][1]
+                derived.insert(position, name, pd.Categorical.from_codes(codes[name], labels))
         
-        df = df.copy()
-        
-        # Rooms per household
-        if 'total_rooms' in df.columns and 'households' in df.columns:
-            df['rooms_per_household'] = df['total_rooms'] / (df['households'] + 1)
-        
-        # Bedrooms per household
-        if 'total_bedrooms' in df.columns and 'households' in df.columns:
-            df['bedrooms_per_household'] = df['total_bedrooms'] / (df['households'] + 1)
-        
-        # Population ratios
-        if 'population' in df.columns and 'households' in df.columns:
-            df['population_per_household'] = df['population'] / (df['households'] + 1)
-        
-        if 'population' in df.columns and 'total_rooms' in df.columns:
-            df['population_per_room'] = df['population'] / (df['total_rooms'] + 1)
-        
-        # Income bands (categorical feature engineering)
-        if 'median_income' in df.columns:
-            # Create income bands
-            income_bands = pd.cut(df['median_income'], 
-                                 bins=[0, 2.0, 3.0, 4.0, 5.0, 10.0, np.inf],
-                                 labels=['Very Low', 'Low', 'Medium', 'High', 'Very High', 'Extreme'],
-                                 include_lowest=True)
-            df['income_band'] = income_bands.astype(str)
-            
-            # Income squared (non-linear feature)
-            df['income_squared'] = df['median_income'] ** 2
-            
-            # Income per room
-            if 'total_rooms' in df.columns:
-                df['income_per_room'] = df['median_income'] / (df['total_rooms'] + 1)
-        
-        # Age-based features
-        if 'housing_median_age' in df.columns:
-            df['age_bins'] = pd.cut(df['housing_median_age'],
-                                   bins=[0, 10, 20, 30, 50, np.inf],
-                                   labels=['New', 'Recent', 'Mature', 'Old', 'Very Old'],
-                                   include_lowest=True)
-            df['age_bins'] = df['age_bins'].astype(str)
-        
-        return df
+        # Recomputed columns replace any same-named input columns
+        return pd.concat([df.drop(columns=derived.columns.intersection(df.columns)), derived], axis=1)
     
     def fit_transform(self, X, y=None):
         """Fit preprocessor and transform data"""
@@ -97,7 +74,7 @@ class HousePricePreprocessor:
         
         # Handle missing values
         numeric_cols = X_processed.select_dtypes(include=[np.number]).columns
-        categorical_cols = X_processed.select_dtypes(include=['object']).columns
+        categorical_cols = X_processed.select_dtypes(include=['object', 'category']).columns
         
         # Impute numeric missing values
         if len(numeric_cols) > 0:
@@ -106,13 +83,16 @@ class HousePricePreprocessor:
                                                     columns=numeric_cols,
                                                     index=X_processed.index)
         
-        # Encode categorical variables
+        # Encode categorical variables (str() labels, missing -> 'Unknown');
+        # the encoder is fitted on the distinct labels, rows are gathered by code
+        tables = {}
         for col in categorical_cols:
             if col not in self.label_encoders:
                 self.label_encoders[col] = LabelEncoder()
-            X_processed[col] = self.label_encoders[col].fit_transform(
-                X_processed[col].astype(str).fillna('Unknown')
-            )
+            codes, labels = factorize_labels(X_processed[col])
+            self.label_encoders[col].fit(labels[np.unique(codes)])
+            table = tables[col] = CategoryTable.from_encoder(self.label_encoders[col])
+            X_processed[col] = table.encode_unique(labels)[codes]
             # Track that this column is categorical (should not be scaled)
             self.categorical_features.add(col)
         
@@ -127,7 +107,11 @@ class HousePricePreprocessor:
         
         self.feature_names = list(X_processed.columns)
         self.is_fitted = True
+        self.build_category_tables(tables)
+        self.column_plan = ColumnPlan.from_fitted(self)
         
+        if self.dtype != np.float64:
+            X_processed = X_processed.astype(self.dtype)
         return X_processed
     
     def transform(self, X):
@@ -149,77 +133,141 @@ class HousePricePreprocessor:
                 UserWarning
             )
         
-        # Handle missing values
-        numeric_cols = [col for col in X_processed.select_dtypes(include=[np.number]).columns 
-                       if col in self.feature_names]
-        categorical_cols = [col for col in X_processed.select_dtypes(include=['object']).columns 
-                           if col in self.feature_names]
+        plan = self.column_plan
+        if plan is None:
+            plan = self.column_plan = ColumnPlan.from_fitted(self)
+        if len(self.category_tables) != len(self.label_encoders):
+            self.build_category_tables()
+        # Column-major output: every feature is contiguous, and pandas wraps
+        # the result without copying
+        n_rows = len(X_processed)
+        out = np.zeros((n_rows, plan.n_features), dtype=self.dtype, order='F')
         
-        # Impute numeric missing values
-        if len(numeric_cols) > 0:
-            X_processed[numeric_cols] = self.imputer.transform(X_processed[numeric_cols])
-            X_processed[numeric_cols] = pd.DataFrame(X_processed[numeric_cols],
-                                                     columns=numeric_cols,
-                                                     index=X_processed.index)
+        # Numeric: impute and scale chunk by chunk in float64 (absent columns
+        # count as missing), stored in the output dtype
+        plan.impute_and_scale_into(
+            [np.asarray(X_processed[col]) if col in X_processed.columns else None
+             for col in plan.numeric_cols],
+            out
+        )
         
-        # Encode categorical variables
-        for col in categorical_cols:
-            if col in self.label_encoders:
-                # Handle unseen categories
-                known_classes = set(self.label_encoders[col].classes_)
-                X_processed[col] = X_processed[col].astype(str).fillna('Unknown')
-                
-                # Create mapping for known classes
-                class_to_int = {cls: idx for idx, cls in enumerate(self.label_encoders[col].classes_)}
-                max_known_int = max(class_to_int.values()) if class_to_int else -1
-                
-                # For unseen categories, use hash-based encoding to give each unique value
-                # a different encoding, ensuring different cities get different values
-                def encode_value(x):
-                    if x in known_classes:
-                        return class_to_int[x]
-                    else:
-                        # Use hash to create a unique encoding for unseen values
-                        # Add max_known_int + 1 to ensure it's distinct from known classes
-                        # Use modulo to keep it within reasonable range (0 to 2*max_known_int)
-                        hash_val = hash(str(x)) % (max_known_int + 1000)
-                        return max_known_int + 1 + abs(hash_val)
-                
-                X_processed[col] = X_processed[col].apply(encode_value)
-        
-        # Ensure all expected features exist
-        for feat in self.feature_names:
-            if feat not in X_processed.columns:
-                X_processed[feat] = 0
-        
-        # Reorder columns to match training
-        X_processed = X_processed[self.feature_names]
+        # Categorical: unseen categories get a stable hash-based code above the
+        # known range, so different cities get different values and every
+        # worker process agrees on them; absent columns get the default fill
+        for col, idx in zip(plan.categorical_cols, plan.categorical_idx):
+            if col in X_processed.columns:
+                out[:, idx] = self.category_tables[col].encode(X_processed[col])
+            else:
+                out[:, idx] = plan.categorical_fill
         
-        # Scale numeric features (EXCLUDE encoded categorical features)
-        # Categorical features that have been label-encoded should NOT be scaled
-        numeric_cols_to_scale = [col for col in numeric_cols if col not in self.categorical_features]
-        if len(numeric_cols_to_scale) > 0:
-            X_scaled = self.scaler.transform(X_processed[numeric_cols_to_scale])
-            X_processed[numeric_cols_to_scale] = pd.DataFrame(X_scaled,
-                                                     columns=numeric_cols_to_scale,
-                                                     index=X_processed.index)
+        return pd.DataFrame(out, columns=self.feature_names, index=X_processed.index, copy=False)
+    
+    def fit_streaming(self, chunks, sketch_capacity=4096):
+        """
+        Fit on an iterable of DataFrame chunks without holding every row
         
-        return X_processed
+        Scaler statistics accumulate with partial_fit, imputer medians come
+        from a bounded quantile sketch per column (exact until a column has
+        `sketch_capacity` values) and label vocabularies grow chunk by chunk,
+        so memory is set by the chunk size. Column roles are taken from the
+        first chunk. Returns self.
+        """
+        state = StreamingFit(sketch_capacity)
+        for chunk in chunks:
+            state.update(self.create_advanced_features(chunk))
+        state.finalize(self)
+        self.build_category_tables()
+        self.column_plan = ColumnPlan.from_fitted(self)
+        return self
+    
+    def extend_vocabularies(self, X):
+        """
+        Add the categories first seen in X to the fitted vocabularies
+
+        New labels are appended after the known ones, so every existing
+        code stays the same and trees fitted earlier still read them
+        correctly. classes_ is then in code order rather than sorted; the
+        category tables do not need it sorted. Medians and scaler statistics
+        are left as fitted. Returns {column: new labels}.
+        """
+        if not self.is_fitted:
+            raise ValueError("Preprocessor must be fitted before its vocabularies are extended")
+        X_processed = self.create_advanced_features(X)
+        if len(self.category_tables) != len(self.label_encoders):
+            self.build_category_tables()
+        added = {}
+        for col, encoder in self.label_encoders.items():
+            if col not in X_processed.columns:
+                continue
+            codes, labels = factorize_labels(X_processed[col])
+            labels = labels[np.unique(codes)]
+            known, _ = self.category_tables[col].index.get_indexer(labels)
+            new = sorted(labels[known < 0])
+            if not new:
+                continue
+            extended = LabelEncoder()
+            extended.classes_ = np.concatenate([np.asarray(encoder.classes_, dtype=object),
+                                                np.array(new, dtype=object)])
+            self.label_encoders[col] = extended
+            self.category_tables[col] = CategoryTable.from_encoder(extended)
+            added[col] = new
+        return added
+
+    def transform_to_disk(self, chunks, path, dtype=None):
+        """
+        Transform DataFrame chunks and append them to a packed array file
+        (read back with packed_arrays.read_packed; the header lists
+        feature_names). `dtype` defaults to the preprocessor's. Returns the
+        number of rows written.
+        """
+        if not self.is_fitted:
+            raise ValueError("Preprocessor must be fitted before transform")
+        header = {'feature_names': list(self.feature_names)}
+        with PackedRowWriter(path, n_cols=len(self.feature_names), dtype=dtype or self.dtype,
+                             header=header, name='features') as writer:
+            for chunk in chunks:
+                writer.append(self.transform(chunk).to_numpy())
+        return writer.rows
+    
+    def build_category_tables(self, built=None):
+        """
+        Precompute the string -> code lookup for every label encoder, reusing
+        any tables in `built` (column -> CategoryTable)
+        """
+        built = built or {}
+        self.category_tables = {col: built[col] if col in built else CategoryTable.from_encoder(encoder)
+                                for col, encoder in self.label_encoders.items()}
+    
+    def compile_plan(self):
+        """Compile a pandas-free TransformPlan from the fitted state"""
+        from .transform_plan import TransformPlan
+        return TransformPlan(self)
     
     def save(self, filepath):
-        """Save preprocessor to disk"""
+        """
+        Save preprocessor to disk: a pickle-free packed artifact if the path
+        ends in .packed (see preprocessor_store), joblib otherwise
+        """
+        if Path(filepath).suffix == PACKED_SUFFIX:
+            save_preprocessor(self, filepath)
+            return
         preprocessor_data = {
             'scaler': self.scaler,
             'label_encoders': self.label_encoders,
             'imputer': self.imputer,
             'feature_names': self.feature_names,
             'is_fitted': self.is_fitted,
-            'categorical_features': self.categorical_features
+            'categorical_features': self.categorical_features,
+            'column_plan': self.column_plan.to_dict() if self.column_plan else None,
+            'dtype': self.dtype.name
         }
         joblib.dump(preprocessor_data, filepath)
     
     def load(self, filepath):
-        """Load preprocessor from disk"""
+        """Load preprocessor from disk (packed artifact or joblib)"""
+        if is_packed(filepath):
+            load_preprocessor(filepath, self)
+            return
         preprocessor_data = joblib.load(filepath)
         self.scaler = preprocessor_data['scaler']
         self.label_encoders = preprocessor_data['label_encoders']
@@ -232,4 +280,14 @@ class HousePricePreprocessor:
         else:
             # Infer categorical features from label_encoders (backward compatibility)
             self.categorical_features = set(preprocessor_data.get('label_encoders', {}).keys())
+        self.build_category_tables()
+        # Vocabularies live on in the compact index only; classes_ is decoded again if read
+        self.label_encoders = {col: IndexedLabelEncoder.from_index(self.category_tables[col].index)
+                               for col in self.label_encoders}
+        # Artifacts saved before the column plan existed derive it here
+        if preprocessor_data.get('column_plan'):
+            self.column_plan = ColumnPlan.from_dict(preprocessor_data['column_plan'])
+        elif self.is_fitted:
+            self.column_plan = ColumnPlan.from_fitted(self)
+        self.dtype = np.dtype(preprocessor_data.get('dtype', 'float64'))
 
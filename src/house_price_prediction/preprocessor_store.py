@@ -0,0 +1,168 @@
+"""
+Pickle-free preprocessor artifact
+A fitted HousePricePreprocessor as a small JSON header (column names, roles,
+options) plus packed arrays: imputer medians, scaler statistics, the column
+plan and every label vocabulary in one string table with offsets.
+Loading maps the file read-only and rebuilds the fitted state without
+unpickling sklearn objects, so it does not depend on the sklearn version
+that wrote it. Vocabularies stay in the mapping as StringIndexes (their
+sorted hashes are stored too) and are only decoded to Python strings when
+something reads LabelEncoder.classes_.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+from .category_encoding import IndexedLabelEncoder, StringIndex, hash_string_table
+from .column_plan import ColumnPlan
+from .packed_arrays import pack_strings, read_packed, write_packed
+
+PREPROCESSOR_FORMAT = "hpp-preprocessor"
+PREPROCESSOR_VERSION = 1
+PACKED_SUFFIX = ".packed"
+
+# The arrays are small; cache-line alignment instead of pages keeps the file compact
+ALIGNMENT = 64
+
+
+def pack_preprocessor(preprocessor):
+    """Header and arrays for a fitted preprocessor"""
+    if not preprocessor.is_fitted:
+        raise ValueError("Only a fitted preprocessor can be packed")
+    plan = preprocessor.column_plan or ColumnPlan.from_fitted(preprocessor)
+
+    imputer = preprocessor.imputer
+    imputer_columns = [str(c) for c in getattr(imputer, 'feature_names_in_', plan.numeric_cols)]
+    scaler = preprocessor.scaler
+    scaler_columns = [str(c) for c in getattr(scaler, 'feature_names_in_', [])]
+    if scaler_columns:
+        scaler_arrays = {
+            "scaler_mean": np.asarray(scaler.mean_, dtype=np.float64),
+            "scaler_scale": np.asarray(scaler.scale_, dtype=np.float64),
+            "scaler_var": np.asarray(scaler.var_, dtype=np.float64),
+            "scaler_n_samples": np.broadcast_to(scaler.n_samples_seen_,
+                                                (len(scaler_columns),)).astype(np.int64),
+        }
+    else:
+        scaler_arrays = {}
+
+    # Each column's slice keeps classes_ order, which is code order: sorted
+    # after a fit, but extend_vocabularies appends new labels unsorted
+    vocabularies = {}
+    strings = []
+    for col, encoder in preprocessor.label_encoders.items():
+        vocabularies[col] = [len(strings), len(strings) + len(encoder.classes_)]
+        strings.extend(encoder.classes_)
+    blob, offsets = pack_strings(strings)
+    # Each vocabulary's StringIndex: its hashes sorted, with ids into the vocabulary
+    hashes = hash_string_table(blob, offsets)
+    ids = np.zeros(len(strings), dtype=np.uint32)
+    for start, stop in vocabularies.values():
+        order = np.argsort(hashes[start:stop], kind='stable')
+        hashes[start:stop] = hashes[start:stop][order]
+        ids[start:stop] = order
+
+    header = {
+        "format": PREPROCESSOR_FORMAT,
+        "version": PREPROCESSOR_VERSION,
+        "feature_names": list(preprocessor.feature_names),
+        "categorical_features": sorted(preprocessor.categorical_features),
+        "dtype": preprocessor.dtype.name,
+        "imputer_columns": imputer_columns,
+        "scaler_columns": scaler_columns,
+        "scaler_options": {"with_mean": bool(scaler.with_mean), "with_std": bool(scaler.with_std)},
+        "numeric_cols": plan.numeric_cols,
+        "categorical_cols": plan.categorical_cols,
+        "categorical_fill": plan.categorical_fill,
+        "vocabularies": vocabularies,
+    }
+    arrays = {
+        "imputer_statistics": np.asarray(imputer.statistics_, dtype=np.float64),
+        **scaler_arrays,
+        "fill_values": plan.fill_values,
+        "scaled": plan.scaled.astype(np.uint8),
+        "means": plan.means,
+        "scales": plan.scales,
+        "strings": blob,
+        "string_offsets": offsets,
+        "string_hashes": hashes,
+        "string_ids": ids,
+    }
+    return header, arrays
+
+
+def save_preprocessor(preprocessor, path):
+    """Write a packed preprocessor artifact (atomically, see write_packed)"""
+    header, arrays = pack_preprocessor(preprocessor)
+    write_packed(path, header, arrays, alignment=ALIGNMENT)
+
+
+def _fitted(estimator, columns, **attributes):
+    """Set the fitted attributes sklearn would have set on `estimator`"""
+    estimator.feature_names_in_ = np.array(columns, dtype=object)
+    estimator.n_features_in_ = len(columns)
+    for name, value in attributes.items():
+        setattr(estimator, name, value)
+    return estimator
+
+
+def load_preprocessor(path, preprocessor=None):
+    """
+    Map a packed artifact and restore a fitted preprocessor from it (a new
+    HousePricePreprocessor unless one is given). The plan's arrays stay
+    views of the mapping.
+    """
+    from .preprocessing import HousePricePreprocessor
+
+    header, arrays = read_packed(path)
+    if header.get("format") != PREPROCESSOR_FORMAT:
+        raise ValueError(f"{path} is not a preprocessor artifact")
+    if header.get("version", 0) > PREPROCESSOR_VERSION:
+        raise ValueError(f"Unsupported preprocessor artifact version {header['version']}")
+
+    if preprocessor is None:
+        preprocessor = HousePricePreprocessor()
+    preprocessor.feature_names = header["feature_names"]
+    preprocessor.categorical_features = set(header["categorical_features"])
+    preprocessor.dtype = np.dtype(header["dtype"])
+    preprocessor.imputer = _fitted(SimpleImputer(strategy='median'), header["imputer_columns"],
+                                   statistics_=arrays["imputer_statistics"])
+    preprocessor.scaler = StandardScaler(**header["scaler_options"])
+    if header["scaler_columns"]:
+        n_samples = arrays["scaler_n_samples"]
+        _fitted(preprocessor.scaler, header["scaler_columns"],
+                mean_=arrays["scaler_mean"], scale_=arrays["scaler_scale"],
+                var_=arrays["scaler_var"],
+                n_samples_seen_=int(n_samples[0]) if (n_samples == n_samples[0]).all() else n_samples)
+
+    blob, offsets = arrays["strings"], arrays["string_offsets"]
+    hashes, ids = arrays.get("string_hashes"), arrays.get("string_ids")
+    preprocessor.label_encoders = {}
+    for col, (start, stop) in header["vocabularies"].items():
+        # Artifacts written before the hashes were stored build them here
+        index = StringIndex(blob, offsets[start:stop + 1],
+                            *((hashes[start:stop], ids[start:stop]) if hashes is not None else ()))
+        preprocessor.label_encoders[col] = IndexedLabelEncoder.from_index(index)
+
+    preprocessor.column_plan = ColumnPlan(
+        header["feature_names"], header["numeric_cols"], arrays["fill_values"],
+        arrays["scaled"].astype(bool), arrays["means"], arrays["scales"],
+        header["categorical_cols"], header["categorical_fill"],
+    )
+    preprocessor.is_fitted = True
+    preprocessor.build_category_tables()
+    return preprocessor
+
+
+if __name__ == '__main__':
+    # Convert a joblib preprocessor: python -m house_price_prediction.preprocessor_store models/preprocessor.joblib
+    from .preprocessing import HousePricePreprocessor
+    src = Path(sys.argv[1] if len(sys.argv) > 1 else 'models/preprocessor.joblib')
+    dst = Path(sys.argv[2]) if len(sys.argv) > 2 else src.with_suffix(PACKED_SUFFIX)
+    preprocessor = HousePricePreprocessor()
+    preprocessor.load(src)
+    save_preprocessor(preprocessor, dst)
+    print(f"✅ Preprocessor artifact written: {dst} ({dst.stat().st_size:,} bytes, was {src.stat().st_size:,})")
@@ -0,0 +1,62 @@
+"""
+Streaming NDJSON prediction
+Listings are read from a byte stream in fixed-size chunks and each chunk's
+predictions are emitted as soon as they are ready, so memory stays flat
+regardless of how many listings the request contains.
+"""
+import json
+
+
+def iter_record_chunks(stream, chunk_rows):
+    """
+    Yield lists of (row_number, record_or_error) from newline-delimited JSON
+    Blank lines are skipped; lines that are not JSON objects become error entries
+    """
+    chunk = []
+    row = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Each line must be a JSON object")
+        except ValueError as e:
+            record = e
+        chunk.append((row, record))
+        row += 1
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def predict_stream(snapshot, stream, chunk_rows=1000):
+    """Generate NDJSON result lines (one per input listing) for a snapshot"""
+    plan = snapshot.transform_plan
+    for chunk in iter_record_chunks(stream, chunk_rows):
+        lines = []
+        valid = [(row, rec) for row, rec in chunk if isinstance(rec, dict)]
+        predictions = []
+        if valid:
+            try:
+                predictions = snapshot.predict(plan.transform_records([rec for _, rec in valid]))
+            except Exception:
+                # Fall back to row-by-row so one bad listing doesn't fail the chunk
+                predictions = []
+                for _, rec in valid:
+                    try:
+                        predictions.append(snapshot.predict(plan.transform_records([rec]))[0])
+                    except Exception as e:
+                        predictions.append(e)
+        results = dict(zip((row for row, _ in valid), predictions))
+        for row, rec in chunk:
+            result = results.get(row, rec)
+            if isinstance(result, Exception):
+                lines.append(json.dumps({"row": row, "error": str(result),
+                                         "error_type": type(result).__name__}))
+            else:
+                lines.append(json.dumps({"row": row, "predicted_price": float(result)}))
+        yield "\n".join(lines) + "\n"
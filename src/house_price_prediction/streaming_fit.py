@@ -0,0 +1,168 @@
+"""
+Out-of-core fitting for HousePricePreprocessor
+Chunks are folded into bounded-size state: StandardScaler.partial_fit for
+means/variances, a quantile sketch per numeric column for the imputer
+medians, and a growing label set per categorical column. Memory depends on
+the chunk size, the sketch capacity and the vocabularies, not on the
+number of rows.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from .category_encoding import factorize_labels
+
+class QuantileSketch:
+    """
+    Bounded-memory quantile estimator (a KLL-style compactor stack)
+
+    Level i holds values that each stand for 2**i observations. When a level
+    reaches `capacity` it is sorted and every other value (alternating
+    offset) moves up a level, so memory is about capacity * log2(n / capacity)
+    values. Until the first compaction the answer is exact; after it the
+    rank error stays within a small fraction of n.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = max(int(capacity), 2)
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._offset = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        level = 0
+        while level < len(self.levels) and len(self.levels[level]) >= self.capacity:
+            buffer = np.sort(self.levels[level])
+            # An odd value out stays behind so weights are conserved
+            keep = buffer[len(buffer) - len(buffer) % 2:]
+            promoted = buffer[self._offset:len(buffer) - len(keep):2]
+            self._offset ^= 1
+            self.levels[level] = keep
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    @property
+    def exact(self):
+        return len(self.levels) == 1
+
+    @property
+    def size(self):
+        return sum(len(level) for level in self.levels)
+
+    def quantile(self, q):
+        """Approximate q-quantile (NaN if no values were seen)"""
+        if self.count == 0:
+            return np.nan
+        if self.exact:
+            return float(np.quantile(self.levels[0], q))
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** i) for i, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        return float(values[order][np.searchsorted(cumulative, q * cumulative[-1])])
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+def fold_in_fill_values(scaler, missing, fill_values):
+    """
+    partial_fit skips NaNs, but fit_transform scales imputed data: merge
+    `missing[j]` copies of `fill_values[j]` into each column's mean and
+    variance (pairwise update, no rows materialised)
+    """
+    counts = np.broadcast_to(scaler.n_samples_seen_, scaler.mean_.shape).astype(np.float64)
+    missing = np.asarray(missing, dtype=np.float64)
+    total = counts + missing
+    # Columns with no observed values have NaN statistics; start them from zero
+    mean = np.where(counts > 0, scaler.mean_, 0.0)
+    var = np.where(counts > 0, scaler.var_, 0.0)
+    delta = np.asarray(fill_values, dtype=np.float64) - mean
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = np.where(total > 0, missing / total, 0.0)
+        m2 = var * counts + delta ** 2 * counts * share
+        scaler.mean_ = mean + delta * share
+        scaler.var_ = np.where(total > 0, m2 / total, 0.0)
+    # Same zero-variance guard StandardScaler applies
+    constant = scaler.var_ <= 10 * np.finfo(np.float64).eps * scaler.mean_ ** 2
+    scaler.scale_ = np.where(constant, 1.0, np.sqrt(scaler.var_))
+    total = total.astype(np.int64)
+    scaler.n_samples_seen_ = int(total[0]) if (total == total[0]).all() else total
+
+
+class StreamingFit:
+    """Accumulates everything fit_transform learns, one processed chunk at a time"""
+
+    def __init__(self, sketch_capacity=4096):
+        self.sketch_capacity = sketch_capacity
+        self.feature_names = None
+        self.numeric_cols = None
+        self.categorical_cols = None
+        self.sketches = None
+        self.missing = None
+        self.vocabularies = None
+        self.scaler = StandardScaler()
+        self.rows = 0
+
+    def update(self, X_processed):
+        """Fold one chunk (output of create_advanced_features) into the state"""
+        if self.feature_names is None:
+            # Column roles come from the first chunk, like fit_transform's select_dtypes
+            self.feature_names = list(X_processed.columns)
+            self.numeric_cols = list(X_processed.select_dtypes(include=[np.number]).columns)
+            self.categorical_cols = list(
+                X_processed.select_dtypes(include=['object', 'category']).columns
+            )
+            self.sketches = [QuantileSketch(self.sketch_capacity) for _ in self.numeric_cols]
+            self.missing = np.zeros(len(self.numeric_cols), dtype=np.int64)
+            self.vocabularies = {col: set() for col in self.categorical_cols}
+        elif set(X_processed.columns) != set(self.feature_names):
+            raise ValueError("Every chunk must have the same columns as the first one")
+        if not len(X_processed):
+            return
+
+        numeric = X_processed[self.numeric_cols].to_numpy(dtype=np.float64)
+        for j, sketch in enumerate(self.sketches):
+            sketch.update(numeric[:, j])
+        self.missing += np.isnan(numeric).sum(axis=0)
+        if self.numeric_cols:
+            self.scaler.partial_fit(pd.DataFrame(numeric, columns=self.numeric_cols))
+
+        for col in self.categorical_cols:
+            codes, labels = factorize_labels(X_processed[col])
+            self.vocabularies[col].update(labels[np.unique(codes)])
+        self.rows += len(X_processed)
+
+    def finalize(self, preprocessor):
+        """Install the fitted imputer, scaler and encoders on a preprocessor"""
+        if not self.rows:
+            raise ValueError("Cannot fit on an empty stream")
+        # A column with no observed values is filled with 0 (fit_transform would drop it)
+        medians = [sketch.median() if sketch.count else 0.0 for sketch in self.sketches]
+
+        if self.numeric_cols:
+            # A one-row fit makes a regular SimpleImputer whose statistics_ are the medians
+            preprocessor.imputer = SimpleImputer(strategy='median').fit(
+                pd.DataFrame([medians], columns=self.numeric_cols)
+            )
+            fold_in_fill_values(self.scaler, self.missing, medians)
+            preprocessor.scaler = self.scaler
+
+        for col in self.categorical_cols:
+            encoder = preprocessor.label_encoders.get(col) or LabelEncoder()
+            encoder.fit(np.array(sorted(self.vocabularies[col]), dtype=object))
+            preprocessor.label_encoders[col] = encoder
+            preprocessor.categorical_features.add(col)
+
+        preprocessor.feature_names = list(self.feature_names)
+        preprocessor.is_fitted = True
+        return preprocessor
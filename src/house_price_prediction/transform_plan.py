@@ -0,0 +1,133 @@
+"""
+Compiled transform plan for HousePricePreprocessor
+Turns JSON records straight into a NumPy feature matrix without pandas
+"""
+import numpy as np
+
+from .category_encoding import CategoryTable, MISSING_LABEL
+from .column_plan import ColumnPlan
+from .feature_engineering import RATIO_FEATURES, BINNED_FEATURES, bin_codes
+
+
+class CategoricalColumn:
+    """
+    Dictionary-encoded column: integer codes into a list of categories
+    (-1 marks a missing value). Lets binary decoders skip per-row strings.
+    """
+
+    __slots__ = ("codes", "categories")
+
+    def __init__(self, codes, categories):
+        self.codes = np.asarray(codes)
+        self.categories = list(categories)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def to_numeric(self):
+        lookup = np.append(np.asarray(self.categories, dtype=np.float64), np.nan)
+        return lookup[self.codes]
+
+
+class TransformPlan:
+    """
+    Pandas-free equivalent of HousePricePreprocessor.transform
+
+    Built once from a fitted preprocessor: feature order, imputer medians,
+    scaler mean/scale, encoder lookup tables and bin edges are resolved up
+    front so transform is a handful of NumPy operations per column.
+    """
+
+    def __init__(self, preprocessor):
+        if not preprocessor.is_fitted:
+            raise ValueError("Preprocessor must be fitted before compiling a plan")
+
+        columns = preprocessor.column_plan or ColumnPlan.from_fitted(preprocessor)
+        self.column_plan = columns
+        self.feature_names = columns.feature_names
+        self.n_features = columns.n_features
+        self.dtype = getattr(preprocessor, 'dtype', np.dtype(np.float64))
+        position = {name: i for i, name in enumerate(self.feature_names)}
+
+        # Numeric columns: impute, then scale (see ColumnPlan)
+        self.numeric_cols = columns.numeric_cols
+        self.numeric_idx = columns.numeric_idx
+
+        # Categorical columns: string -> int lookup tables
+        self.categorical_cols = columns.categorical_cols
+        tables = preprocessor.category_tables
+        self.encoders = {
+            col: tables[col] if col in tables
+            else CategoryTable.from_encoder(preprocessor.label_encoders[col])
+            for col in self.categorical_cols
+        }
+
+        # Derived features only matter if the model was trained on them
+        self.ratio_features = [f for f in RATIO_FEATURES if f[0] in position]
+        self.square_features = [('income_squared', 'median_income')] if 'income_squared' in position else []
+        self.binned_features = []
+        for name, source, edges, labels in BINNED_FEATURES:
+            if name in position:
+                self.binned_features.append(
+                    (name, source, np.asarray(edges, dtype=np.float64), list(labels))
+                )
+
+        self._position = position
+
+    def transform_records(self, records):
+        """Transform a dict or list of dicts into a (n_rows, n_features) matrix of self.dtype"""
+        if isinstance(records, dict):
+            records = [records]
+        columns = {}
+        for record in records:
+            for key in record:
+                if key not in columns:
+                    columns[key] = [r.get(key, np.nan) for r in records]
+        return self.transform_columns(columns, len(records))
+
+    def transform_columns(self, columns, n_rows):
+        """Transform a dict of column name -> sequence of values"""
+        numeric = {}
+
+        def numeric_column(name):
+            if name not in numeric:
+                if isinstance(columns.get(name), CategoricalColumn):
+                    numeric[name] = columns[name].to_numeric()
+                elif name in columns:
+                    numeric[name] = np.asarray(columns[name], dtype=np.float64)
+                else:
+                    numeric[name] = np.full(n_rows, np.nan)
+            return numeric[name]
+
+        for name, num, den in self.ratio_features:
+            numeric[name] = numeric_column(num) / (numeric_column(den) + 1)
+        for name, source in self.square_features:
+            numeric[name] = numeric_column(source) ** 2
+
+        out = np.zeros((n_rows, self.n_features), dtype=self.dtype)
+
+        # Numeric: impute, then scale (in float64, stored as self.dtype)
+        self.column_plan.impute_and_scale_into([numeric_column(col) for col in self.numeric_cols], out)
+
+        # Binned features are encoded through their label encoder
+        binned = {}
+        for name, source, edges, labels in self.binned_features:
+            if source in columns:
+                # Out-of-range values (code -1) are missing
+                binned[name] = CategoricalColumn(bin_codes(numeric_column(source), edges), labels)
+
+        # Categorical: label encode, unseen values get a stable hash-based code
+        for col in self.categorical_cols:
+            table = self.encoders[col]
+            column = binned.get(col, columns.get(col))
+            if isinstance(column, CategoricalColumn):
+                # Encode each category once, then gather by code (-1 -> missing)
+                labels = [str(c) for c in column.categories] + [MISSING_LABEL]
+                encoded = table.encode_unique(labels)
+                out[:, self._position[col]] = encoded[column.codes]
+            elif column is not None:
+                out[:, self._position[col]] = table.encode(column)
+            else:
+                out[:, self._position[col]] = self.column_plan.categorical_fill
+
+        return out
@@ -0,0 +1,121 @@
+"""
+Flattened-array inference engine for tree ensembles
+Every tree of a RandomForestRegressor / GradientBoostingRegressor is packed
+into shared node arrays and all trees are walked together, one level per
+step, with vectorised NumPy gathers. This skips sklearn's per-call input
+validation, per-estimator dispatch and joblib threading, which dominate
+small-batch latency. sklearn's compiled traversal wins again on large
+batches, so a compiled joblib model hands those back to the estimator.
+"""
+import os
+
+import numpy as np
+
+# Rows walked together; keeps the (rows x trees) node matrix cache-sized
+ROW_BLOCK = 2048
+
+# Batches at least this large go to the wrapped sklearn estimator, if any
+ENGINE_MAX_ROWS = int(os.environ.get("HPP_ENGINE_MAX_ROWS", "512"))
+
+
+class TreeEnsemble:
+    """
+    Packed tree ensemble
+
+    Layout (see model_store.layout_nodes): all trees share flat node arrays,
+    a node's children sit at `child` and `child + 1`, and leaves point to
+    themselves with an +inf threshold. A fixed number of level steps (the
+    deepest tree's depth) therefore lands every row on its leaf without
+    masking. Inputs are cast to float32 and `x <= threshold` goes left,
+    exactly like sklearn.
+    """
+
+    def __init__(self, roots, feature, threshold, child, value, depth,
+                 n_features, aggregate='mean', base=0.0, scale=1.0,
+                 missing_left=None, model_type=None, max_depth=None,
+                 estimator=None, max_rows=None):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.child = child
+        self.value = value
+        self.depth = int(depth)
+        self.n_features_in_ = int(n_features)
+        self.aggregate = aggregate
+        self.base = base
+        self.scale = scale
+        self.missing_left = missing_left
+        self.model_type = model_type
+        self.n_estimators = len(roots)
+        self.max_depth = max_depth
+        self.estimator = estimator
+        self.max_rows = ENGINE_MAX_ROWS if max_rows is None else max_rows
+
+    @classmethod
+    def from_model(cls, model, max_rows=None):
+        """
+        Compile a fitted RandomForestRegressor or GradientBoostingRegressor;
+        batches of max_rows or more are still predicted by the model itself
+        """
+        from .model_store import pack_forest  # model_store imports this module
+        header, arrays = pack_forest(model)
+        return cls.from_arrays(header, arrays, estimator=model, max_rows=max_rows)
+
+    @classmethod
+    def from_arrays(cls, header, arrays, estimator=None, max_rows=None):
+        return cls(
+            arrays["roots"], arrays["feature"], arrays["threshold"],
+            arrays["child"], arrays["value"],
+            depth=header["depth"], n_features=header["n_features"],
+            aggregate=header["aggregate"], base=header["base"], scale=header["scale"],
+            missing_left=arrays.get("missing_left"),
+            model_type=header.get("model_type"), max_depth=header.get("max_depth"),
+            estimator=estimator, max_rows=max_rows,
+        )
+
+    def apply(self, X):
+        """Leaf node index for every (row, tree) pair"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        has_nan = self.missing_left is not None and np.isnan(X).any()
+        n_rows = X.shape[0]
+        leaves = np.empty((n_rows, len(self.roots)), dtype=np.int32)
+        flat = X.reshape(-1)
+        for start in range(0, n_rows, ROW_BLOCK):
+            block = slice(start, min(start + ROW_BLOCK, n_rows))
+            offsets = (np.arange(block.start, block.stop, dtype=np.intp) * X.shape[1])[:, None]
+            node = np.broadcast_to(self.roots, (block.stop - block.start, len(self.roots))).copy()
+            for _ in range(self.depth):
+                x = flat[offsets + self.feature[node]]
+                if has_nan:
+                    go_left = (x <= self.threshold[node]) | (np.isnan(x) & (self.missing_left[node] == 1))
+                    node = self.child[node] + ~go_left
+                else:
+                    node = self.child[node] + (x > self.threshold[node])
+            leaves[block] = node
+        return leaves
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+        if X.shape[0] == 0:
+            return np.empty(0, dtype=np.float64)
+        if self.estimator is not None and self.max_rows and X.shape[0] >= self.max_rows:
+            return self.estimator.predict(X)
+        leaf_values = self.value[self.apply(X)]
+        total = leaf_values.sum(axis=1)
+        if self.aggregate == 'mean':
+            return total / len(self.roots)
+        return self.base + self.scale * total
+
+
+def compile_model(model, max_rows=None):
+    """TreeEnsemble for supported sklearn ensembles, else None"""
+    if isinstance(model, TreeEnsemble):
+        return model
+    if type(model).__name__ not in ('RandomForestRegressor', 'GradientBoostingRegressor'):
+        return None
+    try:
+        return TreeEnsemble.from_model(model, max_rows=max_rows)
+    except ValueError:
+        return None
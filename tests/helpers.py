@@ -0,0 +1,96 @@
+"""
+Synthetic data helpers for offline tests
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+CITIES = ['Agra', 'Bangalore', 'Chennai', 'Delhi', 'Kanpur', 'Lucknow', 'Mumbai', 'Pune']
+
+
+def make_listings(n=400, seed=0):
+    """Listing-style frame with the same columns as the production dataset"""
+    rng = np.random.default_rng(seed)
+    cities = rng.choice(CITIES, n)
+    sqft = rng.uniform(300, 4000, n).round(1)
+    bhk = rng.integers(1, 6, n)
+    lon = rng.uniform(70, 90, n)
+    lat = rng.uniform(10, 30, n)
+    X = pd.DataFrame({
+        'POSTED_BY': rng.choice(['Owner', 'Dealer', 'Builder'], n),
+        'UNDER_CONSTRUCTION': rng.integers(0, 2, n),
+        'RERA': rng.integers(0, 2, n),
+        'BHK_NO.': bhk,
+        'BHK_OR_RK': rng.choice(['BHK', 'RK'], n, p=[0.9, 0.1]),
+        'SQUARE_FT': sqft,
+        'READY_TO_MOVE': rng.integers(0, 2, n),
+        'RESALE': rng.integers(0, 2, n),
+        'ADDRESS': [f'Block {i % 37},{c}' for i, c in enumerate(cities)],
+        'LONGITUDE': lon,
+        'LATITUDE': lat,
+        'area': sqft,
+        'bedrooms': bhk,
+        'longitude': lon,
+        'latitude': lat,
+        'CITY_NAME': cities,
+    })
+    city_factor = pd.Series(cities).map({c: i + 1 for i, c in enumerate(CITIES)}).to_numpy()
+    y = pd.Series(sqft * city_factor * 10 + bhk * 500 + rng.normal(0, 100, n), name='PRICE')
+    return X, y
+
+
+def make_census(n=400, seed=0):
+    """California-housing style frame that exercises every derived feature"""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        'longitude': rng.uniform(-124, -114, n),
+        'latitude': rng.uniform(32, 42, n),
+        'housing_median_age': rng.integers(0, 60, n).astype(float),
+        'total_rooms': rng.integers(10, 5000, n).astype(float),
+        'total_bedrooms': rng.integers(1, 1000, n).astype(float),
+        'population': rng.integers(5, 4000, n).astype(float),
+        'households': rng.integers(1, 1500, n).astype(float),
+        'median_income': rng.uniform(0, 15, n),
+        'ocean_proximity': rng.choice(['NEAR BAY', 'INLAND', '<1H OCEAN'], n),
+    })
+    X.loc[::17, 'total_bedrooms'] = np.nan
+    y = pd.Series(X['median_income'] * 40000 + rng.normal(0, 1000, n), name='price')
+    return X, y
+
+
+def fit_listing_model(n=400, seed=0, n_estimators=10):
+    """Fit a preprocessor and a small forest on synthetic listings"""
+    from sklearn.ensemble import RandomForestRegressor
+    from house_price_prediction.preprocessing import HousePricePreprocessor
+
+    X, y = make_listings(n, seed)
+    preprocessor = HousePricePreprocessor()
+    X_processed = preprocessor.fit_transform(X)
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=8, random_state=seed)
+    model.fit(X_processed, y)
+    return model, preprocessor
+
+
+def install_model(app_module, model, preprocessor, version='test'):
+    """Publish an in-memory model as the Flask app's current snapshot"""
+    from house_price_prediction.model_registry import ModelSnapshot
+    snapshot = ModelSnapshot(model, preprocessor, preprocessor.compile_plan(), version)
+    app_module.install_snapshot(snapshot.validate())
+
+
+def save_artifacts(model_dir, model, preprocessor, packed=False):
+    """
+    Write model + preprocessor the way train_model.py does; with packed, the
+    packed preprocessor and memory-mapped forest too, in save_model's order
+    """
+    import joblib
+    joblib.dump(model, model_dir / 'house_price_model.joblib')
+    preprocessor.save(model_dir / 'preprocessor.joblib')
+    if packed:
+        from house_price_prediction.model_store import save_forest
+        preprocessor.save(model_dir / 'preprocessor.packed')
+        save_forest(model, model_dir / 'house_price_model.forest')
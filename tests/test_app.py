@@ -0,0 +1,233 @@
+"""
+Offline tests for the Flask API using the test client
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.helpers import fit_listing_model, install_model, make_listings
+from house_price_prediction import app as app_module
+from house_price_prediction import debug_log
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    return fit_listing_model()
+
+
+@pytest.fixture
+def client(fitted, tmp_path, monkeypatch):
+    debug_log.configure(path=tmp_path / 'debug.log')
+    install_model(app_module, *fitted)
+    return app_module.app.test_client()
+
+
+def test_single_prediction_matches_model(client, fitted):
+    model, preprocessor = fitted
+    X, _ = make_listings(1, seed=5)
+    record = X.to_dict(orient='records')[0]
+    response = client.post('/predict', json=record)
+    assert response.status_code == 200
+    body = response.get_json()
+    expected = model.predict(preprocessor.transform(pd.DataFrame([record])))[0]
+    assert body['predicted_price'] == pytest.approx(expected)
+    for field in ('inference_time_ms', 'preprocessing_time_ms', 'model_inference_time_ms'):
+        assert field in body
+
+
+def test_batch_prediction(client, fitted):
+    model, preprocessor = fitted
+    X, _ = make_listings(7, seed=6)
+    response = client.post('/predict/batch', json=X.to_dict(orient='records'))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['num_predictions'] == 7
+    assert body['predictions'] == pytest.approx(list(model.predict(preprocessor.transform(X))))
+
+
+def test_invalid_input(client):
+    response = client.post('/predict', json=[1, 2, 3])
+    assert response.status_code == 400
+
+
+def test_single_prediction_through_batcher(client, fitted, monkeypatch):
+    model, preprocessor = fitted
+    monkeypatch.setattr(app_module, 'batcher', app_module.MicroBatcher(app_module.run_model, 5, 8))
+    X, _ = make_listings(1, seed=7)
+    record = X.to_dict(orient='records')[0]
+    body = client.post('/predict', json=record).get_json()
+    expected = model.predict(preprocessor.transform(pd.DataFrame([record])))[0]
+    assert body['predicted_price'] == pytest.approx(expected)
+    assert body['batch_size'] == 1
+    assert 'model_inference_time_ms' in body
+
+
+def test_repeated_listing_is_served_from_cache(client, fitted):
+    X, _ = make_listings(3, seed=8)
+    records = X.to_dict(orient='records')
+    first = client.post('/predict', json=records[0]).get_json()
+    reordered = dict(reversed(list(records[0].items())))
+    second = client.post('/predict', json=reordered).get_json()
+    assert first['cache_hit'] is False
+    assert second['cache_hit'] is True
+    assert second['predicted_price'] == first['predicted_price']
+
+    batch = client.post('/predict/batch', json=records).get_json()
+    assert batch['cache_hits'] == 1
+    assert batch['predictions'][0] == first['predicted_price']
+
+
+def test_admin_reload_swaps_snapshot(client, tmp_path, monkeypatch):
+    import time
+    from tests.helpers import save_artifacts
+
+    monkeypatch.setattr(app_module, 'MODEL_DIR', tmp_path)
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', 'secret')
+    save_artifacts(tmp_path, *fit_listing_model(n=200, seed=1, n_estimators=3))
+    assert app_module.load_model()
+    old_version = app_module.model_version
+    record = make_listings(1, seed=9)[0].to_dict(orient='records')[0]
+    assert client.post('/predict', json=record).get_json()['model_version'] == old_version
+
+    time.sleep(0.01)
+    save_artifacts(tmp_path, *fit_listing_model(n=200, seed=2, n_estimators=4))
+    response = client.post('/admin/reload', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 202
+    for _ in range(200):
+        if app_module.model_version != old_version:
+            break
+        time.sleep(0.05)
+    assert app_module.model_version != old_version
+    body = client.post('/predict', json=record).get_json()
+    assert body['model_version'] == app_module.model_version
+    assert body['cache_hit'] is False
+    info = client.get('/model/info').get_json()
+    assert info['n_estimators'] == 4
+    assert info['inference_engine'] == 'tree_ensemble'
+    assert info['memory_mapped'] is False
+    assert info['feature_dtype'] == 'float64'
+
+
+def test_old_snapshot_serves_until_reload(client, tmp_path, monkeypatch):
+    import time
+    from tests.helpers import save_artifacts
+
+    monkeypatch.setattr(app_module, 'MODEL_DIR', tmp_path)
+    save_artifacts(tmp_path, *fit_listing_model(n=200, seed=1, n_estimators=8), packed=True)
+    assert app_module.load_model()
+    old = app_module.snapshot
+    assert old.model_path.endswith('.forest')
+    assert 'string_index' in vars(old.preprocessor.label_encoders['ADDRESS'])
+    records = make_listings(5, seed=9)[0].to_dict(orient='records')
+    expected, *_ = app_module.run_model(records)
+
+    # A retrain writes all four artifacts, smaller than before, while the
+    # old snapshot still serves from the mapped forest and vocabularies
+    time.sleep(0.01)
+    save_artifacts(tmp_path, *fit_listing_model(n=60, seed=2, n_estimators=2), packed=True)
+    predictions, _, _, version = app_module.run_model(records, old)
+    np.testing.assert_array_equal(predictions, expected)
+    assert version == old.version == app_module.model_version
+
+    app_module.reload_model()
+    assert app_module.model_version != old.version
+    assert client.get('/model/info').get_json()['n_estimators'] == 2
+    predictions, *_ = app_module.run_model(records, old)
+    np.testing.assert_array_equal(predictions, expected)
+
+
+def test_admin_reload_fails_closed(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', None)
+    assert client.post('/admin/reload').status_code == 403
+    assert client.post('/admin/reload', headers={'X-Admin-Token': ''}).status_code == 403
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', 'secret')
+    assert client.post('/admin/reload').status_code == 403
+    assert client.post('/admin/reload', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+
+
+def test_snapshot_loads_packed_preprocessor(tmp_path, fitted):
+    from tests.helpers import save_artifacts
+    model, preprocessor = fitted
+    save_artifacts(tmp_path, model, preprocessor)
+    preprocessor.save(tmp_path / 'preprocessor.packed')
+    (tmp_path / 'preprocessor.joblib').unlink()
+    snapshot = app_module.build_snapshot(tmp_path)
+    X, _ = make_listings(5, seed=6)
+    pd.testing.assert_frame_equal(snapshot.preprocessor.transform(X), preprocessor.transform(X))
+
+
+def test_model_info_reports_hist_gradient_boosting_engine(client, fitted):
+    from house_price_prediction.engines import build_engine
+    _, preprocessor = fitted
+    X, y = make_listings(400)
+    model = build_engine('hist-gradient-boosting', preprocessor.transform(X), random_state=0)
+    model.fit(preprocessor.transform(X), y)
+    install_model(app_module, model, preprocessor, version='hgb')
+
+    record = make_listings(1, seed=10)[0].to_dict(orient='records')[0]
+    body = client.post('/predict', json=record).get_json()
+    expected = model.predict(preprocessor.transform(pd.DataFrame([record])))[0]
+    assert body['predicted_price'] == pytest.approx(expected)
+    info = client.get('/model/info').get_json()
+    assert info['engine'] == 'hist-gradient-boosting'
+    assert info['inference_engine'] == 'sklearn'
+    assert info['engine_params']['n_iter_'] == model.n_iter_
+    assert sorted(info['engine_params']['categorical_features_in']) == ['BHK_OR_RK', 'CITY_NAME', 'POSTED_BY']
+
+
+def test_stream_endpoint_returns_one_line_per_listing(client, fitted):
+    import json
+    model, preprocessor = fitted
+    X, _ = make_listings(25, seed=10)
+    lines = [json.dumps(r) for r in X.to_dict(orient='records')]
+    lines.insert(3, '')
+    lines.insert(7, 'not json')
+    response = client.post('/predict/stream?chunk_rows=4', data='\n'.join(lines) + '\n',
+                           content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.headers['X-Model-Version'] == 'test'
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r['row'] for r in results] == list(range(26))
+    assert 'error' in results[6]
+    prices = [r['predicted_price'] for r in results if 'predicted_price' in r]
+    assert prices == pytest.approx(list(model.predict(preprocessor.transform(X))))
+
+
+def test_columnar_batch(client, fitted):
+    model, preprocessor = fitted
+    X, _ = make_listings(12, seed=11)
+    payload = {col: X[col].tolist() for col in X.columns}
+    body = client.post('/predict/batch', json=payload).get_json()
+    assert body['num_predictions'] == 12
+    assert body['predicted_price'] == pytest.approx(list(model.predict(preprocessor.transform(X))))
+
+    payload['SQUARE_FT'] = payload['SQUARE_FT'][:-1]
+    assert client.post('/predict/batch', json=payload).status_code == 400
+
+
+def test_npz_and_arrow_batches(client, fitted):
+    import io
+    model, preprocessor = fitted
+    X, _ = make_listings(9, seed=12)
+    expected = model.predict(preprocessor.transform(X))
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **{col: X[col].to_numpy(dtype=str if X[col].dtype.kind in 'OT' else None)
+                        for col in X.columns})
+    response = client.post('/predict/batch', data=buffer.getvalue(), content_type='application/x-npz')
+    assert response.status_code == 200
+    with np.load(io.BytesIO(response.data)) as archive:
+        np.testing.assert_allclose(archive['predicted_price'], expected)
+
+    # Arrow IPC is optional in the app (binary_io); the .npz half runs regardless
+    pa = pytest.importorskip('pyarrow')
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(X, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    response = client.post('/predict/batch', data=sink.getvalue().to_pybytes(),
+                           content_type='application/vnd.apache.arrow.stream',
+                           headers={'Accept': 'application/octet-stream'})
+    assert response.status_code == 200
+    assert response.headers['X-Num-Predictions'] == '9'
+    np.testing.assert_allclose(np.frombuffer(response.data, dtype='<f8'), expected)
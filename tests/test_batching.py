@@ -0,0 +1,47 @@
+"""
+Tests for the micro-batching dispatcher
+"""
+import threading
+
+import pytest
+
+from house_price_prediction.batching import MicroBatcher
+
+
+def test_concurrent_requests_share_a_batch():
+    calls = []
+
+    def predict_fn(records):
+        calls.append(len(records))
+        return [r["x"] * 2 for r in records], 0.001, 0.002, "v1"
+
+    batcher = MicroBatcher(predict_fn, window_ms=50, max_batch_size=16)
+    results = [None] * 16
+
+    def worker(i):
+        results[i] = batcher.predict({"x": i}, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert [r.prediction for r in results] == [i * 2 for i in range(16)]
+    assert max(calls) > 1
+    assert sum(calls) == 16
+    assert all(r.predict_time == 0.002 for r in results)
+
+
+def test_bad_record_only_fails_its_own_request():
+    def predict_fn(records):
+        if any(r["x"] < 0 for r in records):
+            raise ValueError("negative")
+        return [r["x"] for r in records], 0.0, 0.0, "v1"
+
+    batcher = MicroBatcher(predict_fn, window_ms=50, max_batch_size=8)
+    good = batcher.submit({"x": 1})
+    bad = batcher.submit({"x": -1})
+    assert good.result(5).prediction == 1
+    with pytest.raises(ValueError):
+        bad.result(5)
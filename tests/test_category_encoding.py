@@ -0,0 +1,92 @@
+"""
+Tests for vectorised, deterministic category encoding
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tests.helpers import make_listings
+from house_price_prediction import category_encoding
+from house_price_prediction.category_encoding import (CategoryTable, StringIndex,
+                                                      hash_string_table, stable_hash)
+from house_price_prediction.packed_arrays import pack_strings
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+SRC = str(Path(__file__).resolve().parent.parent / 'src')
+
+
+def test_stable_hash_is_fnv1a_64():
+    assert stable_hash(['']).tolist() == [0xcbf29ce484222325]
+    assert stable_hash(['a']).tolist() == [0xaf63dc4c8601ec8c]
+    assert stable_hash(['foobar']).tolist() == [0x85944171f73967e8]
+
+
+def test_string_index_lookup(monkeypatch):
+    strings = ['', 'Agra', 'Bengaluru', 'Sector 5,Pune', 'Zürich', '東京']
+    assert hash_string_table(*pack_strings(strings)).tolist() == stable_hash(strings).tolist()
+    index = StringIndex.from_strings(strings)
+    queries = ['Zürich', 'Pune', '', 'Agra ', '東京', 'Agra', 'Sector 5,Pune'] * 3
+    expected = [4, -1, 0, -1, 5, 1, 3] * 3
+    for scalar_limit in (0, 100):
+        monkeypatch.setattr(category_encoding, 'SCALAR_LOOKUP', scalar_limit)
+        ids, hashes = index.get_indexer(queries)
+        assert ids.tolist() == expected
+        assert hashes.tolist() == stable_hash(queries).tolist()
+
+    # Hash collisions are resolved by comparing bytes
+    blob, offsets = pack_strings(strings)
+    colliding = StringIndex(blob, offsets, np.zeros(len(strings), dtype=np.uint64),
+                            np.arange(len(strings), dtype=np.uint32)[::-1].copy())
+    q_blob, q_offsets = pack_strings(queries)
+    found = colliding.locate(q_blob, q_offsets, np.zeros(len(queries), dtype=np.uint64))
+    assert found.tolist() == expected
+
+
+def test_unseen_codes_agree_across_hash_seeds():
+    script = ("from house_price_prediction.category_encoding import CategoryTable;"
+              "print(CategoryTable(['Delhi', 'Pune']).encode(['Atlantis', 'Ürümqi']).tolist())")
+    outputs = set()
+    for seed in ('1', '2'):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=SRC)
+        outputs.add(subprocess.check_output([sys.executable, '-c', script], env=env, text=True))
+    assert len(outputs) == 1
+
+
+def test_known_unseen_and_missing_values():
+    table = CategoryTable(['Bangalore', 'Delhi', 'Pune'])
+    codes = table.encode(['Pune', 'Atlantis', 'Bangalore', np.nan, 'Atlantis', 'Delhi'])
+    assert codes[[0, 2, 5]].tolist() == [2, 0, 1]
+    assert codes[1] == codes[4] and codes[1] > 2
+    assert codes[3] == table.encode_unique(['Unknown'])[0]
+    assert table.encode([]).shape == (0,)
+
+
+def test_missing_categories_match_dataframe_path():
+    X, _ = make_listings(100)
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    X_new, _ = make_listings(5, seed=3)
+    X_new['CITY_NAME'] = X_new['CITY_NAME'].astype(object)
+    X_new.loc[1, 'CITY_NAME'] = None
+    X_new.loc[2, 'CITY_NAME'] = np.nan
+    records = X_new.to_dict(orient='records')
+    expected = preprocessor.transform(pd.DataFrame(records)).to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(preprocessor.compile_plan().transform_records(records), expected)
+
+
+def test_tables_are_rebuilt_on_load(tmp_path):
+    X, _ = make_listings(100)
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    preprocessor.save(tmp_path / 'preprocessor.joblib')
+    loaded = HousePricePreprocessor()
+    loaded.load(tmp_path / 'preprocessor.joblib')
+    assert set(loaded.category_tables) == set(preprocessor.label_encoders)
+
+    X_new, _ = make_listings(30, seed=4)
+    X_new.loc[0, 'ADDRESS'] = 'Nowhere Road,Atlantis'
+    pd.testing.assert_frame_equal(loaded.transform(X_new), preprocessor.transform(X_new))
@@ -0,0 +1,114 @@
+"""
+Tests for the fit-time column plan
+"""
+import joblib
+import numpy as np
+import pandas as pd
+
+from tests.helpers import make_listings, make_census
+from house_price_prediction.column_plan import ColumnPlan
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+
+def _fitted(make=make_listings):
+    X, _ = make()
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    return preprocessor
+
+
+def test_plan_is_saved_and_old_artifacts_derive_it(tmp_path):
+    preprocessor = _fitted(make_census)
+    path = tmp_path / 'preprocessor.joblib'
+    preprocessor.save(path)
+    assert joblib.load(path)['column_plan'] == preprocessor.column_plan.to_dict()
+
+    # An artifact written before the plan existed
+    data = joblib.load(path)
+    del data['column_plan'], data['categorical_features']
+    joblib.dump(data, tmp_path / 'old.joblib')
+    old = HousePricePreprocessor()
+    old.load(tmp_path / 'old.joblib')
+    assert old.column_plan.to_dict() == preprocessor.column_plan.to_dict()
+
+    X, _ = make_census(40, seed=2)
+    pd.testing.assert_frame_equal(old.transform(X), preprocessor.transform(X))
+
+
+def test_transform_does_not_rediscover_columns(monkeypatch):
+    preprocessor = _fitted()
+    X, _ = make_listings(20, seed=3)
+    expected = preprocessor.compile_plan().transform_records(X.to_dict(orient='records'))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("select_dtypes called during transform")
+    monkeypatch.setattr(pd.DataFrame, 'select_dtypes', fail)
+    np.testing.assert_array_equal(preprocessor.transform(X).to_numpy(), expected)
+
+
+def test_absent_columns_use_default_fills():
+    preprocessor = _fitted()
+    plan = preprocessor.column_plan
+    X, _ = make_listings(3, seed=4)
+    out = preprocessor.transform(X.drop(columns=['SQUARE_FT', 'CITY_NAME']))
+    j = plan.numeric_cols.index('SQUARE_FT')
+    expected = (plan.fill_values[j] - plan.means[j]) / plan.scales[j]
+    np.testing.assert_allclose(out['SQUARE_FT'], expected)
+    assert (out['CITY_NAME'] == plan.categorical_fill).all()
+
+
+def test_round_trips_through_dict():
+    plan = _fitted().column_plan
+    again = ColumnPlan.from_dict(plan.to_dict())
+    np.testing.assert_array_equal(again.numeric_idx, plan.numeric_idx)
+    np.testing.assert_array_equal(again.categorical_idx, plan.categorical_idx)
+
+
+def test_fused_kernel_matches_imputer_then_scaler():
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler
+    from house_price_prediction import column_plan
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(5, 2, (20_000, 4))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    imputer = SimpleImputer(strategy='median').fit(values)
+    scaler = StandardScaler().fit(imputer.transform(values))
+    expected = scaler.transform(imputer.transform(values))
+
+    args = (imputer.statistics_, scaler.mean_, scaler.scale_)
+    np.testing.assert_array_equal(column_plan.impute_scale(values, *args), expected)
+    block = np.asfortranarray(values)
+    assert column_plan.impute_scale(block, *args, out=block) is block
+    np.testing.assert_array_equal(block, expected)
+
+    # Separate columns (one absent), into a float32 block: float64 math, rounded on store
+    out = np.zeros((len(values), 6), dtype=np.float32)
+    columns = [values[:, 0], None, values[:, 2], values[:, 3]]
+    column_plan.impute_scale_columns(columns, *args, out=out, idx=[5, 0, 1, 3])
+    expected[:, 1] = (imputer.statistics_[1] - scaler.mean_[1]) / scaler.scale_[1]
+    np.testing.assert_array_equal(out[:, [5, 0, 1, 3]], expected.astype(np.float32))
+
+
+def test_float32_mode_predicts_like_float64(tmp_path):
+    from tests.helpers import fit_listing_model
+    from house_price_prediction.tree_engine import compile_model
+
+    model, preprocessor = fit_listing_model()
+    X, _ = make_listings(300, seed=5)
+    expected = preprocessor.transform(X)
+    preprocessor.dtype = np.dtype(np.float32)
+    preprocessor.save(tmp_path / 'preprocessor.joblib')
+    loaded = HousePricePreprocessor()
+    loaded.load(tmp_path / 'preprocessor.joblib')
+    assert loaded.dtype == np.float32
+
+    X32 = loaded.transform(X)
+    assert (X32.dtypes == np.float32).all()
+    np.testing.assert_array_equal(X32.to_numpy(), expected.to_numpy().astype(np.float32))
+    records = loaded.compile_plan().transform_records(X.to_dict(orient='records'))
+    assert records.dtype == np.float32
+    # Trees compare in float32 either way, so predictions are identical
+    np.testing.assert_array_equal(model.predict(X32), model.predict(expected))
+    engine = compile_model(model)
+    np.testing.assert_allclose(engine.predict(records), model.predict(expected), rtol=1e-10)
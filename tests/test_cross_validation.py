@@ -0,0 +1,60 @@
+"""
+Tests for parallel K-fold cross-validation
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from tests.helpers import CITIES, make_listings
+from house_price_prediction import cross_validation
+from house_price_prediction.cross_validation import cross_validate, fold_indices, regression_metrics
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+
+def forest():
+    return RandomForestRegressor(n_estimators=8, max_depth=6, random_state=0, n_jobs=-1)
+
+
+def test_grouped_folds_hold_out_whole_cities():
+    X, _ = make_listings(400)
+    folds = fold_indices(X, k=4, group_by_city=True)
+    held_out = [set(X['CITY_NAME'].iloc[test]) for _, test in folds]
+    assert sorted(c for cities in held_out for c in cities) == sorted(CITIES)
+    for (train, test), cities in zip(folds, held_out):
+        assert not cities & set(X['CITY_NAME'].iloc[train])
+    with pytest.raises(ValueError, match='at least 9 cities'):
+        fold_indices(X, k=9, group_by_city=True)
+
+
+@pytest.mark.parametrize('mapped', [True, False])
+def test_cross_validate_report(tmp_path, monkeypatch, mapped):
+    if not mapped:
+        monkeypatch.setattr(cross_validation, 'feather', None)
+    X, y = make_listings(400)
+    report = cross_validate(X, y, forest(), k=3, workers=2, work_dir=tmp_path)
+
+    assert [r['fold'] for r in report['folds']] == [0, 1, 2]
+    assert sum(r['n_test'] for r in report['folds']) == report['overall']['n'] == 400
+    assert sorted(report['cities']) == sorted(CITIES)
+    assert sum(m['n'] for m in report['cities'].values()) == 400
+    for record in report['folds']:
+        assert record['wall_s'] > 0 and record['peak_rss_mb'] > 0
+        assert sum(m['n'] for m in record['cities'].values()) == record['n_test']
+    assert report['params']['n_jobs'] == 1
+    assert not list(tmp_path.iterdir())
+
+    # Fold 0 matches the same fit done in this process
+    train, test = fold_indices(X, k=3)[0]
+    preprocessor = HousePricePreprocessor()
+    model = forest().set_params(n_jobs=1).fit(preprocessor.fit_transform(X.iloc[train]), y.iloc[train])
+    expected = regression_metrics(y.iloc[test], model.predict(preprocessor.transform(X.iloc[test])))
+    assert report['folds'][0]['metrics'] == pytest.approx(expected)
+    assert report['fold_mean']['rmse'] == pytest.approx(np.mean([r['metrics']['rmse'] for r in report['folds']]))
+
+
+def test_cross_validate_grouped_by_city():
+    X, y = make_listings(400)
+    report = cross_validate(X, y, forest(), k=4, group_by_city=True, workers=1)
+    fold_cities = [set(r['cities']) for r in report['folds']]
+    assert sorted(c for cities in fold_cities for c in cities) == sorted(CITIES)
+    assert report['group_by_city'] is True
@@ -0,0 +1,79 @@
+"""
+Tests for the typed CSV reader and the parsed-frame cache
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.helpers import make_listings
+from house_price_prediction.data_loading import (FrameCache, detect_encoding, load_training_frame,
+                                                 read_csv_chunks, read_training_csv)
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+
+@pytest.fixture
+def listings_csv(tmp_path):
+    X, y = make_listings(500)
+    path = tmp_path / 'listings.csv'
+    pd.concat([X, y], axis=1).to_csv(path, index=False)
+    return path
+
+
+def test_detect_encoding(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes('CITY_NAME\nBengaluru\n'.encode('utf-8'))
+    assert detect_encoding(path) == 'utf-8'
+    path.write_bytes('CITY_NAME\nBengaluru\n'.encode('utf-8-sig'))
+    assert detect_encoding(path) == 'utf-8-sig'
+    path.write_bytes('CITY_NAME\nBelagavi – Ságar\n'.encode('cp1252'))
+    assert detect_encoding(path) == 'latin-1'
+    # A multi-byte character cut off by the end of the sample is still UTF-8
+    path.write_bytes('CITY_NAME\nSágar\n'.encode('utf-8'))
+    assert detect_encoding(path, sample_bytes=len('CITY_NAME\nS'.encode()) + 1) == 'utf-8'
+
+
+def test_typed_chunks_match_plain_read(listings_csv):
+    plain = pd.read_csv(listings_csv)
+    typed = read_training_csv(listings_csv, chunksize=64)
+    assert typed.index.equals(plain.index)
+    for col in ('POSTED_BY', 'BHK_OR_RK', 'CITY_NAME'):
+        assert isinstance(typed[col].dtype, pd.CategoricalDtype)
+        assert list(typed[col].cat.categories) == sorted(plain[col].unique())
+        assert (typed[col].astype(str) == plain[col]).all()
+    assert typed['RERA'].dtype == np.float32
+
+    X_plain, X_typed = plain.drop(columns='PRICE'), typed.drop(columns='PRICE')
+    preprocessor = HousePricePreprocessor()
+    expected = preprocessor.fit_transform(X_plain)
+    pd.testing.assert_frame_equal(HousePricePreprocessor().fit_transform(X_typed), expected,
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(preprocessor.transform(X_typed), preprocessor.transform(X_plain))
+
+
+def test_late_non_utf8_bytes_fall_back_to_latin1(tmp_path):
+    path = tmp_path / 'data.csv'
+    rows = [f'Block {i},{i}' for i in range(60_000)] + ['Ságar,60000']
+    path.write_bytes(('ADDRESS,PRICE\n' + '\n'.join(rows) + '\n').encode('latin-1'))
+    assert detect_encoding(path) == 'utf-8'
+    chunks = list(read_csv_chunks(path, chunksize=5000))
+    frame = pd.concat(chunks)
+    assert len(frame) == 60_001 and frame.index.is_unique
+    assert frame['ADDRESS'].iloc[-1] == 'Ságar'
+    assert (frame['PRICE'].to_numpy() == np.arange(60_001)).all()
+
+
+def test_frame_cache(tmp_path, listings_csv):
+    cache_dir = tmp_path / 'data_cache'
+    frame, cached = load_training_frame(listings_csv, cache_dir)
+    assert not cached
+    again, cached = load_training_frame(listings_csv, cache_dir)
+    assert cached
+    pd.testing.assert_frame_equal(again, frame)
+    assert isinstance(again['CITY_NAME'].dtype, pd.CategoricalDtype)
+
+    # New contents, new entry
+    pd.read_csv(listings_csv)[:100].to_csv(listings_csv, index=False)
+    changed, cached = load_training_frame(listings_csv, cache_dir)
+    assert not cached and len(changed) == 100
+    assert len(list(cache_dir.glob('*.feather'))) == 2
+    assert FrameCache(cache_dir).available
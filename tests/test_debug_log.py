@@ -0,0 +1,54 @@
+"""
+Tests for the asynchronous debug log writer
+"""
+import json
+
+import pytest
+
+from house_price_prediction.debug_log import AsyncLogWriter
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_records_are_written_in_order(tmp_path):
+    writer = AsyncLogWriter(path=tmp_path / 'debug.log')
+    for i in range(500):
+        writer.write({"i": i})
+    writer.flush()
+    assert [e["i"] for e in _read(tmp_path / 'debug.log')] == list(range(500))
+    writer.close()
+
+
+def test_level_filter_and_sampling(tmp_path):
+    writer = AsyncLogWriter(path=tmp_path / 'debug.log', level="INFO", sample_rate=0.0)
+    writer.write({"msg": "debug"}, "DEBUG")
+    writer.write({"msg": "info"}, "INFO")
+    writer.write({"msg": "error"}, "ERROR")
+    writer.close()
+    assert [e["msg"] for e in _read(tmp_path / 'debug.log')] == ["error"]
+
+
+def test_size_rotation(tmp_path):
+    path = tmp_path / 'debug.log'
+    writer = AsyncLogWriter(path=path, max_bytes=2000, backup_count=2, batch_size=10)
+    for i in range(300):
+        writer.write({"i": i, "pad": "x" * 50})
+        if i % 10 == 9:
+            writer.flush()
+    writer.close()
+    assert path.exists()
+    assert (tmp_path / 'debug.log.1').exists()
+    assert not (tmp_path / 'debug.log.3').exists()
+
+
+def test_write_after_close_is_dropped_with_a_warning(tmp_path):
+    writer = AsyncLogWriter(path=tmp_path / 'debug.log')
+    writer.write({"i": 0})
+    writer.close()
+    with pytest.warns(RuntimeWarning, match="closed"):
+        writer.write({"i": 1})
+    writer.flush()
+    assert [e["i"] for e in _read(tmp_path / 'debug.log')] == [0]
+    assert writer.dropped == 1
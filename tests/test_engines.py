@@ -0,0 +1,57 @@
+"""
+Tests for the model engines train_model.py can fit
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+
+from tests.helpers import make_listings
+from house_price_prediction.engines import (build_engine, engine_name, engine_params,
+                                            native_categorical)
+from house_price_prediction.preprocessing import HousePricePreprocessor
+from house_price_prediction.tree_engine import compile_model
+
+
+@pytest.fixture(scope='module')
+def features():
+    X, y = make_listings(1500)
+    # Noise the boosting rounds start fitting, so the validation loss turns
+    y = y + np.random.default_rng(0).normal(0, y.std() / 2, len(y))
+    preprocessor = HousePricePreprocessor()
+    return preprocessor.fit_transform(X[:1200]), y[:1200], preprocessor.transform(X[1200:]), y[1200:]
+
+
+def test_native_categorical_skips_high_cardinality():
+    X = pd.DataFrame({'CITY_NAME': np.arange(300), 'POSTED_BY': np.arange(300) % 3, 'SQUARE_FT': 1.0})
+    assert native_categorical(X) == (['POSTED_BY'], {'CITY_NAME': 300})
+    assert native_categorical(None) == ([], {})
+
+
+def test_hist_gradient_boosting_engine(features):
+    X_train, y_train, X_test, y_test = features
+    model = build_engine('hist-gradient-boosting', X_train, random_state=0)
+    assert isinstance(model, HistGradientBoostingRegressor)
+    assert model.categorical_features == ['CITY_NAME', 'POSTED_BY', 'BHK_OR_RK']
+    model.fit(X_train, y_train)
+    assert model.n_iter_ < model.max_iter
+    assert np.corrcoef(model.predict(X_test), y_test)[0, 1] > 0.8
+
+    params = engine_params(model)
+    assert params['n_iter_'] == model.n_iter_
+    assert sorted(params['categorical_features_in']) == ['BHK_OR_RK', 'CITY_NAME', 'POSTED_BY']
+    assert params['categorical_features'] == ['CITY_NAME', 'POSTED_BY', 'BHK_OR_RK']
+    assert engine_name(model) == 'hist-gradient-boosting'
+    # Categorical splits do not fit the flattened threshold engine
+    assert compile_model(model) is None
+
+
+def test_forest_engine_params_through_tree_ensemble(features):
+    X_train, y_train, _, _ = features
+    model = build_engine('forest').set_params(n_estimators=5, n_jobs=1).fit(X_train, y_train)
+    assert isinstance(model, RandomForestRegressor)
+    ensemble = compile_model(model)
+    assert engine_name(ensemble) == 'forest'
+    assert engine_params(ensemble)['n_estimators'] == 5
+    with pytest.raises(ValueError, match='Unknown engine'):
+        build_engine('xgboost')
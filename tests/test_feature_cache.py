@@ -0,0 +1,69 @@
+"""
+Tests for the content-addressed feature cache
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.helpers import make_listings
+from house_price_prediction import feature_cache
+from house_price_prediction.feature_cache import FeatureCache
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    X, y = make_listings(50)
+    path = tmp_path / 'data.csv'
+    X.assign(PRICE=y).to_csv(path, index=False)
+    return path
+
+
+def test_key_tracks_data_params_and_code(tmp_path, data_file, monkeypatch):
+    cache = FeatureCache(tmp_path / 'cache')
+    key, parts = cache.key(data_file, test_size=0.2, random_state=42)
+    assert cache.key(data_file, random_state=42, test_size=0.2)[0] == key
+    assert cache.key(data_file, test_size=0.3, random_state=42)[0] != key
+    assert parts['params'] == {'test_size': 0.2, 'random_state': 42}
+
+    # Unchanged files are not re-read
+    monkeypatch.setattr(feature_cache, 'file_digest', lambda path: pytest.fail("rehashed"))
+    assert cache.key(data_file, test_size=0.2, random_state=42)[0] == key
+    monkeypatch.undo()
+
+    first_row = data_file.read_text().splitlines(keepends=True)[1]
+    with open(data_file, 'a') as f:
+        f.write(first_row)
+    assert cache.key(data_file, test_size=0.2, random_state=42)[0] != key
+
+    monkeypatch.setattr(feature_cache, 'preprocessor_code_version', lambda: 'changed')
+    assert cache.key(data_file, test_size=0.2, random_state=42)[0] != key
+
+
+def test_store_and_load_round_trip(tmp_path, data_file):
+    X, y = make_listings(80)
+    preprocessor = HousePricePreprocessor()
+    X_train = preprocessor.fit_transform(X[:60])
+    X_test = preprocessor.transform(X[60:])
+    cache = FeatureCache(tmp_path / 'cache')
+    key, parts = cache.key(data_file, test_size=0.25)
+    assert cache.load(key) is None
+
+    cache.store(key, preprocessor, X_train, y[:60], X_test, y[60:], manifest=parts)
+    loaded, X_train2, y_train2, X_test2, y_test2 = cache.load(key)
+    assert list(X_train2.columns) == preprocessor.feature_names
+    np.testing.assert_array_equal(X_train2.to_numpy(), X_train.to_numpy(dtype=np.float64))
+    np.testing.assert_array_equal(X_test2.to_numpy(), X_test.to_numpy())
+    np.testing.assert_array_equal(y_test2, y[60:].to_numpy())
+    assert not X_train2.to_numpy().flags.writeable  # memory-mapped
+    pd.testing.assert_frame_equal(loaded.transform(X[60:]), X_test)
+
+
+def test_failed_write_leaves_no_entry(tmp_path):
+    cache = FeatureCache(tmp_path / 'cache')
+    with pytest.raises(RuntimeError):
+        with cache.writing('abc') as staging:
+            (staging / 'X_train.bin').write_bytes(b'partial')
+            raise RuntimeError("interrupted")
+    assert list(cache.root.iterdir()) == []
+    assert cache.load('abc') is None
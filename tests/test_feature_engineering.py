@@ -0,0 +1,53 @@
+"""
+Tests for the one-pass derived-feature engine
+"""
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from tests.helpers import make_census
+from house_price_prediction.feature_engineering import (INCOME_BAND_BINS, INCOME_BAND_LABELS,
+                                                        AGE_BINS, AGE_BIN_LABELS, bin_codes)
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+
+def _with_edge_values(X):
+    X = X.copy()
+    X.loc[0, 'median_income'] = 0.0
+    X.loc[1, 'median_income'] = 2.0
+    X.loc[2, 'median_income'] = np.nan
+    X.loc[3, 'median_income'] = -1.0
+    X.loc[4, 'housing_median_age'] = 50.0
+    return X
+
+
+def test_bin_codes_match_pd_cut():
+    values = np.array([-1.0, 0.0, 1.9, 2.0, 2.0001, 10.0, 99.0, np.nan])
+    expected = pd.cut(values, bins=INCOME_BAND_BINS, include_lowest=True).codes
+    np.testing.assert_array_equal(bin_codes(values, INCOME_BAND_BINS), expected)
+
+
+def test_encoded_bands_identical_to_string_round_trip():
+    X = _with_edge_values(make_census(300)[0])
+    preprocessor = HousePricePreprocessor()
+    out = preprocessor.fit_transform(X)
+
+    for name, source, bins, labels in [('income_band', 'median_income', INCOME_BAND_BINS, INCOME_BAND_LABELS),
+                                       ('age_bins', 'housing_median_age', AGE_BINS, AGE_BIN_LABELS)]:
+        strings = pd.cut(X[source], bins=bins, labels=labels, include_lowest=True).astype(str)
+        reference = LabelEncoder()
+        expected = reference.fit_transform(strings.fillna('Unknown'))
+        np.testing.assert_array_equal(out[name].to_numpy(), expected)
+        assert list(preprocessor.label_encoders[name].classes_) == list(reference.classes_)
+
+
+def test_derived_columns_and_input_untouched():
+    X = make_census(50)[0]
+    before = X.copy()
+    out = HousePricePreprocessor().create_advanced_features(X)
+    pd.testing.assert_frame_equal(X, before)
+    assert list(out.columns) == list(X.columns) + [
+        'rooms_per_household', 'bedrooms_per_household', 'population_per_household',
+        'population_per_room', 'income_band', 'income_squared', 'income_per_room', 'age_bins']
+    np.testing.assert_array_equal(out['population_per_room'], X['population'] / (X['total_rooms'] + 1))
+    np.testing.assert_array_equal(out['income_squared'], X['median_income'] ** 2)
@@ -0,0 +1,118 @@
+"""
+Tests for incremental retraining (new trees, extended vocabularies)
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+
+from tests.helpers import make_listings
+from house_price_prediction.incremental import accuracy, accuracy_delta, add_trees, recency_sample
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+
+def new_city_listings(n=100, seed=3):
+    X, y = make_listings(n, seed)
+    X['CITY_NAME'] = np.where(np.arange(n) % 2, 'Indore', X['CITY_NAME'])
+    X['ADDRESS'] = [f'Vijay Nagar {i},Indore' if i % 2 else a for i, a in enumerate(X['ADDRESS'])]
+    return X, y
+
+
+def test_extend_vocabularies_keeps_existing_codes(tmp_path):
+    X, y = make_listings(300)
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    expected = preprocessor.transform(X)
+    n_cities = len(preprocessor.label_encoders['CITY_NAME'].classes_)
+    X_new, _ = new_city_listings()
+
+    added = preprocessor.extend_vocabularies(X_new)
+    assert added['CITY_NAME'] == ['Indore']
+    assert {f'Vijay Nagar {i},Indore' for i in range(1, 100, 2)} <= set(added['ADDRESS'])
+    pd.testing.assert_frame_equal(preprocessor.transform(X), expected)
+    codes = preprocessor.transform(X_new)['CITY_NAME']
+    assert (codes[X_new['CITY_NAME'] == 'Indore'] == n_cities).all()
+    assert preprocessor.extend_vocabularies(X_new) == {}
+
+    for name in ('preprocessor.joblib', 'preprocessor.packed'):
+        preprocessor.save(tmp_path / name)
+        loaded = HousePricePreprocessor()
+        loaded.load(tmp_path / name)
+        assert list(loaded.label_encoders['CITY_NAME'].classes_) == \
+            list(preprocessor.label_encoders['CITY_NAME'].classes_)
+        pd.testing.assert_frame_equal(loaded.transform(X_new), preprocessor.transform(X_new))
+        pd.testing.assert_frame_equal(loaded.transform(X), expected)
+
+
+@pytest.mark.parametrize('model_type', [RandomForestRegressor, GradientBoostingRegressor])
+def test_add_trees_keeps_existing_trees(model_type):
+    X, y = make_listings(300)
+    preprocessor = HousePricePreprocessor()
+    model = model_type(n_estimators=10, max_depth=4, random_state=0)
+    model.fit(preprocessor.fit_transform(X), y)
+    first = np.ravel(model.estimators_)[0]
+    X_new, y_new = new_city_listings()
+    preprocessor.extend_vocabularies(X_new)
+
+    add_trees(model, preprocessor.transform(X_new), y_new, n_trees=5)
+    assert len(model.estimators_) == 15
+    assert np.ravel(model.estimators_)[0] is first
+    assert model.warm_start is False
+    assert add_trees(model, preprocessor.transform(X_new), y_new).n_estimators == 18
+
+
+def test_add_trees_rejects_hist_gradient_boosting():
+    X, y = make_listings(200)
+    X_processed = HousePricePreprocessor().fit_transform(X)
+    model = HistGradientBoostingRegressor(max_iter=5).fit(X_processed, y)
+    with pytest.raises(ValueError, match='from scratch'):
+        add_trees(model, X_processed, y)
+
+
+def test_recency_sample():
+    X = pd.DataFrame({'row': np.arange(10_000)})
+    y = pd.Series(np.arange(10_000.0))
+    chunks = lambda: ((X[i:i + 1000], y[i:i + 1000]) for i in range(0, 10_000, 1000))
+
+    X_sample, y_sample = recency_sample(chunks(), 500, half_life=1000, random_state=0)
+    assert len(X_sample) == 500
+    assert X_sample['row'].is_unique and X_sample['row'].is_monotonic_increasing
+    assert (X_sample['row'].to_numpy() == y_sample.to_numpy()).all()
+    # Weights halve every 1,000 rows back: about half the sample is from the last 1,000
+    assert 0.4 < (X_sample['row'] >= 9000).mean() < 0.6
+    uniform, _ = recency_sample(chunks(), 500, random_state=0)
+    assert 0.05 < (uniform['row'] >= 9000).mean() < 0.15
+    small, _ = recency_sample(chunks(), 20_000)
+    assert len(small) == 10_000
+
+
+def test_accuracy_delta():
+    model = RandomForestRegressor(n_estimators=3, random_state=0).fit([[0], [1]], [0, 1])
+    before = accuracy(model, [[0], [1]], [0, 2])
+    after = accuracy(model, [[0], [1]], [0, 1])
+    assert accuracy_delta(before, after)['rmse'] == pytest.approx(after['rmse'] - before['rmse'])
+    assert set(before) == {'rmse', 'mae', 'r2'}
+
+
+def test_incremental_cli_rejects_hist_gradient_boosting(tmp_path):
+    root = Path(__file__).parent.parent
+    for name, seed in (('train.csv', 0), ('new.csv', 1)):
+        X, y = make_listings(300, seed)
+        X.assign(PRICE=y).to_csv(tmp_path / name, index=False)
+    env = dict(os.environ, PYTHONPATH=str(root / 'src'), HPP_LOG_PATH=str(tmp_path / 'debug.log'))
+
+    def train(*args):
+        return subprocess.run([sys.executable, str(root / 'train_model.py'), *args, '--no-cache'],
+                              cwd=tmp_path, env=env, capture_output=True, text=True, timeout=300)
+
+    result = train('train.csv', '--engine', 'hist-gradient-boosting')
+    assert result.returncode == 0, result.stdout + result.stderr
+    result = train('new.csv', '--incremental')
+    assert result.returncode == 1
+    assert "retrain it from scratch" in result.stdout
+    assert "AttributeError" not in result.stdout + result.stderr
@@ -0,0 +1,139 @@
+"""
+Tests for latency-budgeted model selection
+"""
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+
+from tests.helpers import make_listings
+from house_price_prediction import latency_budget
+from house_price_prediction.latency_budget import (MIN_TREES, fitted_depth, hgb_internals_supported,
+                                                   keep_trees, prune_to_budget, select_within_budget,
+                                                   tree_count, within_budget)
+from house_price_prediction.preprocessing import HousePricePreprocessor
+from house_price_prediction.tree_engine import compile_model
+
+
+@pytest.fixture(scope='module')
+def features():
+    X, y = make_listings(600)
+    preprocessor = HousePricePreprocessor()
+    X_train = preprocessor.fit_transform(X[:450])
+    return X_train, y[:450], preprocessor.transform(X[450:]), y[450:]
+
+
+def candidates():
+    return {
+        'stumps': RandomForestRegressor(n_estimators=10, max_depth=1, random_state=0),
+        'forest': RandomForestRegressor(n_estimators=30, max_depth=8, random_state=0),
+    }
+
+
+@pytest.fixture
+def tree_latency(monkeypatch):
+    """Deterministic latency: 0.01 ms per tree per level"""
+    def measure(model, X, repeats=None, batch_rows=1000):
+        cost = tree_count(model) * fitted_depth(model) * 0.01
+        return {'row_p50_ms': cost, 'row_p99_ms': cost, 'batch_rows': batch_rows,
+                'batch_rows_per_s': 1000 / cost}
+    monkeypatch.setattr(latency_budget, 'measure_latency', measure)
+
+
+def test_within_budget():
+    latency = {'row_p99_ms': 2.0, 'batch_rows_per_s': 50_000}
+    assert within_budget(latency, {'row_p99_ms': 2.0, 'batch_rows_per_s': 50_000})
+    assert within_budget(latency, {'row_p99_ms': None})
+    assert not within_budget(latency, {'row_p99_ms': 1.5})
+    assert not within_budget(latency, {'batch_rows_per_s': 60_000})
+    with pytest.raises(ValueError, match="Unknown latency budget"):
+        within_budget(latency, {'row_p50_ms': 1.0})
+
+
+@pytest.mark.parametrize('model_class', [RandomForestRegressor, GradientBoostingRegressor,
+                                         HistGradientBoostingRegressor])
+def test_keep_trees_matches_the_first_trees(features, model_class):
+    X_train, y_train, X_test, _ = features
+    params = {'max_iter': 20} if model_class is HistGradientBoostingRegressor else {'n_estimators': 20}
+    model = model_class(random_state=0, **params).fit(X_train, y_train)
+    pruned = keep_trees(model, 7)
+    assert tree_count(pruned) == 7 and tree_count(model) == 20
+    assert tree_count(clone(pruned).fit(X_train, y_train)) == 7
+    if model_class is RandomForestRegressor:
+        expected = np.mean([tree.predict(X_test.to_numpy()) for tree in model.estimators_[:7]], axis=0)
+    else:
+        expected = list(model.staged_predict(X_test))[6]
+    np.testing.assert_allclose(pruned.predict(X_test), expected)
+    if model_class is not HistGradientBoostingRegressor:
+        np.testing.assert_allclose(compile_model(pruned).predict(X_test.to_numpy()), expected, rtol=1e-5)
+
+
+def test_select_most_accurate_within_budget(features):
+    name, model, profile = select_within_budget(candidates(), *features, budget={'row_p99_ms': None})
+    assert name == 'forest' and not profile['pruned']
+    assert profile['selected'] == 'forest' and profile['n_trees'] == 30
+    assert [r['name'] for r in profile['records']] == ['stumps', 'forest']
+    assert all(r['within_budget'] for r in profile['records'])
+    assert {'row_p99_ms', 'batch_rows_per_s'} <= set(profile['latency'])
+    assert profile['machine']['cpu_count'] and model.n_jobs == -1
+
+    with pytest.raises(ValueError, match="No candidate meets the latency budget"):
+        select_within_budget(candidates(), *features, budget={'row_p99_ms': 1e-9}, prune=False)
+
+
+def test_prune_trees_then_depth(features, tree_latency):
+    # forest: 30 trees x depth 8 = 2.4 ms; stumps: 10 x 1 = 0.1 ms
+    budget = {'row_p99_ms': 0.5}
+    name, model, profile = select_within_budget(candidates(), *features, budget, prune=False)
+    assert name == 'stumps'
+
+    name, model, profile = select_within_budget(candidates(), *features, budget)
+    assert name == 'forest' and profile['pruned']
+    # Not even MIN_TREES trees of depth 8 fit, so it was refitted shallower
+    assert tree_count(model) >= MIN_TREES and fitted_depth(model) < 8
+    assert tree_count(model) * fitted_depth(model) * 0.01 <= 0.5
+    stumps, forest, *pruned = profile['records']
+    assert [r['max_depth'] for r in pruned][0] == 8 and not pruned[0]['within_budget']
+    assert pruned[-1]['within_budget'] and pruned[-1]['val_rmse'] < stumps['val_rmse']
+    assert profile['val_rmse'] == pruned[-1]['val_rmse']
+
+
+def test_pruning_stops_when_depth_does_not_help(features, monkeypatch):
+    def measure(model, X, repeats=None, batch_rows=1000):
+        return {'row_p50_ms': 5.0, 'row_p99_ms': 5.0, 'batch_rows': batch_rows, 'batch_rows_per_s': 200}
+    monkeypatch.setattr(latency_budget, 'measure_latency', measure)
+    X_train, y_train, X_test, y_test = features
+    estimator = RandomForestRegressor(n_estimators=12, max_depth=8, random_state=0)
+    model = estimator.fit(X_train, y_train)
+    records, pruned = prune_to_budget('forest', model, estimator, X_train, y_train, X_test, y_test,
+                                      {'row_p99_ms': 1.0})
+    assert pruned is None
+    # One refit at a shallower depth, then the unchanged floor stops it
+    assert [r['max_depth'] for r in records] == [8, 5]
+
+
+def test_hgb_internals_checked_on_this_scikit_learn():
+    # Fails after a scikit-learn upgrade until keep_trees and fitted_depth
+    # are rechecked against it and HGB_INTERNALS_TESTED is widened
+    assert hgb_internals_supported()
+
+
+def test_hgb_not_pruned_on_unchecked_scikit_learn(features, monkeypatch):
+    monkeypatch.setattr(latency_budget, 'HGB_INTERNALS_TESTED', ((0, 1), (0, 2)))
+    X_train, y_train, X_test, y_test = features
+    model = HistGradientBoostingRegressor(max_iter=20, random_state=0).fit(X_train, y_train)
+    assert tree_count(model) == 20 and fitted_depth(model) is None
+    with pytest.raises(ValueError, match="Cannot cut the trees"):
+        keep_trees(model, 7)
+
+    forest = RandomForestRegressor(n_estimators=30, max_depth=8, random_state=0)
+    candidates = {'hgb': HistGradientBoostingRegressor(max_iter=20, random_state=0), 'forest': forest}
+    def measure(model, X, repeats=None, batch_rows=1000):
+        # As tree_latency, with the unknown HGB depth counted as 100
+        cost = tree_count(model) * (fitted_depth(model) or 100) * 0.01
+        return {'row_p50_ms': cost, 'row_p99_ms': cost, 'batch_rows': batch_rows,
+                'batch_rows_per_s': 1000 / cost}
+    monkeypatch.setattr(latency_budget, 'measure_latency', measure)
+    name, _, profile = select_within_budget(candidates, *features, budget={'row_p99_ms': 0.5})
+    assert name == 'forest' and profile['pruned']
+    assert all(r['name'] == 'forest' for r in profile['records'][2:])
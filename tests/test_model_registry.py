@@ -0,0 +1,60 @@
+"""
+Tests for model snapshots and the background reloader
+"""
+import time
+import warnings
+
+import pytest
+
+from tests.helpers import fit_listing_model, make_listings
+from house_price_prediction.model_registry import ModelSnapshot, ModelReloader
+
+
+def test_snapshot_is_immutable_and_validates():
+    model, preprocessor = fit_listing_model(n=100, n_estimators=2)
+    snapshot = ModelSnapshot(model, preprocessor, preprocessor.compile_plan(), 'v1').validate()
+    with pytest.raises(AttributeError):
+        snapshot.model = None
+
+
+def test_snapshot_mutes_feature_name_warning_only_while_predicting():
+    import house_price_prediction.app  # noqa: F401
+    # Importing the app must not mute the warning for the whole process
+    assert not any(message is not None and message.match("X does not have valid feature names")
+                   for _, message, *_ in warnings.filters)
+    model, preprocessor = fit_listing_model(n=100, n_estimators=2)
+    snapshot = ModelSnapshot(model, preprocessor, preprocessor.compile_plan(), 'v1')
+    X = snapshot.transform_plan.transform_records(make_listings(3, seed=1)[0].to_dict(orient='records'))
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        snapshot.predict(X)
+        assert not caught
+        model.predict(X)
+    assert any('valid feature names' in str(w.message) for w in caught)
+
+
+def test_watcher_reloads_after_stable_change():
+    state = {"artifacts": "v1", "loaded": "v1"}
+
+    def reload_fn():
+        state["loaded"] = state["artifacts"]
+
+    reloader = ModelReloader(reload_fn, lambda: state["artifacts"], lambda: state["loaded"],
+                             interval=0.01)
+    reloader.ensure_started()
+    state["artifacts"] = "v2"
+    for _ in range(200):
+        if state["loaded"] == "v2":
+            break
+        time.sleep(0.01)
+    assert state["loaded"] == "v2"
+    assert reloader.reloads == 1
+
+
+def test_failed_reload_keeps_error():
+    def reload_fn():
+        raise ValueError("broken artifact")
+
+    reloader = ModelReloader(reload_fn, lambda: "v2", lambda: "v1")
+    assert reloader.reload_now() is False
+    assert "broken artifact" in reloader.last_error
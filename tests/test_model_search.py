@@ -0,0 +1,79 @@
+"""
+Tests for the successive-halving model search
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+
+from tests.helpers import make_listings
+from house_price_prediction.model_search import halving_schedule, successive_halving
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+
+@pytest.fixture(scope='module')
+def features():
+    X, y = make_listings(600)
+    preprocessor = HousePricePreprocessor()
+    X_train = preprocessor.fit_transform(X[:450])
+    return X_train, y[:450], preprocessor.transform(X[450:]), y[450:]
+
+
+def candidates():
+    return {
+        'stumps': RandomForestRegressor(n_estimators=12, max_depth=1, random_state=0),
+        'forest': RandomForestRegressor(n_estimators=12, max_depth=8, random_state=0),
+        'deep-forest': RandomForestRegressor(n_estimators=12, random_state=0, n_jobs=-1),
+        'boosting': GradientBoostingRegressor(n_estimators=30, max_depth=3, random_state=0),
+    }
+
+
+def test_halving_schedule():
+    assert halving_schedule(9, 90_000) == [30_000, 90_000]
+    assert halving_schedule(10, 90_000) == [10_000, 30_000, 90_000]
+    assert halving_schedule(10, 90_000, min_resources=20_000) == [20_000, 30_000, 90_000]
+    assert halving_schedule(3, 500) == [500]
+    assert halving_schedule(4, 900, 'trees', factor=2) == [0.5, 1]
+
+
+def test_search_over_samples(tmp_path, features):
+    best, model, records = successive_halving(candidates(), *features, factor=2, min_resources=100,
+                                              workers=2, work_dir=tmp_path)
+    assert [(r['round'], r['amount']) for r in records] == [(0, 225)] * 4 + [(1, 450)] * 2
+    assert best == min(records[4:], key=lambda r: r['val_rmse'])['name'] != 'stumps'
+    for record in records:
+        assert record['fit_s'] > 0 and record['val_rmse'] > 0 and 'test_rmse' not in record
+        assert {'row_p50_ms', 'row_p99_ms', 'batch_rows_per_s'} <= set(record['latency'])
+    assert list(tmp_path.iterdir()) == []  # shared data and fitted candidates are cleaned up
+
+    # The winner is fitted on every training row, with the feature names
+    X_train, y_train, X_test, _ = features
+    assert list(model.feature_names_in_) == list(X_train.columns)
+    reference = [r for r in records if r['name'] == best][-1]
+    rmse = np.sqrt(np.mean((model.predict(X_test) - features[3].to_numpy()) ** 2))
+    assert rmse == pytest.approx(reference['val_rmse'])
+    if 'n_jobs' in model.get_params():
+        assert model.n_jobs == -1
+
+
+def test_test_set_is_only_reported(features):
+    X_train, y_train, X_val, y_val = features
+    # A test set on which the ranking would flip must not change the winner
+    X_test, y_test = X_val, -y_val
+    args = dict(factor=2, min_resources=100, workers=1)
+    best, _, records = successive_halving(candidates(), X_train, y_train, X_val, y_val, **args)
+    best_with_test, _, records_with_test = successive_halving(candidates(), X_train, y_train, X_val, y_val,
+                                                              X_test=X_test, y_test=y_test, **args)
+    assert best_with_test == best
+    assert [r['val_rmse'] for r in records_with_test] == pytest.approx([r['val_rmse'] for r in records])
+    assert all(r['test_rmse'] > r['val_rmse'] for r in records_with_test)
+
+
+def test_search_over_trees(features):
+    best, model, records = successive_halving(candidates(), *features, resource='trees',
+                                              factor=2, min_resources=5, workers=1)
+    first = {r['name']: r['amount'] for r in records if r['round'] == 0}
+    assert first == {'stumps': 6, 'forest': 6, 'deep-forest': 6, 'boosting': 15}
+    assert model.n_estimators == candidates()[best].n_estimators
+
+    with pytest.raises(ValueError):
+        successive_halving(candidates(), *features, resource='depth')
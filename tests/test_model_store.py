@@ -0,0 +1,82 @@
+"""
+Tests for the memory-mapped forest artifact
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+
+from tests.helpers import make_listings
+from house_price_prediction.preprocessing import HousePricePreprocessor
+from house_price_prediction.model_store import save_forest, load_forest
+from house_price_prediction.packed_arrays import read_packed, PAGE_SIZE
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_listings(300)
+    preprocessor = HousePricePreprocessor()
+    X_train = preprocessor.fit_transform(X).to_numpy(dtype=np.float64)
+    X_test = preprocessor.transform(make_listings(50, seed=9)[0]).to_numpy(dtype=np.float64)
+    return X_train, y, X_test
+
+
+@pytest.mark.parametrize('model', [
+    RandomForestRegressor(n_estimators=7, max_depth=6, random_state=0),
+    GradientBoostingRegressor(n_estimators=15, max_depth=3, random_state=0),
+])
+def test_mapped_forest_matches_sklearn(tmp_path, data, model):
+    X_train, y, X_test = data
+    model.fit(X_train, y)
+    path = tmp_path / 'model.forest'
+    save_forest(model, path)
+    forest = load_forest(path)
+    assert forest.n_estimators == len(model.estimators_)
+    np.testing.assert_allclose(forest.predict(X_test), model.predict(X_test), rtol=1e-10)
+
+
+def test_arrays_are_page_aligned_read_only_views(tmp_path, data):
+    X_train, y, _ = data
+    model = RandomForestRegressor(n_estimators=3, random_state=0).fit(X_train, y)
+    path = tmp_path / 'model.forest'
+    save_forest(model, path)
+    header, arrays = read_packed(path)
+    for name, spec in header['arrays'].items():
+        assert spec['offset'] % PAGE_SIZE == 0
+        assert not arrays[name].flags.writeable
+
+
+def test_overwriting_keeps_loaded_forest_readable(tmp_path, data):
+    X_train, y, X_test = data
+    path = tmp_path / 'model.forest'
+    save_forest(RandomForestRegressor(n_estimators=20, random_state=0).fit(X_train, y), path)
+    forest = load_forest(path)
+    expected = forest.predict(X_test)
+    # A smaller model: written in place, this would truncate the mapped file
+    save_forest(RandomForestRegressor(n_estimators=2, max_depth=2, random_state=1).fit(X_train, y), path)
+    np.testing.assert_array_equal(forest.predict(X_test), expected)
+    assert load_forest(path).n_estimators == 2
+    assert [p.name for p in tmp_path.iterdir()] == ['model.forest']
+
+
+def test_version_1_artifacts_still_load(tmp_path, data):
+    from house_price_prediction.model_store import FOREST_FORMAT
+    from house_price_prediction.packed_arrays import write_packed
+    X_train, y, X_test = data
+    model = RandomForestRegressor(n_estimators=4, max_depth=5, random_state=0).fit(X_train, y)
+    trees = [est.tree_ for est in model.estimators_]
+    roots = np.cumsum([0] + [t.node_count for t in trees[:-1]]).astype(np.int32)
+    shift = lambda c, r: np.where(c == -1, -1, c + r).astype(np.int32)
+    arrays = {
+        "roots": roots,
+        "feature": np.concatenate([t.feature for t in trees]).astype(np.int32),
+        "threshold": np.concatenate([t.threshold for t in trees]),
+        "left": np.concatenate([shift(t.children_left, r) for t, r in zip(trees, roots)]),
+        "right": np.concatenate([shift(t.children_right, r) for t, r in zip(trees, roots)]),
+        "value": np.concatenate([t.value[:, 0, 0] for t in trees]),
+    }
+    header = {"format": FOREST_FORMAT, "version": 1, "model_type": "RandomForestRegressor",
+              "n_features": X_train.shape[1], "n_trees": 4, "aggregate": "mean",
+              "base": 0.0, "scale": 1.0, "max_depth": 5}
+    path = tmp_path / 'old.forest'
+    write_packed(path, header, arrays)
+    np.testing.assert_allclose(load_forest(path).predict(X_test), model.predict(X_test), rtol=1e-10)
@@ -0,0 +1,42 @@
+"""
+Tests for the model-versioned prediction cache
+"""
+import time
+
+from house_price_prediction.prediction_cache import PredictionCache, canonical_key
+
+
+def test_key_is_order_independent():
+    assert canonical_key({"a": 1, "b": "x"}) == canonical_key({"b": "x", "a": 1})
+    assert canonical_key({"a": 1}) != canonical_key({"a": "1"})
+
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(max_size=2)
+    cache.invalidate("v1")
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    assert cache.get("a") == 1.0
+    cache.put("c", 3.0)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3.0
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_ttl_expiry():
+    cache = PredictionCache(max_size=10, ttl=0.01)
+    cache.put("a", 1.0)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_new_model_version_invalidates():
+    cache = PredictionCache(max_size=10)
+    cache.invalidate("v1")
+    cache.put("a", 1.0, "v1")
+    cache.invalidate("v2")
+    assert cache.get("a") is None
+    # Late writes from the old model are ignored
+    cache.put("a", 1.0, "v1")
+    assert cache.get("a") is None
@@ -0,0 +1,127 @@
+"""
+Tests for the pickle-free preprocessor artifact
+"""
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from tests.helpers import make_listings, make_census
+from house_price_prediction.packed_arrays import pack_strings, unpack_strings
+from house_price_prediction.preprocessing import HousePricePreprocessor
+from house_price_prediction.preprocessor_store import load_preprocessor, save_preprocessor
+
+
+def test_string_table_round_trip():
+    strings = ['', 'Agra', 'Bengaluru', 'Sector 5,Pune', 'Zürich', '東京']
+    blob, offsets = pack_strings(strings)
+    assert offsets.dtype == np.uint16 and offsets[-1] == len(blob)
+    assert unpack_strings(blob, offsets) == strings
+    assert unpack_strings(blob, offsets, 1, 4) == strings[1:4]
+    assert unpack_strings(*pack_strings([])) == []
+
+
+@pytest.mark.parametrize('make', [make_listings, make_census])
+def test_packed_artifact_matches_joblib(tmp_path, make):
+    X, _ = make(300)
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    preprocessor.save(tmp_path / 'preprocessor.joblib')
+    preprocessor.save(tmp_path / 'preprocessor.packed')
+
+    packed = HousePricePreprocessor()
+    packed.load(tmp_path / 'preprocessor.packed')
+    assert packed.feature_names == preprocessor.feature_names
+    assert packed.categorical_features == preprocessor.categorical_features
+    for col, encoder in preprocessor.label_encoders.items():
+        np.testing.assert_array_equal(packed.label_encoders[col].classes_, encoder.classes_)
+    np.testing.assert_array_equal(packed.scaler.var_, preprocessor.scaler.var_)
+    assert packed.scaler.n_samples_seen_ == preprocessor.scaler.n_samples_seen_
+    assert packed.column_plan.to_dict() == preprocessor.column_plan.to_dict()
+
+    X_new, _ = make(60, seed=7)
+    X_new.iloc[0, 0] = np.nan
+    pd.testing.assert_frame_equal(packed.transform(X_new), preprocessor.transform(X_new))
+    records = X_new.to_dict(orient='records')
+    np.testing.assert_array_equal(packed.compile_plan().transform_records(records),
+                                  preprocessor.compile_plan().transform_records(records))
+
+    # Refitting a loaded preprocessor works as with joblib
+    packed.fit_transform(X_new)
+
+
+def test_packed_vocabularies_stay_encoded(tmp_path):
+    X, _ = make_listings(300)
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    preprocessor.save(tmp_path / 'preprocessor.packed')
+    packed = HousePricePreprocessor()
+    packed.load(tmp_path / 'preprocessor.packed')
+
+    X_new, _ = make_listings(50, seed=5)
+    packed.transform(X_new)
+    encoder = packed.label_encoders['ADDRESS']
+    assert 'classes_' not in vars(encoder)
+    assert encoder.transform(X['ADDRESS'][:3]).tolist() == \
+        preprocessor.label_encoders['ADDRESS'].transform(X['ADDRESS'][:3]).tolist()
+
+    # Saved with joblib, the encoders are plain LabelEncoders
+    packed.save(tmp_path / 'preprocessor.joblib')
+    data = joblib.load(tmp_path / 'preprocessor.joblib')
+    assert type(data['label_encoders']['ADDRESS']) is LabelEncoder
+
+    # Refitting replaces the stored vocabulary
+    packed.fit_transform(X_new)
+    np.testing.assert_array_equal(packed.category_tables['ADDRESS'].index.strings(),
+                                  np.unique(X_new['ADDRESS']))
+
+
+def test_overwriting_keeps_loaded_preprocessor_readable(tmp_path):
+    X, _ = make_listings(300)
+    path = tmp_path / 'preprocessor.packed'
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    preprocessor.save(path)
+    loaded = HousePricePreprocessor()
+    loaded.load(path)
+    X_new, _ = make_listings(50, seed=5)
+    expected = loaded.transform(X_new)
+
+    # Its vocabularies and column plan are views of the mapping; a smaller
+    # artifact written in place would truncate it under them
+    retrained = HousePricePreprocessor()
+    retrained.fit_transform(X[:20])
+    retrained.save(path)
+    pd.testing.assert_frame_equal(loaded.transform(X_new), expected)
+
+
+def test_converts_old_joblib_artifacts(tmp_path):
+    X, _ = make_listings(200)
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    preprocessor.save(tmp_path / 'new.joblib')
+    # Written before categorical_features and the column plan existed
+    data = joblib.load(tmp_path / 'new.joblib')
+    del data['column_plan'], data['categorical_features'], data['dtype']
+    joblib.dump(data, tmp_path / 'old.joblib')
+
+    old = HousePricePreprocessor()
+    old.load(tmp_path / 'old.joblib')
+    save_preprocessor(old, tmp_path / 'old.packed')
+    converted = load_preprocessor(tmp_path / 'old.packed')
+    X_new, _ = make_listings(40, seed=3)
+    pd.testing.assert_frame_equal(converted.transform(X_new), preprocessor.transform(X_new))
+
+
+def test_rejects_other_files_and_newer_versions(tmp_path):
+    from house_price_prediction import preprocessor_store
+    from house_price_prediction.packed_arrays import write_packed
+
+    write_packed(tmp_path / 'other.packed', {'format': 'hpp-forest'}, {})
+    with pytest.raises(ValueError):
+        load_preprocessor(tmp_path / 'other.packed')
+    write_packed(tmp_path / 'future.packed', {'format': preprocessor_store.PREPROCESSOR_FORMAT,
+                                              'version': preprocessor_store.PREPROCESSOR_VERSION + 1}, {})
+    with pytest.raises(ValueError, match='version'):
+        load_preprocessor(tmp_path / 'future.packed')
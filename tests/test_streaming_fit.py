@@ -0,0 +1,64 @@
+"""
+Tests for the out-of-core streaming fit
+"""
+import numpy as np
+
+from tests.helpers import make_listings, make_census
+from house_price_prediction.packed_arrays import read_packed
+from house_price_prediction.preprocessing import HousePricePreprocessor
+from house_price_prediction.streaming_fit import QuantileSketch
+
+
+def _chunks(X, size=97):
+    return (X.iloc[start:start + size] for start in range(0, len(X), size))
+
+
+def test_sketch_is_exact_until_it_compacts_then_bounded():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=1000)
+    sketch = QuantileSketch(capacity=4096)
+    for part in np.array_split(values, 7):
+        sketch.update(part)
+    assert sketch.exact and sketch.median() == np.median(values)
+
+    values = rng.lognormal(size=200_000)
+    sketch = QuantileSketch(capacity=512)
+    for part in np.array_split(values, 50):
+        sketch.update(np.append(part, np.nan))
+    assert sketch.count == len(values)
+    assert sketch.size < 512 * 12
+    rank = np.searchsorted(np.sort(values), sketch.median()) / len(values)
+    assert abs(rank - 0.5) < 0.01
+
+
+def test_streaming_fit_matches_fit_transform():
+    for make in (make_census, make_listings):
+        X, _ = make(1000, seed=4)
+        batch = HousePricePreprocessor()
+        batch.fit_transform(X)
+        streamed = HousePricePreprocessor().fit_streaming(_chunks(X))
+
+        assert streamed.feature_names == batch.feature_names
+        assert streamed.categorical_features == batch.categorical_features
+        for col, encoder in batch.label_encoders.items():
+            np.testing.assert_array_equal(streamed.label_encoders[col].classes_, encoder.classes_)
+        np.testing.assert_array_equal(streamed.imputer.statistics_, batch.imputer.statistics_)
+        np.testing.assert_allclose(streamed.scaler.mean_, batch.scaler.mean_)
+        np.testing.assert_allclose(streamed.scaler.scale_, batch.scaler.scale_)
+
+        X_new, _ = make(200, seed=5)
+        np.testing.assert_allclose(streamed.transform(X_new).to_numpy(),
+                                   batch.transform(X_new).to_numpy(), atol=1e-9)
+
+
+def test_transform_to_disk_round_trips(tmp_path):
+    X, _ = make_census(500, seed=6)
+    preprocessor = HousePricePreprocessor().fit_streaming(_chunks(X))
+    path = tmp_path / 'features.bin'
+    rows = preprocessor.transform_to_disk(_chunks(X, 64), path, dtype=np.float32)
+
+    header, arrays = read_packed(path)
+    assert rows == len(X)
+    assert header['feature_names'] == preprocessor.feature_names
+    assert arrays['features'].dtype == np.float32
+    np.testing.assert_allclose(arrays['features'], preprocessor.transform(X).to_numpy(), rtol=1e-6)
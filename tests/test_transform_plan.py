@@ -0,0 +1,50 @@
+"""
+Tests for the compiled TransformPlan fast path
+"""
+import numpy as np
+import pandas as pd
+
+from tests.helpers import make_listings, make_census
+from house_price_prediction.preprocessing import HousePricePreprocessor
+
+
+def _fitted(make):
+    X, _ = make()
+    preprocessor = HousePricePreprocessor()
+    preprocessor.fit_transform(X)
+    return preprocessor
+
+
+def test_single_record_matches_dataframe_path():
+    preprocessor = _fitted(make_listings)
+    plan = preprocessor.compile_plan()
+    X, _ = make_listings(5, seed=1)
+    for record in X.to_dict(orient='records'):
+        expected = preprocessor.transform(pd.DataFrame([record])).to_numpy(dtype=np.float64)
+        np.testing.assert_array_equal(plan.transform_records(record), expected)
+
+
+def test_batch_with_unseen_and_missing_values():
+    preprocessor = _fitted(make_listings)
+    plan = preprocessor.compile_plan()
+    X, _ = make_listings(20, seed=2)
+    X.loc[3, 'CITY_NAME'] = 'Atlantis'
+    X.loc[4, 'ADDRESS'] = 'Nowhere Road,Atlantis'
+    X.loc[5, 'SQUARE_FT'] = np.nan
+    records = X.to_dict(orient='records')
+    expected = preprocessor.transform(pd.DataFrame(records)).to_numpy(dtype=np.float64)
+    out = plan.transform_records(records)
+    assert out.flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_derived_features_match_dataframe_path():
+    preprocessor = _fitted(make_census)
+    plan = preprocessor.compile_plan()
+    X, _ = make_census(50, seed=3)
+    X.loc[0, 'median_income'] = 0.0
+    X.loc[1, 'housing_median_age'] = 0.0
+    X.loc[2, 'median_income'] = np.nan
+    records = X.to_dict(orient='records')
+    expected = preprocessor.transform(pd.DataFrame(records)).to_numpy(dtype=np.float64)
+    np.testing.assert_allclose(plan.transform_records(records), expected, rtol=1e-12)
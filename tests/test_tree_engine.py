@@ -0,0 +1,71 @@
+"""
+Tests for the flattened-array tree engine
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from tests.helpers import make_listings
+from house_price_prediction.preprocessing import HousePricePreprocessor
+from house_price_prediction.tree_engine import TreeEnsemble, compile_model
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_listings(400)
+    preprocessor = HousePricePreprocessor()
+    X_train = preprocessor.fit_transform(X).to_numpy(dtype=np.float64)
+    X_test = preprocessor.transform(make_listings(60, seed=5)[0]).to_numpy(dtype=np.float64)
+    return X_train, y, X_test
+
+
+@pytest.mark.parametrize('model', [
+    RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0),
+    RandomForestRegressor(n_estimators=5, random_state=0),
+    GradientBoostingRegressor(n_estimators=20, max_depth=3, random_state=0),
+])
+def test_engine_matches_sklearn(data, model):
+    X_train, y, X_test = data
+    model.fit(X_train, y)
+    engine = TreeEnsemble.from_model(model, max_rows=0)
+    np.testing.assert_allclose(engine.predict(X_test), model.predict(X_test), rtol=1e-10)
+    np.testing.assert_allclose(engine.predict(X_test[:1]), model.predict(X_test[:1]), rtol=1e-10)
+
+
+def test_children_are_adjacent_and_leaves_self_loop(data):
+    X_train, y, _ = data
+    model = RandomForestRegressor(n_estimators=3, max_depth=5, random_state=0).fit(X_train, y)
+    engine = TreeEnsemble.from_model(model)
+    leaves = np.isinf(engine.threshold)
+    assert np.array_equal(engine.child[leaves], np.flatnonzero(leaves))
+    assert np.all(engine.child[~leaves] > np.flatnonzero(~leaves))
+    assert engine.depth == max(est.get_depth() for est in model.estimators_)
+
+
+def test_nan_inputs_follow_missing_value_routing(data):
+    X_train, y, X_test = data
+    X_nan = X_train.copy()
+    X_nan[::7, 0] = np.nan
+    model = RandomForestRegressor(n_estimators=6, max_depth=6, random_state=0).fit(X_nan, y)
+    engine = TreeEnsemble.from_model(model, max_rows=0)
+    X_query = X_test.copy()
+    X_query[::3, 0] = np.nan
+    np.testing.assert_allclose(engine.predict(X_query), model.predict(X_query), rtol=1e-10)
+
+
+def test_large_batches_use_the_estimator(data):
+    X_train, y, X_test = data
+    model = RandomForestRegressor(n_estimators=4, random_state=0).fit(X_train, y)
+    engine = TreeEnsemble.from_model(model, max_rows=10)
+    calls = []
+    original = model.predict
+    model.predict = lambda X: calls.append(len(X)) or original(X)
+    engine.predict(X_test[:9])
+    engine.predict(X_test[:10])
+    assert calls == [10]
+
+
+def test_compile_model_skips_unsupported_estimators(data):
+    X_train, y, _ = data
+    assert compile_model(LinearRegression().fit(X_train, y)) is None
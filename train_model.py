@@ -8,15 +8,28 @@ import pandas as pd
 import numpy as np
 import joblib
 from pathlib import Path
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import sys
-import os
+import json
+import time
 
 # Add src to path
 sys.path.insert(0, 'src')
 from house_price_prediction.preprocessing import HousePricePreprocessor
+from house_price_prediction.model_store import save_forest
+from house_price_prediction.packed_arrays import PackedRowWriter, read_packed
+from house_price_prediction.feature_cache import FeatureCache
+from house_price_prediction.model_search import default_candidates, measure_latency, successive_halving
+from house_price_prediction.engines import ENGINES, MAX_CATEGORIES, build_engine, native_categorical
+from house_price_prediction.incremental import (accuracy, accuracy_delta, add_trees, check_warm_start,
+                                                recency_sample)
+from house_price_prediction.data_loading import load_training_frame, read_csv_chunks
+from house_price_prediction.cross_validation import cross_validate
+from house_price_prediction.latency_budget import (BUDGET_REPEATS, fitted_depth, select_within_budget,
+                                                   tree_count, within_budget)
 
 def find_training_data():
     """Find training data file"""
@@ -53,27 +66,45 @@ def detect_target_column(df):
     # If not found, assume last column or ask
     return df.columns[-1]
 
-def load_and_prepare_data(data_path):
-    """Load and prepare training data"""
+# Bump when loading/splitting changes the prepared data (part of the feature cache key)
+PREPARATION_VERSION = 1
+
+FEATURE_CACHE_DIR = 'models/feature_cache'
+
+DATA_CACHE_DIR = 'models/data_cache'
+
+SEARCH_REPORT = 'models/search_report.json'
+
+INCREMENTAL_REPORT = 'models/incremental_report.json'
+
+CV_REPORT = 'models/cv_report.json'
+
+# Share of the training rows held out to rank model candidates on (--search,
+# latency budget), so the test set only scores the final model
+VALIDATION_SIZE = 0.2
+
+# Measured serving latency of the saved model, written by --max-p99-ms / --min-rows-per-s
+LATENCY_PROFILE = 'models/latency_profile.json'
+
+# Rows per chunk when sampling the history CSV for an incremental update
+HISTORY_CHUNKSIZE = 50000
+
+def load_and_prepare_data(data_path, cache_dir=None):
+    """
+    Load and prepare training data (CSVs are read typed and in chunks, see
+    data_loading; with cache_dir the parsed frame is cached and mapped)
+    """
     print(f"📂 Loading data from: {data_path}")
     
-    # Try different encodings
-    encodings = ['utf-8', 'latin-1', 'iso-8859-1']
-    df = None
-    
-    for encoding in encodings:
-        try:
-            if data_path.endswith('.xlsx'):
-                df = pd.read_excel(data_path)
-            else:
-                df = pd.read_csv(data_path, encoding=encoding)
-            print(f"✅ Data loaded successfully (encoding: {encoding})")
-            break
-        except Exception as e:
-            continue
-    
-    if df is None:
-        raise ValueError(f"Could not load data from {data_path}")
+    try:
+        if str(data_path).endswith('.xlsx'):
+            df = pd.read_excel(data_path)
+            print("✅ Data loaded successfully")
+        else:
+            df, cached = load_training_frame(data_path, cache_dir)
+            print(f"✅ Data loaded successfully ({'memory-mapped from cache' if cached else 'parsed'})")
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not load data from {data_path}: {e}") from e
     
     print(f"   Shape: {df.shape}")
     print(f"   Columns: {list(df.columns)[:10]}...")
@@ -110,45 +141,19 @@ def load_and_prepare_data(data_path):
     
     return X, y, target_col
 
-def train_model(X, y, test_size=0.2, random_state=42):
-    """Train the model with fixed preprocessing"""
-    
-    print("\n" + "="*70)
-    print("🔄 PREPROCESSING (WITH FIXES)")
-    print("="*70)
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state
-    )
-    
-    print(f"   Training samples: {X_train.shape[0]}")
-    print(f"   Test samples: {X_test.shape[0]}")
-    
-    # Initialize preprocessor (with FIXED code)
-    preprocessor = HousePricePreprocessor()
-    
-    # Fit and transform training data
-    print("\n   Fitting preprocessor...")
-    X_train_processed = preprocessor.fit_transform(X_train)
-    
-    print(f"   ✅ Preprocessing complete")
-    print(f"   Processed features: {X_train_processed.shape[1]}")
-    
-    # Check categorical features
-    if preprocessor.categorical_features:
-        print(f"   Categorical features (NOT scaled): {list(preprocessor.categorical_features)}")
-        if 'CITY_NAME' in preprocessor.categorical_features:
-            cities = list(preprocessor.label_encoders['CITY_NAME'].classes_)
-            print(f"   Cities in training: {len(cities)}")
-            print(f"   Sample cities: {cities[:5]}...")
-    
-    # Transform test data
-    X_test_processed = preprocessor.transform(X_test)
-    
-    print("\n" + "="*70)
-    print("🤖 TRAINING MODEL")
-    print("="*70)
+def build_model(random_state=42, engine=None, X_train=None):
+    """
+    Model for an engine name (see engines.ENGINES), or else one matching the
+    type of the existing model (RandomForest by default). X_train tells
+    hist-gradient-boosting which columns it can treat as categories.
+    """
+    if engine:
+        if engine == 'hist-gradient-boosting':
+            categorical, too_many = native_categorical(X_train)
+            print(f"   Native categorical features: {categorical}")
+            for col, cardinality in too_many.items():
+                print(f"   ⚠️  {col} has {cardinality} categories (max {MAX_CATEGORIES}); treated as numeric")
+        return build_engine(engine, X_train, random_state)
     
     # Try to load existing model to match type
     model = None
@@ -169,6 +174,8 @@ def train_model(X, y, test_size=0.2, random_state=42):
                 n_estimators=old_model.n_estimators if hasattr(old_model, 'n_estimators') else 100,
                 random_state=random_state
             )
+        elif model_type == 'HistGradientBoostingRegressor':
+            model = build_engine('hist-gradient-boosting', X_train, random_state)
         else:
             # Default to RandomForest
             model = RandomForestRegressor(n_estimators=100, random_state=random_state, n_jobs=-1)
@@ -184,20 +191,17 @@ def train_model(X, y, test_size=0.2, random_state=42):
             n_jobs=-1
         )
     
-    print(f"   Model: {type(model).__name__}")
-    print("   Training...")
-    
-    model.fit(X_train_processed, y_train)
-    
-    print("   ✅ Training complete!")
-    
+    return model
+
+def evaluate_model(model, X_train, y_train, X_test, y_test):
+    """Print and return train/test R², RMSE and MAE"""
     # Evaluate
     print("\n" + "="*70)
     print("📊 MODEL EVALUATION")
     print("="*70)
     
-    y_train_pred = model.predict(X_train_processed)
-    y_test_pred = model.predict(X_test_processed)
+    y_train_pred = model.predict(X_train)
+    y_test_pred = model.predict(X_test)
     
     train_r2 = r2_score(y_train, y_train_pred)
     test_r2 = r2_score(y_test, y_test_pred)
@@ -216,7 +220,7 @@ def train_model(X, y, test_size=0.2, random_state=42):
     print(f"      RMSE:      ₹{test_rmse:,.0f}")
     print(f"      MAE:       ₹{test_mae:,.0f}")
     
-    return model, preprocessor, {
+    return {
         'train_r2': train_r2,
         'test_r2': test_r2,
         'train_rmse': train_rmse,
@@ -225,6 +229,284 @@ def train_model(X, y, test_size=0.2, random_state=42):
         'test_mae': test_mae
     }
 
+def preprocess(X, y, test_size=0.2, random_state=42, dtype='float64'):
+    """Split, fit the preprocessor and transform both sets"""
+    
+    print("\n" + "="*70)
+    print("🔄 PREPROCESSING (WITH FIXES)")
+    print("="*70)
+    
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state
+    )
+    
+    print(f"   Training samples: {X_train.shape[0]}")
+    print(f"   Test samples: {X_test.shape[0]}")
+    
+    # Initialize preprocessor (with FIXED code)
+    preprocessor = HousePricePreprocessor(dtype=dtype)
+    
+    # Fit and transform training data
+    print("\n   Fitting preprocessor...")
+    X_train_processed = preprocessor.fit_transform(X_train)
+    
+    print(f"   ✅ Preprocessing complete")
+    print(f"   Processed features: {X_train_processed.shape[1]}")
+    
+    # Check categorical features
+    if preprocessor.categorical_features:
+        print(f"   Categorical features (NOT scaled): {list(preprocessor.categorical_features)}")
+        if 'CITY_NAME' in preprocessor.categorical_features:
+            cities = list(preprocessor.label_encoders['CITY_NAME'].classes_)
+            print(f"   Cities in training: {len(cities)}")
+            print(f"   Sample cities: {cities[:5]}...")
+    
+    # Transform test data
+    X_test_processed = preprocessor.transform(X_test)
+    
+    return preprocessor, X_train_processed, y_train, X_test_processed, y_test
+
+def fit_and_evaluate(X_train, y_train, X_test, y_test, random_state=42, engine=None):
+    """Build and fit the model on processed features, then evaluate it"""
+    print("\n" + "="*70)
+    print("🤖 TRAINING MODEL")
+    print("="*70)
+    
+    model = build_model(random_state, engine, X_train)
+    
+    print(f"   Model: {type(model).__name__}")
+    print("   Training...")
+    
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    
+    print(f"   ✅ Training complete! ({time.perf_counter() - start:.1f}s)")
+    if hasattr(model, 'n_iter_'):
+        print(f"   Boosting iterations: {model.n_iter_} of {model.max_iter}"
+              f"{' (early stopping)' if model.n_iter_ < model.max_iter else ''}")
+    
+    metrics = evaluate_model(model, X_train, y_train, X_test, y_test)
+    return model, metrics
+
+def validation_split(X_train, y_train, random_state=42):
+    """(X_fit, X_val, y_fit, y_val): the training rows split for ranking model candidates"""
+    return train_test_split(X_train, y_train, test_size=VALIDATION_SIZE, random_state=random_state)
+
+def search_and_evaluate(X_train, y_train, X_test, y_test, random_state=42, resource='samples',
+                        workers=None, work_dir='models/features', report_path=SEARCH_REPORT):
+    """
+    Pick the model by successive halving over default_candidates (see
+    model_search), ranked on a validation split of the training rows; write
+    every candidate's record to report_path, then refit the winner on all
+    training rows and evaluate it once on the test set
+    """
+    print("\n" + "="*70)
+    print(f"🔎 MODEL SEARCH (successive halving over {resource})")
+    print("="*70)
+    
+    candidates = default_candidates(random_state, X_train)
+    X_fit, X_val, y_fit, y_val = validation_split(X_train, y_train, random_state)
+    print(f"   Candidates: {len(candidates)}, ranked on {len(y_val):,} validation rows")
+    start = time.perf_counter()
+    best, model, records = successive_halving(candidates, X_fit, y_fit, X_val, y_val,
+                                              resource=resource, workers=workers, work_dir=work_dir,
+                                              random_state=random_state, X_test=X_test, y_test=y_test)
+    elapsed = time.perf_counter() - start
+    
+    print(f"\n   {'round':>5} {'candidate':<30} {resource:>8} {'fit s':>7} {'val RMSE':>12} "
+          f"{'test RMSE':>12} {'row p50 ms':>11} {'1k rows/s':>10}")
+    for r in records:
+        print(f"   {r['round']:>5} {r['name']:<30} {r['amount']:>8,} {r['fit_s']:>7.2f} "
+              f"₹{r['val_rmse']:>11,.0f} ₹{r['test_rmse']:>11,.0f} {r['latency']['row_p50_ms']:>11.2f} "
+              f"{r['latency']['batch_rows_per_s']:>10,.0f}")
+    print(f"\n   ✅ Best: {best} ({type(model).__name__}), search took {elapsed:.1f}s")
+    
+    Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump({'resource': resource, 'best': best, 'n_train': len(y_fit), 'n_val': len(y_val),
+                   'n_test': len(y_test), 'elapsed_s': elapsed, 'records': records}, f, indent=2)
+    print(f"   ✅ Search report saved: {report_path}")
+    
+    # The search fitted on the rows left after the validation split
+    print(f"   Refitting {best} on all {len(y_train):,} training rows...")
+    model = clone(model).fit(X_train, y_train)
+    metrics = evaluate_model(model, X_train, y_train, X_test, y_test)
+    return model, metrics
+
+def budgeted_selection(X_train, y_train, X_test, y_test, budget, random_state=42, prune=True):
+    """
+    Pick the most accurate of default_candidates on a validation split of
+    the training rows whose serving latency on this machine meets budget,
+    pruning the more accurate ones that miss it (see latency_budget); then
+    refit it on all training rows, re-measure its latency and evaluate it
+    once on the test set. Returns (model, metrics, profile).
+    """
+    print("\n" + "="*70)
+    print("⏱️  LATENCY-BUDGETED MODEL SELECTION")
+    print("="*70)
+    
+    limits = ', '.join(f"{key} {'<=' if key == 'row_p99_ms' else '>='} {limit:,}"
+                       for key, limit in budget.items() if limit is not None)
+    print(f"   Budget: {limits}")
+    X_fit, X_val, y_fit, y_val = validation_split(X_train, y_train, random_state)
+    print(f"   Ranked on {len(y_val):,} validation rows")
+    start = time.perf_counter()
+    best, model, profile = select_within_budget(default_candidates(random_state, X_train),
+                                                X_fit, y_fit, X_val, y_val, budget, prune)
+    elapsed = time.perf_counter() - start
+    
+    print(f"\n   {'candidate':<38} {'trees':>6} {'depth':>6} {'val RMSE':>12} {'row p99 ms':>11} "
+          f"{'1k rows/s':>10}  fits")
+    for r in profile['records']:
+        print(f"   {r['name'] + (' (pruned)' if r['pruned'] else ''):<38} {r['n_trees']:>6} "
+              f"{r['max_depth'] if r['max_depth'] is not None else '-':>6} ₹{r['val_rmse']:>11,.0f} "
+              f"{r['latency']['row_p99_ms']:>11.2f} {r['latency']['batch_rows_per_s']:>10,.0f}  "
+              f"{'yes' if r['within_budget'] else 'no'}")
+    print(f"\n   ✅ Selected: {best}{' (pruned)' if profile['pruned'] else ''}, "
+          f"{profile['n_trees']} trees, depth {profile['max_depth']} ({elapsed:.1f}s)")
+    
+    # The selection fitted on the rows left after the validation split; a
+    # clone keeps any pruned tree count and depth
+    print(f"   Refitting {best} on all {len(y_train):,} training rows...")
+    model = clone(model).fit(X_train, y_train)
+    latency = measure_latency(model, X_test, repeats=BUDGET_REPEATS)
+    profile['refit'] = {'n_trees': tree_count(model), 'max_depth': fitted_depth(model),
+                        'latency': latency, 'within_budget': within_budget(latency, profile['budget'])}
+    print(f"   Refitted row p99: {latency['row_p99_ms']:.2f} ms, "
+          f"1k rows/s: {latency['batch_rows_per_s']:,.0f}")
+    if not profile['refit']['within_budget']:
+        print("   ⚠️  The refitted model no longer meets the budget; saving it anyway")
+    
+    metrics = evaluate_model(model, X_train, y_train, X_test, y_test)
+    profile['test_rmse'] = metrics['test_rmse']
+    return model, metrics, profile
+
+def train_model(X, y, test_size=0.2, random_state=42, dtype='float64'):
+    """Train the model with fixed preprocessing"""
+    preprocessor, *features = preprocess(X, y, test_size, random_state, dtype)
+    model, metrics = fit_and_evaluate(*features, random_state)
+    return model, preprocessor, metrics
+
+def iter_training_chunks(data_path, chunksize):
+    """
+    Yield (X, y) chunks of a CSV, prepared like load_and_prepare_data
+    (target split off, city column renamed, rows without a target dropped)
+    """
+    reader = read_csv_chunks(data_path, chunksize)
+    first = next(reader, None)
+    if first is None:
+        return
+    
+    target_col = detect_target_column(first)
+    features = first.columns.drop(target_col)
+    rename = {}
+    if 'CITY_NAME' not in features:
+        city_cols = [col for col in features if 'city' in col.lower() or 'location' in col.lower()]
+        if city_cols:
+            rename = {city_cols[0]: 'CITY_NAME'}
+    
+    def chunks():
+        yield first
+        yield from reader
+    
+    for chunk in chunks():
+        y = chunk[target_col]
+        mask = ~y.isna()
+        yield chunk.drop(columns=target_col).rename(columns=rename)[mask], y[mask]
+
+def chunk_test_mask(n_rows, chunk_index, test_size, random_state):
+    """Test-set membership for one chunk; the same on every pass over the file"""
+    return np.random.default_rng([random_state, chunk_index]).random(n_rows) < test_size
+
+def preprocess_streaming(data_path, chunksize, work_dir='models/features',
+                         test_size=0.2, random_state=42, dtype='float64'):
+    """
+    Preprocess without loading the whole CSV: the preprocessor is fitted over
+    chunks (HousePricePreprocessor.fit_streaming) and the processed features
+    are written to packed files under work_dir. Returns the preprocessor and
+    memory-mapped train/test features and targets.
+    """
+    print("\n" + "="*70)
+    print(f"🔄 STREAMING PREPROCESSING ({chunksize:,} rows per chunk)")
+    print("="*70)
+    
+    def split(test):
+        for i, (X, y) in enumerate(iter_training_chunks(data_path, chunksize)):
+            mask = chunk_test_mask(len(X), i, test_size, random_state)
+            if not test:
+                mask = ~mask
+            yield X[mask], y[mask]
+    
+    print("\n   Pass 1: fitting preprocessor...")
+    preprocessor = HousePricePreprocessor(dtype=dtype).fit_streaming(X for X, _ in split(test=False))
+    print(f"   Processed features: {len(preprocessor.feature_names)}")
+    if preprocessor.categorical_features:
+        print(f"   Categorical features (NOT scaled): {list(preprocessor.categorical_features)}")
+    
+    print("\n   Pass 2: writing processed features...")
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    data = {}
+    for name, test in (('train', False), ('test', True)):
+        with PackedRowWriter(work_dir / f'y_{name}.bin', name='target') as targets:
+            def features():
+                for X, y in split(test):
+                    targets.append(y.to_numpy(dtype=np.float64))
+                    yield X
+            rows = preprocessor.transform_to_disk(features(), work_dir / f'X_{name}.bin')
+        _, arrays = read_packed(work_dir / f'X_{name}.bin')
+        _, target = read_packed(work_dir / f'y_{name}.bin')
+        data[name] = (pd.DataFrame(arrays['features'], columns=preprocessor.feature_names, copy=False),
+                      target['target'])
+        print(f"   {name.capitalize()} samples: {rows:,} → {work_dir / f'X_{name}.bin'}")
+    
+    return (preprocessor, *data['train'], *data['test'])
+
+def train_model_streaming(data_path, chunksize, work_dir='models/features',
+                          test_size=0.2, random_state=42, dtype='float64'):
+    """Out-of-core counterpart of train_model (see preprocess_streaming)"""
+    preprocessor, *features = preprocess_streaming(data_path, chunksize, work_dir,
+                                                   test_size, random_state, dtype)
+    model, metrics = fit_and_evaluate(*features, random_state)
+    return model, preprocessor, metrics
+
+def prepare_features(data_path, chunksize=None, work_dir='models/features', test_size=0.2,
+                     random_state=42, dtype='float64', cache_dir=None, data_cache_dir=None):
+    """
+    (preprocessor, X_train, y_train, X_test, y_test), from the feature cache
+    when cache_dir holds an entry for the same data file contents, split
+    parameters and preprocessor code; otherwise computed (and cached).
+    data_cache_dir caches the parsed CSV for in-memory preprocessing.
+    """
+    cache = FeatureCache(cache_dir) if cache_dir else None
+    if cache:
+        key, parts = cache.key(data_path, test_size=test_size, random_state=random_state,
+                               chunksize=chunksize, dtype=dtype, preparation=PREPARATION_VERSION)
+        features = cache.load(key)
+        if features is not None:
+            print(f"⚡ Using cached features: {cache.path(key)}")
+            return features
+    
+    if chunksize:
+        print(f"📂 Streaming data from: {data_path}")
+        if not cache:
+            return preprocess_streaming(data_path, chunksize, work_dir, test_size, random_state, dtype)
+        # Streamed features are written straight into the cache entry
+        with cache.writing(key, parts) as staging:
+            features = preprocess_streaming(data_path, chunksize, staging, test_size,
+                                            random_state, dtype)
+            features[0].save(staging / FeatureCache.PREPROCESSOR_FILE)
+    else:
+        # Load data
+        X, y, target_col = load_and_prepare_data(data_path, data_cache_dir)
+        features = preprocess(X, y, test_size, random_state, dtype)
+        if cache:
+            cache.store(key, *features, manifest=parts)
+    if cache:
+        print(f"   ✅ Features cached: {cache.path(key)}")
+    return features
+
 def test_city_differences(model, preprocessor):
     """Test that different cities produce different predictions"""
     print("\n" + "="*70)
@@ -312,8 +594,8 @@ def test_city_differences(model, preprocessor):
             else:
                 print(f"      This might be expected if cities are very similar")
 
-def save_model(model, preprocessor, metrics):
-    """Save model and preprocessor"""
+def save_model(model, preprocessor, metrics, latency_profile=None):
+    """Save model and preprocessor (and the latency profile it was selected with)"""
     print("\n" + "="*70)
     print("💾 SAVING MODEL")
     print("="*70)
@@ -337,6 +619,21 @@ def save_model(model, preprocessor, metrics):
     joblib.dump(model, old_model_path)
     preprocessor.save(old_preprocessor_path)
     
+    # Pickle-free copy of the preprocessor, loaded by the API when present
+    packed_preprocessor_path = model_dir / 'preprocessor.packed'
+    preprocessor.save(packed_preprocessor_path)
+    print(f"   ✅ Packed preprocessor saved: {packed_preprocessor_path}")
+    
+    # Memory-mappable copy of the forest, shared by all API workers
+    forest_path = model_dir / 'house_price_model.forest'
+    try:
+        save_forest(model, forest_path)
+        print(f"   ✅ Memory-mapped forest saved: {forest_path}")
+    except ValueError as e:
+        # A stale forest from an earlier model must not be served instead
+        forest_path.unlink(missing_ok=True)
+        print(f"   ⚠️  Memory-mapped forest not written: {e}")
+    
     # Save metrics
     metrics_path = model_dir / 'training_metrics.txt'
     with open(metrics_path, 'w') as f:
@@ -349,12 +646,157 @@ def save_model(model, preprocessor, metrics):
         f.write(f"Training MAE: ₹{metrics['train_mae']:,.0f}\n")
         f.write(f"Test MAE: ₹{metrics['test_mae']:,.0f}\n")
     
+    # A profile measured on an earlier model must not describe this one
+    profile_path = Path(LATENCY_PROFILE)
+    if latency_profile is not None:
+        with open(profile_path, 'w') as f:
+            json.dump(latency_profile, f, indent=2)
+    else:
+        profile_path.unlink(missing_ok=True)
+    
     print(f"   ✅ Model saved: {old_model_path}")
     print(f"   ✅ Preprocessor saved: {old_preprocessor_path}")
     print(f"   ✅ Metrics saved: {metrics_path}")
+    if latency_profile is not None:
+        print(f"   ✅ Latency profile saved: {profile_path}")
 
-def main():
-    """Main training function"""
+def incremental_update(new_path, history_path=None, history_rows=0, half_life=None, n_trees=None,
+                       test_size=0.2, random_state=42, report_path=INCREMENTAL_REPORT):
+    """
+    Add trees for newly arrived listings to the saved model (see
+    incremental.add_trees) instead of retraining from scratch. The new rows
+    are split into train/test; with history_path, a recency-weighted sample
+    of history_rows older listings is split the same way and trained on
+    too. Vocabularies are extended, other preprocessing stays as fitted.
+    Old-vs-new accuracy on both test sets is appended to report_path (the
+    sampled history may overlap the original training rows, so its delta
+    shows what the update costs on older listings).
+    Returns (model, preprocessor, metrics).
+    """
+    print("\n" + "="*70)
+    print("➕ INCREMENTAL UPDATE")
+    print("="*70)
+    
+    model = joblib.load('models/house_price_model.joblib')
+    preprocessor = HousePricePreprocessor()
+    preprocessor.load('models/preprocessor.joblib')
+    # Before anything reads n_estimators, which histogram boosting lacks
+    check_warm_start(model)
+    print(f"   Current model: {type(model).__name__} ({model.n_estimators} trees)")
+    
+    X, y, _ = load_and_prepare_data(new_path)
+    sets = {'new': train_test_split(X, y, test_size=test_size, random_state=random_state)}
+    if history_path and history_rows:
+        print(f"\n   Sampling {history_rows:,} listings from {history_path}"
+              f"{f' (half-life {half_life:,} rows)' if half_life else ''}...")
+        X_old, y_old = recency_sample(iter_training_chunks(history_path, HISTORY_CHUNKSIZE),
+                                      history_rows, half_life, random_state)
+        sets['history'] = train_test_split(X_old, y_old, test_size=test_size, random_state=random_state)
+    
+    # Accuracy of the current model and preprocessor, before anything changes
+    before = {name: accuracy(model, preprocessor.transform(X_test), y_test)
+              for name, (_, X_test, _, y_test) in sets.items()}
+    
+    X_train = pd.concat([X_train for X_train, _, _, _ in sets.values()])
+    y_train = pd.concat([y_train for _, _, y_train, _ in sets.values()])
+    added = preprocessor.extend_vocabularies(X_train)
+    for col, labels in added.items():
+        print(f"   New {col} values: {len(labels):,} (e.g. {labels[:3]})")
+    X_train_processed = preprocessor.transform(X_train)
+    
+    print(f"\n   Fitting new trees on {len(y_train):,} rows...")
+    start = time.perf_counter()
+    n_before = model.n_estimators
+    add_trees(model, X_train_processed, y_train, n_trees)
+    fit_s = time.perf_counter() - start
+    print(f"   ✅ {model.n_estimators - n_before} trees added in {fit_s:.1f}s "
+          f"({model.n_estimators} in total)")
+    
+    after = {name: accuracy(model, preprocessor.transform(X_test), y_test)
+             for name, (_, X_test, _, y_test) in sets.items()}
+    print(f"\n   {'test set':<10} {'RMSE before':>13} {'RMSE after':>13} {'R² before':>10} {'R² after':>10}")
+    for name in sets:
+        rmse = [f"₹{metrics[name]['rmse']:,.0f}" for metrics in (before, after)]
+        print(f"   {name:<10} {rmse[0]:>13} {rmse[1]:>13} "
+              f"{before[name]['r2']:>10.4f} {after[name]['r2']:>10.4f}")
+    
+    report_path = Path(report_path)
+    history = json.loads(report_path.read_text()) if report_path.exists() else []
+    history.append({
+        'data_path': str(new_path), 'history_path': history_path and str(history_path),
+        'history_rows': len(sets['history'][2]) if 'history' in sets else 0,
+        'half_life': half_life, 'n_train': len(y_train), 'fit_s': fit_s,
+        'trees_before': n_before, 'trees_after': model.n_estimators,
+        'new_categories': {col: len(labels) for col, labels in added.items()},
+        'test': {name: {'n': len(sets[name][3]), 'before': before[name], 'after': after[name],
+                        'delta': accuracy_delta(before[name], after[name])} for name in sets},
+    })
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(history, indent=2))
+    print(f"   ✅ Accuracy deltas recorded: {report_path}")
+    
+    _, X_test, _, y_test = sets['new']
+    metrics = evaluate_model(model, X_train_processed, y_train, preprocessor.transform(X_test), y_test)
+    return model, preprocessor, metrics
+
+def cross_validate_and_report(data_path, k=5, group_by_city=False, workers=None, engine=None,
+                              random_state=42, dtype='float64', data_cache_dir=None,
+                              work_dir='models/features', report_path=CV_REPORT):
+    """
+    K-fold cross-validation of the model build_model would train (see
+    cross_validation.cross_validate); prints per-fold and per-city errors
+    and writes the full report to report_path. Returns the report.
+    """
+    X, y, _ = load_and_prepare_data(data_path, data_cache_dir)
+    
+    print("\n" + "="*70)
+    print(f"🔁 {k}-FOLD CROSS-VALIDATION{' (grouped by city)' if group_by_city else ''}")
+    print("="*70)
+    
+    estimator = build_model(random_state, engine, X)
+    print(f"   Model: {type(estimator).__name__}")
+    report = cross_validate(X, y, estimator, k, group_by_city, workers, work_dir, random_state, dtype)
+    
+    print(f"\n   {'fold':>4} {'train':>9} {'test':>8} {'RMSE':>12} {'MAE':>12} {'R²':>8} "
+          f"{'wall s':>7} {'peak MB':>8}")
+    for r in report['folds']:
+        m = r['metrics']
+        peak = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+        print(f"   {r['fold']:>4} {r['n_train']:>9,} {r['n_test']:>8,} {'₹' + format(m['rmse'], ',.0f'):>12} "
+              f"{'₹' + format(m['mae'], ',.0f'):>12} {m['r2']:>8.4f} {r['wall_s']:>7.1f} {peak:>8}")
+    mean, std = report['fold_mean'], report['fold_std']
+    print(f"\n   Mean over folds: R² {mean['r2']:.4f} ± {std['r2']:.4f}, "
+          f"RMSE ₹{mean['rmse']:,.0f} ± ₹{std['rmse']:,.0f}")
+    
+    cities = sorted(report['cities'].items(), key=lambda item: item[1]['rmse'], reverse=True)
+    if cities:
+        print(f"\n   Cities with the largest errors ({len(cities)} in total):")
+        for city, m in cities[:10]:
+            r2 = f"{m['r2']:.4f}" if m['r2'] is not None else '-'
+            print(f"      {city:<20} n={m['n']:>7,}  RMSE ₹{m['rmse']:>12,.0f}  R² {r2}")
+    
+    report['data_path'] = str(data_path)
+    Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n   ✅ Cross-validation report saved: {report_path} ({report['elapsed_s']:.1f}s)")
+    return report
+
+def main(data_path=None, chunksize=None, work_dir='models/features', test_size=0.2, random_state=42,
+         dtype='float64', cache_dir=FEATURE_CACHE_DIR, search=None, search_workers=None,
+         engine=None, incremental=None, data_cache_dir=DATA_CACHE_DIR, cv=None,
+         latency_budget=None):
+    """
+    Main training function (chunksize set: out-of-core training; cache_dir
+    None: no feature cache; search 'samples' or 'trees': pick the model by
+    successive halving over that resource; engine: model type, see
+    engines.ENGINES, instead of matching the existing model; incremental:
+    dict of incremental_update options, data_path being the new listings;
+    data_cache_dir None: parse the CSV on every run; cv: dict of
+    cross_validate_and_report options, to cross-validate instead of training;
+    latency_budget: dict of budgeted_selection options, to pick the model
+    within a serving latency budget)
+    """
     print("\n" + "="*70)
     print("🏠 HOUSE PRICE PREDICTION MODEL TRAINING")
     print("="*70)
@@ -362,7 +804,7 @@ def main():
     print("(Categorical features like CITY_NAME will NOT be scaled)\n")
     
     # Find training data
-    data_path = find_training_data()
+    data_path = data_path or find_training_data()
     
     if data_path is None:
         print("❌ ERROR: Training data file not found!")
@@ -377,17 +819,39 @@ def main():
         return
     
     try:
-        # Load data
-        X, y, target_col = load_and_prepare_data(data_path)
+        if cv is not None:
+            cross_validate_and_report(data_path, engine=engine, random_state=random_state,
+                                      dtype=dtype, data_cache_dir=data_cache_dir,
+                                      work_dir=work_dir, **cv)
+            return 0
+        
+        if incremental is not None:
+            model, preprocessor, metrics = incremental_update(data_path, test_size=test_size,
+                                                              random_state=random_state, **incremental)
+            save_model(model, preprocessor, metrics)
+            print("\n✅ INCREMENTAL UPDATE COMPLETE!\n")
+            return 0
+        
+        # Processed features (cached across runs that only change the model)
+        preprocessor, *features = prepare_features(data_path, chunksize, work_dir, test_size,
+                                                   random_state, dtype, cache_dir, data_cache_dir)
         
         # Train model
-        model, preprocessor, metrics = train_model(X, y)
+        latency_profile = None
+        if latency_budget is not None:
+            model, metrics, latency_profile = budgeted_selection(*features, random_state=random_state,
+                                                                 **latency_budget)
+        elif search:
+            model, metrics = search_and_evaluate(*features, random_state, search, search_workers,
+                                                 work_dir)
+        else:
+            model, metrics = fit_and_evaluate(*features, random_state, engine)
         
         # Test city differences
         test_city_differences(model, preprocessor)
         
         # Save model
-        save_model(model, preprocessor, metrics)
+        save_model(model, preprocessor, metrics, latency_profile)
         
         print("\n" + "="*70)
         print("✅ TRAINING COMPLETE!")
@@ -408,15 +872,86 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) > 1:
-        # Custom data path provided
-        data_path = sys.argv[1]
-        if not Path(data_path).exists():
-            print(f"❌ Error: File not found: {data_path}")
-            sys.exit(1)
-        # Override find_training_data
-        import train_model
-        train_model.find_training_data = lambda: data_path
-    
-    sys.exit(main())
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the house price model")
+    parser.add_argument('data_path', nargs='?', help="training CSV (searched for if omitted)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="stream the CSV in chunks of this many rows (out-of-core fit)")
+    parser.add_argument('--work-dir', default='models/features',
+                        help="where streaming mode writes processed features with --no-cache")
+    parser.add_argument('--cache-dir', default=FEATURE_CACHE_DIR,
+                        help="feature cache directory (entries keyed by data, split and code)")
+    parser.add_argument('--data-cache-dir', default=DATA_CACHE_DIR,
+                        help="cache of parsed CSVs as memory-mapped Feather files (needs pyarrow)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="always parse and preprocess, without reading or writing either cache")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64',
+                        help="feature dtype of the preprocessor and the cached training matrices")
+    parser.add_argument('--search', nargs='?', const='samples', choices=['samples', 'trees'],
+                        help="pick forest/boosting settings by successive halving over training "
+                             "rows (default) or tree count")
+    parser.add_argument('--search-workers', type=int, default=None,
+                        help="processes fitting search candidates (default: one per CPU)")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default=None,
+                        help="model type to fit (default: the type of the existing model, "
+                             "else forest)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="add trees for the new listings in data_path to the saved model "
+                             "instead of retraining")
+    parser.add_argument('--add-trees', type=int, default=None,
+                        help="trees added by --incremental (default: 20%% of the current count)")
+    parser.add_argument('--history', default=None,
+                        help="with --incremental: earlier training CSV to mix a sample of into "
+                             "the new trees' data")
+    parser.add_argument('--history-rows', type=int, default=10000,
+                        help="listings sampled from --history")
+    parser.add_argument('--half-life', type=int, default=None,
+                        help="rows back in --history at which a listing is half as likely to "
+                             "be sampled (default: uniform)")
+    parser.add_argument('--cv', type=int, default=None, metavar='K',
+                        help="cross-validate with K folds and write models/cv_report.json "
+                             "instead of training")
+    parser.add_argument('--cv-group-city', action='store_true',
+                        help="with --cv: keep each CITY_NAME in a single fold")
+    parser.add_argument('--cv-workers', type=int, default=None,
+                        help="processes running folds (default: one per fold, up to the CPUs)")
+    parser.add_argument('--max-p99-ms', type=float, default=None,
+                        help="pick the most accurate model whose single-row p99 latency on this "
+                             "machine is at most this many ms")
+    parser.add_argument('--min-rows-per-s', type=float, default=None,
+                        help="pick the most accurate model that predicts a 1k-row batch at "
+                             "least this fast")
+    parser.add_argument('--no-prune', action='store_true',
+                        help="with a latency budget: only pick among the candidates as fitted, "
+                             "without cutting trees or depth")
+    args = parser.parse_args()
+    if args.data_path and not Path(args.data_path).exists():
+        print(f"❌ Error: File not found: {args.data_path}")
+        sys.exit(1)
+    if args.incremental and not args.data_path:
+        parser.error("--incremental needs the CSV of new listings")
+    budgeted = args.max_p99_ms is not None or args.min_rows_per_s is not None
+    if budgeted and args.search:
+        parser.error("--search and a latency budget pick the model in different ways; use one")
+    if args.cv is not None and args.cv < 2:
+        parser.error("--cv needs at least 2 folds")
+    # These pick or keep the model type themselves and would ignore --engine
+    for flag, given in (('--search', args.search), ('a latency budget', budgeted),
+                        ('--incremental', args.incremental)):
+        if args.engine and given:
+            parser.error(f"--engine cannot be combined with {flag}")
+    incremental = None
+    if args.incremental:
+        incremental = {'history_path': args.history, 'history_rows': args.history_rows,
+                       'half_life': args.half_life, 'n_trees': args.add_trees}
+    
+    sys.exit(main(args.data_path, args.chunksize, args.work_dir, args.test_size, args.random_state,
+                  args.dtype, None if args.no_cache else args.cache_dir, args.search,
+                  args.search_workers, args.engine, incremental,
+                  None if args.no_cache else args.data_cache_dir,
+                  {'k': args.cv, 'group_by_city': args.cv_group_city,
+                   'workers': args.cv_workers} if args.cv is not None else None,
+                  {'budget': {'row_p99_ms': args.max_p99_ms, 'batch_rows_per_s': args.min_rows_per_s},
+                   'prune': not args.no_prune} if budgeted else None))